@@ -0,0 +1,86 @@
+"""
+[COLOR-LUT] 등락률 → 타일 색상 룩업 테이블
+등락률을 0.01% 단위로 양자화하여 [-clamp, +clamp] 범위의 QColor / hex 문자열을 미리 계산
+셀마다 pow/보간/문자열 포맷을 반복하지 않고 인덱스 조회만으로 색상 결정
+"""
+import numpy as np
+from PyQt5.QtGui import QColor
+
+# 기준 색상 정의 (더 밝고 선명한 색상)
+BASE_GRAY = (44, 44, 52)   # #2c2c34 (0%: 검회색)
+GREEN_MAX = (46, 125, 50)  # #2e7d32 (밝은 진한 녹색)
+RED_MAX = (211, 47, 47)    # #d32f2f (밝은 진한 빨강)
+
+
+class ColorLUT:
+    def __init__(self, clamp=4.0, step=0.01):
+        """
+        clamp: 색이 최대로 진해지는 등락률(%) = 테이블 범위, 범위 밖 값은 양 끝 색상 사용
+        step: 양자화 단위(%)
+        """
+        self.clamp = float(clamp)
+        self.step = float(step)
+        self.half = int(round(self.clamp / self.step))
+        self.rgb = self._build_rgb()
+        self.hex = [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in self.rgb.tolist()]
+        self.qcolors = [QColor(r, g, b) for r, g, b in self.rgb.tolist()]
+        self.zero_index = self.half
+
+    def _build_rgb(self):
+        values = np.arange(-self.half, self.half + 1) * self.step
+        # 등락율을 0~1 범위로 정규화 + 비선형 스케일링 + 최소값 보장 (0.25 ~ 1.0 범위)
+        intensity = np.minimum(np.abs(values) / self.clamp, 1.0)
+        intensity = 0.25 + (intensity ** 0.6) * 0.75
+
+        base = np.array(BASE_GRAY, dtype=np.float64)
+        target = np.where(values[:, None] > 0, np.array(GREEN_MAX, dtype=np.float64), np.array(RED_MAX, dtype=np.float64))
+        rgb = (base + (target - base) * intensity[:, None]).astype(np.int32)
+        rgb[self.half] = BASE_GRAY
+        return rgb.astype(np.uint8)
+
+    def indices(self, changes):
+        """등락률 배열 → 색상 버킷 인덱스 배열 (NaN은 0%로 취급)"""
+        changes = np.nan_to_num(np.asarray(changes, dtype=np.float64), nan=0.0)
+        idx = np.rint(changes / self.step).astype(np.int64)
+        return np.clip(idx, -self.half, self.half) + self.half
+
+    def colors_for(self, changes):
+        """등락률 배열 → QColor 리스트"""
+        qcolors = self.qcolors
+        return [qcolors[i] for i in self.indices(changes).tolist()]
+
+    def hex_for(self, change):
+        """단일 등락률 → hex 문자열 (레거시 스타일시트용)"""
+        if change != change: change = 0.0  # NaN
+        i = int(round(change / self.step))
+        i = max(-self.half, min(self.half, i))
+        return self.hex[i + self.half]
+
+
+_default_lut = None
+_scaled_luts = {}  # {scale: (기준 공용 LUT, 배율 LUT)}
+
+
+def default_lut():
+    """앱 전체에서 공유하는 LUT (미니/확장 위젯 공용)"""
+    global _default_lut
+    if _default_lut is None:
+        _default_lut = ColorLUT()
+    return _default_lut
+
+
+def scaled_lut(scale):
+    """[TIMEFRAME] 공용 LUT의 범위/단위를 scale배 한 LUT (기간 등락률용, 1이면 공용 LUT)"""
+    base = default_lut()
+    if scale == 1: return base
+    cached = _scaled_luts.get(scale)
+    if cached is None or cached[0] is not base:  # configure()로 공용 LUT가 바뀌면 다시 생성
+        cached = _scaled_luts[scale] = (base, ColorLUT(clamp=base.clamp * scale, step=base.step * scale))
+    return cached[1]
+
+
+def configure(clamp=4.0, step=0.01):
+    """공용 LUT를 새 범위로 다시 생성"""
+    global _default_lut
+    _default_lut = ColorLUT(clamp=clamp, step=step)
+    return _default_lut
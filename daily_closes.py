@@ -0,0 +1,210 @@
+"""
+[TIMEFRAME] 종목별 일봉 종가 캐시 (약 1년, 디스크 영구 저장) → 기간별(1D/5D/1M/YTD) 등락률
+- closes: (세션 수, 종목 수) float32 행렬, sessions: 세션 날짜 서수 (date.toordinal(), 오름차순)
+- 현재 시세 세션(head) 이전의 완료된 세션만 보관 → 마지막 행 = 실시간 등락률의 직전 종가
+- 기간 등락률 = (1 + 1D 등락률) × 마지막 행 / 기준 행 - 1, 기준 행은 세션 수(5D/1M) 또는 연초(YTD)로 슬라이싱
+- 처음 한 번만 1년치를 받고, 이후에는 새 세션이 시작될 때마다 최근 며칠치를 받아 행을 추가 (보통 하루 1행)
+기간 전환은 캐시된 배율 배열 × 실시간 등락률 계산뿐 (네트워크 요청 없음)
+"""
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from quote_parse import ffill_2d
+from fetch_scheduler import FetchScheduler
+
+TIMEFRAMES = ("1D", "5D", "1M", "YTD")
+LOOKBACK = {"5D": 5, "1M": 21}  # 현재 세션 포함 거래일 수
+COLOR_SCALE = {"1D": 1, "5D": 2, "1M": 4, "YTD": 8}  # 색이 최대로 진해지는 등락률 배수 (공용 LUT 범위 기준)
+DEFAULT_MAX_SESSIONS = 260  # 약 1년
+RETRY_BASE = 300.0   # 동기화 실패 후 첫 재시도까지 (초), 연속 실패마다 2배
+RETRY_MAX = 3600.0
+
+
+class DailyCloses:
+    def __init__(self, path, tickers, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.path = path
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.n = len(self.tickers)
+        self.max_sessions = max(LOOKBACK["1M"] + 1, int(max_sessions))
+        self.sessions = np.zeros(0, dtype=np.int32)
+        self.closes = np.full((0, self.n), np.nan, dtype=np.float32)
+        self.head = 0       # 마지막 동기화 때의 현재 시세 세션 (행렬에는 포함하지 않음)
+        self.synced = 0.0   # 마지막 동기화 시각 (epoch)
+        self.failures = 0   # 연속 동기화 실패 횟수
+        self.retry_at = 0.0  # 실패 후 다음 동기화 가능 시각 (epoch, 파일에 저장되어 프로세스/재시작 간 공유)
+        self._factors = {}
+        self.load()
+
+    def __len__(self):
+        return self.sessions.shape[0]
+
+    def load(self):
+        """파일의 종목 열을 현재 유니버스 순서로 재배치 (없는 종목은 NaN → 다음 동기화에서 1년치 요청)"""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                tickers = data["tickers"].tolist()
+                sessions, closes = data["sessions"].astype(np.int32), data["closes"].astype(np.float32)
+                head, synced = int(data["head"]), float(data["synced"])
+                failures = int(data["failures"]) if "failures" in data.files else 0
+                retry_at = float(data["retry_at"]) if "retry_at" in data.files else 0.0
+        except (OSError, KeyError, ValueError):
+            return
+        cols = np.array([self.index.get(t, -1) for t in tickers], dtype=np.intp)
+        keep = cols >= 0
+        self.sessions = sessions
+        self.closes = np.full((sessions.shape[0], self.n), np.nan, dtype=np.float32)
+        self.closes[:, cols[keep]] = closes[:, keep]
+        self.head, self.synced = head, synced
+        self.failures, self.retry_at = failures, retry_at
+        if keep.sum() < self.n: self.synced = 0.0  # 유니버스에 새 종목이 있으면 바로 동기화
+        self._factors = {}
+
+    def save(self):
+        """임시 파일 후 교체 (압축 없음: 1년 × 500종목 ≈ 0.5MB)"""
+        tmp_path = f"{self.path}.tmp.npz"
+        try:
+            np.savez(tmp_path, tickers=np.array(self.tickers, dtype=str), sessions=self.sessions,
+                     closes=self.closes, head=np.int32(self.head), synced=np.float64(self.synced),
+                     failures=np.int32(self.failures), retry_at=np.float64(self.retry_at))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Daily close cache save failed: {e}")
+
+    # ---------- 동기화 ----------
+
+    def missing(self):
+        """종가가 하나도 없는 종목 마스크 (1년치 다운로드 대상)"""
+        return ~np.isfinite(self.closes).any(axis=0)
+
+    def due(self, now_et, calendar=None):
+        """
+        동기화 필요 여부: 동기화한 적 없음, 또는 마지막 동기화 이후 새 정규장이 시작됨
+        calendar가 None이면(오프라인 공급자) 날짜가 바뀌었을 때
+        받지 못한 종목(상장 폐지 등)은 다음 동기화 때 다시 요청 (갱신마다 1년치를 반복 요청하지 않음)
+        직전 동기화가 실패했으면 백오프 시각(retry_at)까지는 요청하지 않음
+        """
+        if time.time() < self.retry_at: return False
+        if self.synced <= 0: return True
+        synced_et = now_et - timedelta(seconds=time.time() - self.synced)
+        if calendar is None: return synced_et.date() != now_et.date()
+        s = calendar.next_session(synced_et)
+        if s is not None and s[0] <= synced_et:
+            s = calendar.next_session(s[1])  # 동기화 시점에 진행 중이던 세션은 제외
+        return s is not None and s[0] <= now_et
+
+    def period(self, today):
+        """이어 받을 기간 (마지막 세션 이후 경과일 기준, yfinance period 문자열)"""
+        gap = today.toordinal() - int(self.sessions[-1]) if len(self) else None
+        if gap is None or gap > 25: return "1y"
+        return "5d" if gap <= 5 else "1mo"
+
+    def merge(self, tickers, sessions, closes):
+        """다운로드 결과 (T,) 세션 서수 + (T, K) 종가를 행렬에 병합 (새 세션은 행 추가, NaN은 기존 값 유지)"""
+        sessions = np.asarray(sessions, dtype=np.int32)
+        closes = np.asarray(closes, dtype=np.float32)
+        if sessions.size == 0: return
+        cols = np.array([self.index[t] for t in tickers], dtype=np.intp)
+        union = np.union1d(self.sessions, sessions).astype(np.int32)
+        if union.size != self.sessions.size:
+            grown = np.full((union.size, self.n), np.nan, dtype=np.float32)
+            grown[np.searchsorted(union, self.sessions)] = self.closes
+            self.sessions, self.closes = union, grown
+        block = np.ix_(np.searchsorted(self.sessions, sessions), cols)
+        self.closes[block] = np.where(np.isfinite(closes), closes, self.closes[block])
+
+    def finish(self, head, synced=None):
+        """
+        동기화 마무리: 현재 시세 세션(head) 이후 행 제거 (실시간 1D 등락률이 담당),
+        빈 행 제거, 최근 max_sessions개만 유지
+        """
+        keep = (self.sessions < head) & np.isfinite(self.closes).any(axis=1)
+        keep &= np.cumsum(keep[::-1])[::-1] <= self.max_sessions
+        self.sessions, self.closes = self.sessions[keep], self.closes[keep]
+        self.head = int(head)
+        self.synced = time.time() if synced is None else synced
+        self.failures, self.retry_at = 0, 0.0
+        self._factors = {}
+
+    def fail(self, now=None):
+        """동기화 실패 기록: 연속 실패 횟수 기준 지수 백오프 후 저장 (갱신마다 1년치를 다시 요청하지 않음)"""
+        now = time.time() if now is None else now
+        self.failures += 1
+        delay = min(RETRY_BASE * 2.0 ** (self.failures - 1), RETRY_MAX)
+        self.retry_at = now + delay
+        self.save()
+        print(f"[TIMEFRAME] Daily close sync failed ({self.failures}x), next attempt in {delay:.0f}s")
+
+    def sync(self, provider, fetch_options=None, today=None, bucket=None):
+        """
+        공급자 fetch_history로 빠진 종목은 1년치, 나머지는 마지막 세션 이후만 받아 병합 후 저장
+        bucket: 시세 페치와 공유하는 TokenBucket (설정한 요청 속도를 두 작업이 나눠 씀)
+        반환: 추가된 세션 수 (공급자가 지원하지 않거나 받은 데이터가 없으면 None, 실패는 fail()로 기록)
+        """
+        if not hasattr(provider, "fetch_history"): return None
+        today = today or date.today()
+        before = len(self)
+        missing = self.missing()
+        requests = []
+        if missing.all():
+            requests.append(("1y", self.tickers))
+        else:
+            if missing.any():
+                requests.append(("1y", [t for t, m in zip(self.tickers, missing.tolist()) if m]))
+            requests.append((self.period(today), [t for t, m in zip(self.tickers, missing.tolist()) if not m]))
+
+        started = time.monotonic()
+        head = 0
+        for period, tickers in requests:
+            # 배치 크기/동시 요청/속도 제한은 시세 페치와 같은 설정 사용
+            scheduler = FetchScheduler.from_config(lambda batch: provider.fetch_history(batch, period), fetch_options,
+                                                   bucket=bucket)
+            for batch, result in scheduler.run(tickers):
+                if result is None: continue
+                sessions, closes = result
+                if len(sessions) == 0: continue
+                self.merge(batch, sessions, closes)
+                head = max(head, int(sessions[-1]))
+        if head == 0:
+            self.fail()
+            return None
+        self.finish(head)
+        self.save()
+        added = len(self) - before
+        print(f"[TIMEFRAME] Daily closes synced: {len(self)} sessions x {self.n} tickers "
+              f"({', '.join(p for p, _ in requests)}, {time.monotonic() - started:.1f}s)")
+        return added
+
+    # ---------- 기간 등락률 ----------
+
+    def factors(self, timeframe):
+        """
+        종목별 (직전 종가 / 기간 기준 종가) 배율 배열, 1D이거나 데이터가 없으면 None
+        기준 행이 비어 있으면(기간 중 상장 등) 첫 유효 종가 사용, 계산 불가 종목은 NaN
+        """
+        if timeframe not in LOOKBACK and timeframe != "YTD" or len(self) == 0: return None
+        cached = self._factors.get(timeframe)
+        if cached is not None: return cached
+        closes = ffill_2d(self.closes.astype(np.float64))
+        if timeframe == "YTD":
+            year = date.fromordinal(self.head).year if self.head > 0 else date.today().year
+            row = int(np.searchsorted(self.sessions, date(year, 1, 1).toordinal())) - 1  # 전년도 마지막 세션
+        else:
+            row = len(self) - LOOKBACK[timeframe]
+        row = min(max(row, 0), len(self) - 1)
+        first = closes[np.argmax(np.isfinite(closes), axis=0), np.arange(self.n)]
+        ref = np.where(np.isnan(closes[row]), first, closes[row])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            factors = np.where(ref > 0, closes[-1] / ref, np.nan)
+        factors.flags.writeable = False
+        self._factors[timeframe] = factors
+        return factors
+
+
+def apply_factors(changes, factors):
+    """1D 등락률(%) 배열 × 기간 배율 → 기간 등락률(%), 배율이 없는 종목은 NaN"""
+    with np.errstate(invalid="ignore"):
+        return np.round(((1.0 + np.asarray(changes, dtype=np.float64) / 100.0) * factors - 1.0) * 100.0, 2)
@@ -0,0 +1,191 @@
+"""
+[FETCH-SCHEDULER] 동시 실행 수 제한 + 토큰 버킷 속도 제한 배치 다운로드
+고정 sleep 없이 공급자 속도 제한 안에서 배치를 병렬로 요청하고, 결과는 끝에서 한 번만 모음
+"""
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_IN_FLIGHT = 3
+DEFAULT_REQUESTS_PER_SEC = 1.0
+
+DEFAULT_RETRY_BATCH_SIZE = 10
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 1.0
+DEFAULT_RETRY_MAX_DELAY = 8.0
+DEFAULT_RETRY_BUDGET = 20.0
+
+
+_SKIPPED = object()  # 마감 시각 이후라 요청하지 않은 배치 (실패 로그 없이 None 처리)
+
+
+class TokenBucket:
+    """
+    [RATE-LIMIT] 초당 rate개 토큰 보충, 최대 burst개까지 몰아서 허용 (스레드 안전)
+    clock/sleep: 시각 함수와 대기 함수 (기본 time.monotonic/time.sleep, 테스트에서 가짜 시계 주입)
+    """
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """
+        토큰 1개를 얻을 때까지 대기, 대기한 시간(초) 반환
+        deadline(clock 기준)까지 얻을 수 없으면 토큰을 쓰지 않고 None
+        """
+        if self.rate <= 0: return 0.0
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                delay = (1.0 - self.tokens) / self.rate
+                if deadline is not None and now + delay >= deadline: return None
+            self.sleep(delay)
+            waited += delay
+
+    @classmethod
+    def from_config(cls, options):
+        """config.json "fetch" 섹션의 requests_per_sec / max_in_flight(burst)로 생성 (여러 스케줄러가 공유 가능)"""
+        options = options or {}
+        return cls(options.get("requests_per_sec", DEFAULT_REQUESTS_PER_SEC),
+                   max(1, int(options.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT))))
+
+
+class FetchScheduler:
+    def __init__(self, fetch_batch, batch_size=DEFAULT_BATCH_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 requests_per_sec=DEFAULT_REQUESTS_PER_SEC, burst=None, bucket=None):
+        """
+        fetch_batch: 티커 리스트 → 결과 (예외 발생 시 해당 배치는 실패 처리)
+        batch_size: 요청 1회당 티커 수
+        max_in_flight: 동시에 진행할 요청 수
+        requests_per_sec: 초당 요청 시작 수 (토큰 버킷), burst 기본값은 max_in_flight
+        bucket: 다른 스케줄러와 공유할 TokenBucket (주면 requests_per_sec/burst는 무시)
+        """
+        self.fetch_batch = fetch_batch
+        self.batch_size = max(1, int(batch_size))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.bucket = bucket if bucket is not None else TokenBucket(
+            requests_per_sec, burst if burst is not None else self.max_in_flight)
+
+    @classmethod
+    def from_config(cls, fetch_batch, options, bucket=None):
+        """config.json "fetch" 섹션({"batch_size", "max_in_flight", "requests_per_sec"})으로 생성"""
+        options = options or {}
+        return cls(fetch_batch,
+                   batch_size=options.get("batch_size", DEFAULT_BATCH_SIZE),
+                   max_in_flight=options.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+                   requests_per_sec=options.get("requests_per_sec", DEFAULT_REQUESTS_PER_SEC),
+                   bucket=bucket)
+
+    def batches(self, tickers):
+        return [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+
+    def _run_one(self, batch, deadline=None):
+        if deadline is not None and (self.bucket.clock() >= deadline or self.bucket.acquire(deadline) is None):
+            return _SKIPPED  # 시간 예산 초과: 요청하지 않음
+        if deadline is None: self.bucket.acquire()
+        return self.fetch_batch(batch)
+
+    def run(self, tickers, on_batch=None, deadline=None):
+        """
+        전체 티커를 배치로 나눠 병렬 요청 (앞쪽 배치부터 시작)
+        on_batch: 배치가 완료될 때마다 on_batch(batch, result) 호출 (완료 순서, 실패 배치는 제외)
+        deadline: bucket.clock() 기준 마감 시각, 이후에는 새 배치를 시작하지 않음 (진행 중인 요청은 완료)
+        반환: [(batch, result 또는 None), ...] (배치 순서, 실패/마감으로 건너뛴 배치는 None)
+        """
+        batches = self.batches(list(tickers))
+        results = [None] * len(batches)
+        if not batches: return []
+        skipped = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(batches))) as pool:
+            futures = {pool.submit(self._run_one, batch, deadline): i for i, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"[WARN] Batch {i + 1}/{len(batches)} failed: {e}")
+                    continue
+                if results[i] is _SKIPPED:
+                    results[i] = None
+                    skipped += 1
+                    continue
+                if on_batch is not None and results[i] is not None:
+                    on_batch(batches[i], results[i])
+        if skipped:
+            print(f"[SCHEDULE] Deadline reached, {skipped}/{len(batches)} batches not requested")
+        return list(zip(batches, results))
+
+
+class RetryPolicy:
+    """
+    [RETRY] 실패 종목 재시도 정책 (갱신 1회 기준)
+    - 실패 종목을 작은 배치로 묶어 FetchScheduler로 병렬 재요청
+    - 라운드 사이 대기는 지수 백오프 + 지터 (base_delay * 2^k * [0.5, 1.5))
+    - 라운드 수(max_attempts)와 전체 시간(budget초)을 넘으면 중단, 남은 실패는 다음 갱신으로 넘김
+    """
+    def __init__(self, batch_size=DEFAULT_RETRY_BATCH_SIZE, max_attempts=DEFAULT_RETRY_ATTEMPTS,
+                 base_delay=DEFAULT_RETRY_BASE_DELAY, max_delay=DEFAULT_RETRY_MAX_DELAY, budget=DEFAULT_RETRY_BUDGET,
+                 rng=None):
+        self.batch_size = max(1, int(batch_size))
+        self.max_attempts = max(0, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.budget = float(budget)
+        self.rng = rng if rng is not None else random.Random()
+
+    @classmethod
+    def from_config(cls, options):
+        """config.json "fetch" 섹션의 retry_* 키로 생성"""
+        options = options or {}
+        return cls(batch_size=options.get("retry_batch_size", DEFAULT_RETRY_BATCH_SIZE),
+                   max_attempts=options.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS),
+                   base_delay=options.get("retry_base_delay", DEFAULT_RETRY_BASE_DELAY),
+                   max_delay=options.get("retry_max_delay", DEFAULT_RETRY_MAX_DELAY),
+                   budget=options.get("retry_budget", DEFAULT_RETRY_BUDGET))
+
+    def delay(self, attempt):
+        """attempt번째(0부터) 라운드 전 대기 시간"""
+        return min(self.base_delay * 2.0 ** attempt, self.max_delay) * self.rng.uniform(0.5, 1.5)
+
+    def run(self, scheduler, tickers, failed_of, on_batch=None):
+        """
+        scheduler: 재시도용 FetchScheduler (batch_size는 이 정책 값으로 덮어씀)
+        failed_of(batch, result): 배치 결과 중 여전히 실패한 티커 리스트
+        반환: (결과 [(batch, result), ...] (성공 배치만), 남은 실패 티커 리스트)
+        """
+        clock, sleep = scheduler.bucket.clock, scheduler.bucket.sleep  # 속도 제한과 같은 시계로 예산 계산
+        deadline = clock() + self.budget
+        scheduler.batch_size = self.batch_size
+        pending = list(tickers)
+        collected = []
+        for attempt in range(self.max_attempts):
+            if not pending: break
+            wait = self.delay(attempt)
+            if clock() + wait >= deadline:
+                print(f"[RETRY] Time budget ({self.budget:.1f}s) exhausted, {len(pending)} tickers deferred")
+                break
+            sleep(wait)
+            still = []
+            # 라운드 도중에도 마감 이후에는 새 배치를 시작하지 않음 (남은 종목은 stale로 다음 갱신에)
+            for batch, result in scheduler.run(pending, on_batch=on_batch, deadline=deadline):
+                if result is None:
+                    still.extend(batch)
+                    continue
+                collected.append((batch, result))
+                still.extend(failed_of(batch, result))
+            print(f"[RETRY] Round {attempt + 1}/{self.max_attempts}: {len(pending) - len(still)}/{len(pending)} recovered")
+            pending = still
+        return collected, pending
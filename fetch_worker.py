@@ -0,0 +1,112 @@
+"""
+[WORKER-PROCESS] 별도 프로세스에서 페치/파싱 (GUI 프로세스는 pandas/yfinance를 로드하지 않음)
+- 결과 벡터(마지막 성공 값/상태/성공 시각)는 shared_memory 이중 버퍼에 기록 (GUI가 스냅샷을 만드는 데 필요한 값만)
+- GUI에는 (seq, slot) 같은 작은 메시지만 보내고, GUI는 해당 슬롯 뷰에서 불변 스냅샷으로 한 번 복사 (수 KB)
+- 워커는 GUI가 보고 있는 슬롯(front)이 아닌 반대 슬롯(back)에만 기록
+메시지 (GUI → 워커): ("restore", values, timestamp) | ("fetch", seq, request_mask)
+                    | ("history", path, max_sessions, calendar) | ("stop",)
+메시지 (워커 → GUI): ("batch", indices, changes) | ("done", seq, slot) | ("history", synced)
+[TIMEFRAME] 일봉 종가 동기화도 워커의 별도 스레드에서 실행 (GUI는 완성된 파일만 다시 읽음)
+"""
+import threading
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.7 이하
+    shared_memory = None
+
+
+def slot_dtype(n):
+    return np.dtype([('seq', '<i8'), ('value', '<f8', (n,)), ('last_success', '<f8', (n,)), ('status', 'i1', (n,))])
+
+
+class SharedQuoteBuffer:
+    """2슬롯 shared_memory 버퍼 (name이 없으면 새로 생성, 있으면 연결)"""
+    def __init__(self, n, name=None):
+        self.dtype = slot_dtype(n)
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=2 * self.dtype.itemsize if create else 0)
+        self.slots = np.ndarray((2,), dtype=self.dtype, buffer=self.shm.buf)
+        if create: self.slots['seq'] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, slot, seq, status):
+        """QuoteStatus(status)를 slot에 기록 (seq는 마지막에 기록)"""
+        target = self.slots[slot]
+        target['value'] = status.value
+        target['last_success'] = status.last_success
+        target['status'] = status.status
+        target['seq'] = seq
+
+    def view(self, slot):
+        """slot의 필드별 numpy 뷰 (워커가 다음 back 슬롯에 쓰는 동안 유효, 보관하려면 복사)"""
+        return self.slots[slot]
+
+    def close(self, unlink=False):
+        del self.slots  # 뷰가 남아 있으면 close 불가
+        self.shm.close()
+        if unlink: self.shm.unlink()
+
+
+def worker_main(requests, results, shm_name, tickers, weights, provider_name, provider_options,
+                fetch_options, store_path=None, store_max=720, record_dir=None):
+    """워커 프로세스 진입점 (spawn으로 시작되므로 Qt/heatmap_widget을 import하지 않음)"""
+    from quote_providers import make_provider
+    from quote_status import QuoteStatus
+    from quote_fetcher import QuoteFetcher
+    from snapshot_store import SnapshotStore
+
+    buffer = SharedQuoteBuffer(len(tickers), name=shm_name)
+    status = QuoteStatus(len(tickers))
+    store = SnapshotStore(store_path, tickers, store_max) if store_path else None
+    provider = make_provider(provider_name, provider_options)
+    fetcher = QuoteFetcher(tickers, weights, provider, status, fetch_options, store=store, record_dir=record_dir)
+    send_lock = threading.Lock()  # 배치 콜백은 스케줄러 스레드에서 호출됨
+
+    def send(message):
+        with send_lock:
+            results.send(message)
+
+    def sync_history(path, max_sessions, calendar):
+        from daily_closes import DailyCloses
+        from market_calendar import eastern_now
+        try:
+            daily = DailyCloses(path, tickers, max_sessions)
+            # 시세 페치와 같은 토큰 버킷 사용 (동시에 실행되어도 설정한 요청 속도를 넘지 않음)
+            synced = daily.due(eastern_now(), calendar) and daily.sync(provider, fetch_options,
+                                                                       bucket=fetcher.bucket) is not None
+        except Exception as e:
+            print(f"[WARN] Daily close sync failed: {e}")
+            synced = False
+        send(("history", synced))
+
+    back = 0
+    try:
+        while True:
+            try:
+                message = requests.recv()
+            except EOFError:
+                break
+            kind = message[0]
+            if kind == "stop":
+                break
+            if kind == "restore":
+                status.restore(message[1], message[2])
+            elif kind == "history":
+                threading.Thread(target=sync_history, args=message[1:], name="DailyCloseSync", daemon=True).start()
+            elif kind == "fetch":
+                seq, mask = message[1], message[2]
+                try:
+                    fetcher.fetch(mask, on_batch=lambda idx, ch: send(("batch", idx, ch)))
+                except Exception as e:
+                    print(f"[ERROR] Fetch failed: {e}")  # 상태 모델은 이전 값 그대로 게시
+                buffer.write(back, seq, status)
+                send(("done", seq, back))
+                back = 1 - back
+    finally:
+        buffer.close()
@@ -0,0 +1,497 @@
+"""
+[CANVAS] 단일 QPainter 트리맵 (HeatmapCanvas)
++ 확장/미니 위젯과 레거시 TreemapWidget(heatmap_widget)이 함께 쓰는 nested 레이아웃 디스크 캐시
+"""
+import sys
+import time
+from pathlib import Path
+
+from PyQt5.QtWidgets import QWidget, QToolTip
+from PyQt5.QtCore import Qt, QTimer, QRect, QRectF
+from PyQt5.QtGui import QColor, QFont, QCursor, QPainter, QPen, QFontMetrics, QBrush
+import numpy as np
+
+try:
+    from treemap_layout import calculate_nested_treemap, nested_to_relative, relative_to_nested
+except ImportError:
+    calculate_nested_treemap = nested_to_relative = relative_to_nested = None
+
+import color_lut
+from layout_cache import LayoutCache, make_key
+from market_stats import MarketAggregates
+from daily_closes import apply_factors
+
+# EXE 실행 시 실행 파일 위치, 소스 실행 시 스크립트 위치 (heatmap_widget과 같은 기준)
+if getattr(sys, 'frozen', False):
+    BASE_PATH = Path(sys.executable).parent
+else:
+    BASE_PATH = Path(__file__).parent
+LAYOUT_CACHE_FILE = BASE_PATH / "layout_cache.bin"
+
+# 확장 위젯 섹터 헤더 높이 / 테두리 여백
+SECTOR_HEADER_H = 16
+SECTOR_MARGIN = 1
+
+# [PERSISTENT] 레이아웃 디스크 LRU 캐시 (TreemapWidget / HeatmapCanvas 공용)
+LAYOUT_STORE = LayoutCache(LAYOUT_CACHE_FILE)
+LAYOUT_SAVE_DELAY_MS = 2000  # 마지막 put 이후 디스크 기록까지 대기 (리사이즈 연속 변경은 한 번만 기록)
+_layout_save_timer = None
+
+
+def get_nested_layout(sector_data, u_hash, w, h, persist=True):
+    """
+    [PERSISTENT] 디스크 캐시에 있으면 복원, 없으면 nested 레이아웃을 계산
+    persist=False(표시 전 기본 크기 등)이면 계산 결과를 캐시에 넣지 않음 → 필요하면 store_nested_layout
+    """
+    key = make_key(u_hash, w, h, SECTOR_HEADER_H, SECTOR_MARGIN)
+    table = LAYOUT_STORE.get(key, w, h)
+    if table is None:
+        table = calculate_nested_treemap(sector_data, w, h, header_h=SECTOR_HEADER_H, margin=SECTOR_MARGIN)
+        if persist: store_nested_layout(key, table, w, h)
+    return key, table
+
+
+def store_nested_layout(key, table, w, h):
+    """[LAYOUT-DEFER] 캐시에 없으면 메모리에 넣고 디스크 기록은 단발 타이머로 미룸 (GUI 스레드에서 호출)"""
+    global _layout_save_timer
+    if key in LAYOUT_STORE: return
+    LAYOUT_STORE.put(key, table, w, h)
+    if _layout_save_timer is None:
+        _layout_save_timer = QTimer()
+        _layout_save_timer.setSingleShot(True)
+        _layout_save_timer.timeout.connect(LAYOUT_STORE.flush)
+    _layout_save_timer.start(LAYOUT_SAVE_DELAY_MS)
+
+
+class HeatmapCanvas(QWidget):
+    """
+    [CANVAS] 모든 타일/테두리/섹터 헤더/라벨을 하나의 paintEvent에서 그리는 트리맵
+    종목마다 위젯을 만들지 않고 정수 좌표 배열 + 색상 리스트로 렌더링
+    stale 해칭/히스토리 재생/기간별 보기는 캔버스 전용 (레거시 TreemapWidget 모드에서는 비활성)
+    """
+    # [LAYOUT-SYNC] 확장 위젯 레이아웃의 비율 좌표를 미니 위젯이 재사용: (universe_hash, sector_rel, child_rel)
+    _ref_layout = None
+    _ref_layout_version = 0  # _ref_layout을 저장할 때마다 증가 (id()는 GC 후 재사용될 수 있어 시그니처로 부적합)
+
+    def __init__(self, universe, is_mini=False, parent=None):
+        super().__init__(parent)
+        self.universe = universe
+        self.is_mini = is_mini
+        self._fonts = {}
+        self._hover = -1
+        self._sector_rects = None  # (k, 4) int [x, y, w, h]
+        self._tile_rects = None    # (n, 4) int [x, y, w, h]
+        # [TIMEFRAME] 기간 배율(유니버스 인덱스, None이면 1D) + 기간별 색상 LUT
+        self._timeframe = (None, None)
+        if not self.is_mini:
+            self.setMouseTracking(True)
+            self.tooltip_timer = QTimer(self)
+            self.tooltip_timer.setSingleShot(True)
+            self.tooltip_timer.timeout.connect(self.show_custom_tooltip)
+        self.setup_base()
+
+    def setup_base(self):
+        # [UNIVERSE] 섹터 구간/타일 순서/비중은 유니버스에 미리 계산된 배열을 그대로 사용
+        u = self.universe
+        self.sector_data = u.hierarchy()
+        self.universe_hash = u.hash
+        # 타일 순서 = 섹터 순서대로 이어 붙인 종목 (nested 테이블의 자식 행 순서와 동일)
+        self.tile_universe = u.order
+        self.tile_of = np.empty_like(self.tile_universe)  # 유니버스 인덱스 → 타일
+        self.tile_of[self.tile_universe] = np.arange(self.tile_universe.shape[0])
+        self.tile_tickers = u.tickers[self.tile_universe].tolist()
+        self.tile_parent = u.sector_codes[self.tile_universe]
+        self.sector_offsets = u.sector_offsets.tolist()
+        self._hover = -1
+        self._layout_sig = None
+        self._unsaved_layout = None  # [LAYOUT-DEFER] 표시 전 크기로 계산한 레이아웃 (key, table, w, h)
+        # [DIRTY] 마지막으로 그린 등락률/색상 버킷/텍스트 (바뀐 타일만 다시 그리기 위함)
+        n = len(self.tile_tickers)
+        self._changes = None
+        self._snapshot = None  # [QUOTE-SNAPSHOT] 마지막으로 그린 스냅샷 (재생 중이면 None)
+        self._color_idx = np.full(n, -1, dtype=np.int64)
+        self._colors = [None] * n
+        self._change_texts = [""] * n
+        # [STALE] 마지막 성공 값을 표시 중인(최신이 아닌) 타일
+        self._stale = np.zeros(n, dtype=bool)
+        self._weights = u.weights[self.tile_universe]
+        # [AGGREGATE] 지수/섹터 가중 등락률 + 시장 폭 (표시 중인 등락률 기준, 재생 중이면 재생 값)
+        self.stats = MarketAggregates(self._weights, self.sector_offsets)
+        # [REPLAY] 히스토리 재생 중이면 유니버스 등락률 대신 이 등락률 배열(유니버스 인덱스)로 색칠
+        self._replay = None
+        factors, self._lut = self._timeframe
+        self._factors = None if factors is None or len(factors) != n else np.asarray(factors)[self.tile_universe]
+        self.sector_perf = [None] * len(self.sector_data)
+        self._relayout()
+        self.update_all_cells()
+
+    def set_universe(self, universe):
+        """유니버스 구성이 바뀐 경우에만 인덱스/레이아웃 재구성 (등락률은 update_all_cells에서 반영)"""
+        if universe is not self.universe and universe.hash != self.universe.hash:
+            self.refresh_data(universe)
+        self.universe = universe
+
+    def refresh_data(self, universe):
+        self.universe = universe
+        self.setup_base()
+
+    def update_all_cells(self):
+        """[DIRTY] 색상 버킷/텍스트가 바뀐 타일만 갱신하고 해당 영역만 다시 그림, 바뀐 타일 수 반환"""
+        n = len(self.tile_tickers)
+        if self._replay is None:
+            # [QUOTE-SNAPSHOT] 직전에 그린 스냅샷과의 차이만 후보 (같은 스냅샷이면 할 일 없음)
+            snap = self.universe.snapshot
+            if snap is self._snapshot: return 0
+            changes = self._display(snap.change[self.tile_universe])
+            # 배율은 고정이므로 1D 스냅샷 차이가 곧 표시값 차이
+            candidates = np.arange(n) if self._changes is None else np.sort(self.tile_of[snap.diff(self._snapshot)])
+            self._snapshot = snap
+        else:
+            # 재생 행은 배율을 적용한 표시값으로 바꾼 뒤 직전 표시값(self._changes)과 비교
+            changes = self._display(np.nan_to_num(self._replay[self.tile_universe].astype(np.float64)))
+            candidates = np.arange(n) if self._changes is None else np.nonzero(changes != self._changes)[0]
+            self._snapshot = None  # 실시간으로 돌아오면 재생 화면 기준으로 전체 비교
+        if candidates.size == 0:
+            self._changes = changes
+            return 0
+        self.stats.update(changes, None if self._changes is None else candidates)
+        self._changes = changes
+
+        # [COLOR-LUT] 색상은 버킷 인덱스 조회로 결정 (미니/확장 공용 테이블)
+        lut = self._lut or color_lut.default_lut()
+        new_idx = lut.indices(changes[candidates])
+        dirty = []
+        for i, ci, c in zip(candidates.tolist(), new_idx.tolist(), changes[candidates].tolist()):
+            text = f"{c:+.2f}%" if c != 0 else "-"
+            if ci == self._color_idx[i] and text == self._change_texts[i]: continue
+            self._color_idx[i] = ci
+            self._colors[i] = lut.qcolors[ci]
+            self._change_texts[i] = text
+            dirty.append(i)
+
+        # 바뀐 종목이 속한 섹터만 헤더 등락률 재계산
+        dirty_sectors = self.update_performance(np.unique(self.tile_parent[candidates]).tolist())
+
+        if self._tile_rects is None or len(dirty) > n // 4:
+            self.update()
+        else:
+            for i in dirty:
+                self.update(QRect(*self._tile_rects[i].tolist()))
+            for si in dirty_sectors:
+                x, y, w, _ = self._sector_rects[si].tolist()
+                self.update(QRect(x, y, w, SECTOR_HEADER_H))
+        return len(dirty)
+
+    def _display(self, changes):
+        """[TIMEFRAME] 타일 순서 1D 등락률 → 표시값 (1D 등락률 × 기간 배율, 계산 불가 종목은 0)"""
+        if self._factors is None: return changes
+        return np.nan_to_num(apply_factors(changes, self._factors))
+
+    def set_stale(self, mask):
+        """[STALE] 유니버스 인덱스 마스크로 stale 타일 갱신, 표시가 바뀐 타일만 다시 그림"""
+        stale = np.asarray(mask, dtype=bool)[self.tile_universe]
+        dirty = np.nonzero(stale != self._stale)[0].tolist()
+        self._stale = stale
+        if self._tile_rects is not None:
+            for i in dirty:
+                self.update(QRect(*self._tile_rects[i].tolist()))
+        return len(dirty)
+
+    def set_replay(self, changes):
+        """[REPLAY] 유니버스 인덱스 등락률 배열로 다시 색칠 (None이면 실시간 값으로 복귀), 레이아웃은 그대로"""
+        toggled = (self._replay is None) != (changes is None)
+        self._replay = None if changes is None else np.asarray(changes)
+        dirty = self.update_all_cells()
+        if toggled and self._stale.any(): self.update()  # stale 해칭은 실시간 보기에서만 표시
+        return dirty
+
+    def set_timeframe(self, factors, lut=None):
+        """
+        [TIMEFRAME] 기간 배율(유니버스 인덱스, None이면 1D)과 색상 LUT로 전체 다시 색칠
+        실시간/재생 등락률 모두 같은 배율을 적용, 레이아웃은 그대로
+        """
+        self._timeframe = (factors, lut)
+        n = len(self.tile_tickers)
+        self._factors = None if factors is None or len(factors) != n else np.asarray(factors)[self.tile_universe]
+        self._lut = lut
+        self._snapshot = None
+        self._changes = None
+        self._color_idx[:] = -1  # LUT가 바뀌면 같은 버킷도 색이 다름
+        return self.update_all_cells()
+
+    def update_performance(self, sectors=None):
+        """섹터 헤더 등락률 (MarketAggregates 값), 표시 텍스트가 바뀐 섹터 인덱스 반환"""
+        perfs = self.stats.sector_changes()
+        changed = []
+        for si in (range(len(self.sector_data)) if sectors is None else sectors):
+            perf = None if np.isnan(perfs[si]) else float(perfs[si])
+            old = self.sector_perf[si]
+            if (old is None) != (perf is None) or (perf is not None and f"{perf:+.2f}" != f"{old:+.2f}"):
+                changed.append(si)
+            self.sector_perf[si] = perf
+        return changed
+
+    # ---------- Layout ----------
+
+    def showEvent(self, event):
+        """[LAYOUT-DEFER] 표시 전에 계산한 레이아웃이 실제 표시 크기와 같으면 그때 디스크 캐시에 저장"""
+        super().showEvent(event)
+        pending, self._unsaved_layout = self._unsaved_layout, None
+        if pending is not None and pending[2:] == (self.width(), self.height()):
+            store_nested_layout(*pending)
+
+    def resizeEvent(self, event):
+        self.relayout()
+
+    def relayout(self):
+        """크기/유니버스/참조 레이아웃이 바뀐 경우에만 다시 그림 (갱신마다 호출), 재계산 여부 반환"""
+        if not self._relayout(): return False
+        self.update()
+        return True
+
+    def _relayout(self):
+        """크기/유니버스/참조 레이아웃이 바뀐 경우에만 타일 좌표 재계산, 재계산 여부 반환"""
+        started = time.perf_counter()
+        w, h = self.width(), self.height()
+        k = len(self.sector_data)
+        if w <= 0 or h <= 0 or k == 0 or calculate_nested_treemap is None:
+            self._sector_rects = self._tile_rects = None
+            self._layout_sig = None
+            return True
+
+        sig = (w, h, self.universe_hash, None if not self.is_mini else HeatmapCanvas._ref_layout_version)
+        if sig == self._layout_sig: return False
+
+        if not self.is_mini:
+            # [LAYOUT-DEFER] 표시 전(생성 직후 기본 크기)에는 디스크 캐시에 넣지 않고 보류
+            visible = self.isVisible()
+            key, table = get_nested_layout(self.sector_data, self.universe_hash, w, h, persist=visible)
+            self._unsaved_layout = None if visible else (key, table, w, h)
+            self._store_ref_layout(nested_to_relative(table, w, h, SECTOR_MARGIN))
+            margin = SECTOR_MARGIN
+        else:
+            ref = HeatmapCanvas._ref_layout
+            if ref is None or ref[0] != self.universe_hash:
+                # [LAYOUT-INIT] 확장 위젯이 아직 없으면 확장 위젯 크기(1200x800) 레이아웃을 비율로 변환하여 사용
+                _, base = get_nested_layout(self.sector_data, self.universe_hash, 1200, 800)
+                ref = self._store_ref_layout(nested_to_relative(base, 1200, 800, SECTOR_MARGIN))
+            table = relative_to_nested(ref[1], ref[2], self.tile_parent, w, h)
+            margin = 0
+            sig = (w, h, self.universe_hash, HeatmapCanvas._ref_layout_version)
+        self._layout_sig = sig
+
+        rects = table['rects']
+        self._sector_top = table['top'][:k]
+
+        # [SMART-ROUNDING] w = round(x+w) - round(x)
+        def snap(r):
+            ix, iy = np.rint(r[:, 0]), np.rint(r[:, 1])
+            return ix, iy, np.rint(r[:, 0] + r[:, 2]) - ix, np.rint(r[:, 1] + r[:, 3]) - iy
+
+        sx, sy, sw, sh = snap(rects[:k])
+        # [HARD-SNAP] 전체 위젯 경계 밀착
+        sw = np.where(sx + sw >= w - 1, np.maximum(sw, w - sx), sw)
+        sh = np.where(sy + sh >= h - 1, np.maximum(sh, h - sy), sh)
+
+        tiles = rects[k:]
+        tx, ty, tw, th = snap(tiles)
+        # [OVERLAP-FILL] 미니 위젯: 1px 오버랩으로 공백 방지
+        if self.is_mini:
+            tw += 1; th += 1
+        # [HARD-SNAP] 섹터 내부 경계 밀착
+        p = self.tile_parent
+        bx, by = (sx + sw - margin)[p], (sy + sh - margin)[p]
+        tw = np.where(tx + tw >= bx - 1, np.maximum(tw, bx - tx), tw)
+        th = np.where(ty + th >= by - 1, np.maximum(th, by - ty), th)
+        # [DOT-GUARD] 최소 2px 보장
+        tw, th = np.maximum(tw, 2), np.maximum(th, 2)
+
+        self._sector_rects = np.stack([sx, sy, sw, sh], axis=1).astype(np.int32)
+        self._tile_rects = np.stack([tx, ty, tw, th], axis=1).astype(np.int32)
+        # 섹터가 너무 작아 내부 트리맵이 없는 타일은 그리지 않음
+        self._tile_visible = (tiles[:, 2] > 0) & (tiles[:, 3] > 0) & (sw[p] > 4) & (sh[p] > 4)
+
+        # 라벨 크기/표시 여부 미리 계산
+        if self.is_mini:
+            # [MINI-TICKER] 큰 셀에만 티커 표시
+            self._font_sizes = np.full(tw.shape, 6, dtype=np.int32)
+            self._show_ticker = (tw >= 12) & (th >= 8)
+            self._show_change = np.zeros(tw.shape, dtype=bool)
+        else:
+            # 폰트 크기 가변화 (최대 36px), 글자가 너무 작으면 숨김
+            font_size = np.clip(np.sqrt(tw * th) / 4.7, 2, 36)
+            self._font_sizes = font_size.astype(np.int32)
+            self._show_ticker = (tw > 8) & (th > 8) & (font_size >= 2.8)
+            # 세로 공간이 충분하고 가로도 어느 정도 확보될 때만 등락률 표시
+            self._show_change = self._show_ticker & (th > font_size * 2.3) & (tw > font_size * 2.0)
+        self._hover = -1
+        self.layout_time = (started, time.perf_counter())  # [STARTUP-PROFILE]
+        return True
+
+    def _store_ref_layout(self, relative):
+        """[LAYOUT-SYNC] 미니 위젯이 재사용할 비율 레이아웃 저장, 버전 증가 → 미니 위젯은 다음 relayout에서 다시 계산"""
+        HeatmapCanvas._ref_layout = (self.universe_hash,) + relative
+        HeatmapCanvas._ref_layout_version += 1
+        return HeatmapCanvas._ref_layout
+
+    # ---------- Painting ----------
+
+    def _font(self, px, weight):
+        key = (px, weight)
+        entry = self._fonts.get(key)
+        if entry is None:
+            font = QFont(self.font())
+            font.setPixelSize(max(1, px))
+            font.setWeight(weight)
+            entry = self._fonts[key] = (font, QFontMetrics(font).height())
+        return entry
+
+    def paintEvent(self, event):
+        if self._tile_rects is None: return
+        painter = QPainter(self)
+        clip = event.rect()
+        cx0, cy0, cx1, cy1 = clip.x(), clip.y(), clip.x() + clip.width(), clip.y() + clip.height()
+
+        self._paint_sectors(painter)
+
+        r = self._tile_rects
+        in_clip = self._tile_visible & (r[:, 0] < cx1) & (r[:, 0] + r[:, 2] > cx0) & (r[:, 1] < cy1) & (r[:, 1] + r[:, 3] > cy0)
+        idx = np.nonzero(in_clip)[0].tolist()
+        rects = r.tolist()
+
+        # 타일 배경 + 1px 테두리
+        border = QColor(10, 10, 15, 204) if self.is_mini else QColor(0, 0, 0, 64)
+        painter.setPen(QPen(border, 1))
+        for i in idx:
+            x, y, w, h = rects[i]
+            painter.setBrush(self._colors[i])
+            painter.drawRect(x, y, w - 1, h - 1)
+
+        # [STALE] 최신 값이 아닌 타일은 사선 해칭으로 표시
+        stale = [i for i in idx if self._stale[i]] if self._replay is None else []
+        if stale:
+            hatch = QBrush(QColor(255, 255, 255, 46), Qt.BDiagPattern)
+            for i in stale:
+                x, y, w, h = rects[i]
+                painter.fillRect(x + 1, y + 1, w - 2, h - 2, hatch)
+
+        self._paint_labels(painter, idx, rects)
+
+        # 확장 위젯: 호버 타일 흰색 테두리
+        if self._hover >= 0 and self._hover in idx:
+            x, y, w, h = rects[self._hover]
+            painter.setPen(QPen(Qt.white, 1.5))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRect(QRectF(x + 0.75, y + 0.75, w - 1.5, h - 1.5))
+        painter.end()
+
+    def _paint_sectors(self, painter):
+        rects = self._sector_rects.tolist()
+        if self.is_mini:
+            # [MINI-BORDER] 섹터 구분을 위한 검은 테두리
+            painter.setPen(QPen(QColor(0, 0, 0, 204), 1))
+            painter.setBrush(Qt.NoBrush)
+            for x, y, w, h in rects:
+                painter.drawRect(x, y, w - 1, h - 1)
+            return
+
+        painter.setPen(QPen(QColor(255, 255, 255, 31), 1))
+        painter.setBrush(QColor(255, 255, 255, 3))
+        for x, y, w, h in rects:
+            painter.drawRect(x, y, w - 1, h - 1)
+
+        # 섹터 헤더 (제목 + 가중 평균 등락률)
+        title_font, _ = self._font(9, QFont.ExtraBold)
+        title_font.setLetterSpacing(QFont.AbsoluteSpacing, 0.4)
+        perf_font, _ = self._font(9, QFont.Bold)
+        header_bg = QColor(255, 255, 255, 8)
+        for si, (x, y, w, h) in enumerate(rects):
+            if h < 35 or w < 60: continue
+            painter.fillRect(x, y, w, SECTOR_HEADER_H, header_bg)
+            perf = self.sector_perf[si]
+            if perf is not None:
+                painter.setFont(perf_font)
+                painter.setPen(QColor(76, 175, 80, 217) if perf >= 0 else QColor(239, 83, 80, 217))
+                painter.drawText(QRect(x + 6, y, w - 12, SECTOR_HEADER_H), Qt.AlignRight | Qt.AlignVCenter, f"{perf:+.2f}%")
+            painter.setFont(title_font)
+            painter.setPen(QColor(255, 255, 255, 204))
+            painter.drawText(QRect(x + 6, y, w - 12, SECTOR_HEADER_H), Qt.AlignLeft | Qt.AlignVCenter,
+                             self.sector_data[si]['sector'].upper())
+
+    def _paint_labels(self, painter, idx, rects):
+        show_t, show_c = self._show_ticker, self._show_change
+        sizes = self._font_sizes.tolist()
+        shadow = QColor(0, 0, 0, 120)
+        white = QColor(Qt.white)
+        change_color = QColor(255, 255, 255, 217)
+        for i in idx:
+            if not show_t[i]: continue
+            x, y, w, h = rects[i]
+            ticker = self.tile_tickers[i]
+            painter.save()
+            painter.setClipRect(x, y, w, h)
+            if self.is_mini:
+                font, _ = self._font(6, QFont.Bold)
+                painter.setFont(font)
+                painter.setPen(white)
+                painter.drawText(QRect(x + 1, y, w - 2, h), Qt.AlignCenter, ticker)
+                painter.restore()
+                continue
+
+            t_font, t_h = self._font(sizes[i], QFont.ExtraBold)
+            if show_c[i]:
+                c_font, c_h = self._font(max(2, int(sizes[i] * 0.8)), QFont.Medium)
+                top = y + (h - t_h - c_h) // 2
+                t_rect, c_rect = QRect(x, top, w, t_h), QRect(x, top + t_h, w, c_h)
+            else:
+                t_rect, c_rect = QRect(x, y + (h - t_h) // 2, w, t_h), None
+
+            painter.setFont(t_font)
+            painter.setPen(shadow)
+            painter.drawText(t_rect.translated(1, 1), Qt.AlignCenter, ticker)
+            painter.setPen(white)
+            painter.drawText(t_rect, Qt.AlignCenter, ticker)
+            if c_rect is not None:
+                text = self._change_texts[i]
+                painter.setFont(c_font)
+                painter.setPen(shadow)
+                painter.drawText(c_rect.translated(1, 1), Qt.AlignCenter, text)
+                painter.setPen(change_color)
+                painter.drawText(c_rect, Qt.AlignCenter, text)
+            painter.restore()
+
+    # ---------- Hover / Tooltip ----------
+
+    def tile_at(self, pos):
+        if self._tile_rects is None: return -1
+        r = self._tile_rects
+        x, y = pos.x(), pos.y()
+        hit = np.nonzero(self._tile_visible & (r[:, 0] <= x) & (x < r[:, 0] + r[:, 2]) & (r[:, 1] <= y) & (y < r[:, 1] + r[:, 3]))[0]
+        return int(hit[-1]) if hit.size else -1
+
+    def _set_hover(self, index):
+        if index == self._hover: return
+        for old in (self._hover, index):
+            if old >= 0: self.update(QRect(*self._tile_rects[old].tolist()))
+        self._hover = index
+        QToolTip.hideText()
+        if index >= 0: self.tooltip_timer.start(300) # 0.3초 딜레이
+        else: self.tooltip_timer.stop()
+
+    def mouseMoveEvent(self, event):
+        if not self.is_mini:
+            self._set_hover(self.tile_at(event.pos()))
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if not self.is_mini:
+            self._set_hover(-1)
+        super().leaveEvent(event)
+
+    def show_custom_tooltip(self):
+        if self._hover < 0: return
+        i = int(self.tile_universe[self._hover])
+        change = float(self._changes[self._hover])
+        text = f"<b>{self.universe.names[i]}</b> ({self.tile_tickers[self._hover]})<br>Change: <span style='color:{'#4caf50' if change >= 0 else '#ef5350'};'>{change:+.2f}%</span>"
+        if self._stale[self._hover]: text += "<br><i>stale (last good value)</i>"
+        QToolTip.showText(QCursor.pos(), text, self, QRect(*self._tile_rects[self._hover].tolist()))
@@ -5,14 +5,23 @@ import time
 import ctypes
 import os
 
+_STARTED = time.perf_counter()  # [STARTUP-PROFILE] 시작 시각 기준점
+
 # 단일 인스턴스 강제 (중복 실행 방지)
-try:
-    mutex = ctypes.windll.kernel32.CreateMutexW(None, False, "NireumHeatmapMutex")
-    if ctypes.windll.kernel32.GetLastError() == 183:  # ERROR_ALREADY_EXISTS
-        ctypes.windll.user32.MessageBoxW(0, "Nireum Heatmap이 이미 실행 중입니다.", "알림", 0x40)
-        sys.exit(0)
-except:
-    pass
+# [WORKER-PROCESS] 워커 프로세스(spawn)도 이 모듈을 다시 import하므로 앱 시작 시에만 호출
+# [QUOTE-HUB] 허브 모드에서는 여러 인스턴스가 페처 하나를 공유하므로 호출하지 않음
+mutex = None
+def ensure_single_instance():
+    global mutex
+    try:
+        mutex = ctypes.windll.kernel32.CreateMutexW(None, False, "NireumHeatmapMutex")
+        if ctypes.windll.kernel32.GetLastError() == 183:  # ERROR_ALREADY_EXISTS
+            ctypes.windll.user32.MessageBoxW(0, "Nireum Heatmap이 이미 실행 중입니다.", "알림", 0x40)
+            sys.exit(0)
+    except SystemExit:
+        raise
+    except:
+        pass
 
 # Windows 작업표시줄 아이콘 설정
 try:
@@ -21,29 +30,46 @@ except:
     pass
 
 
-from datetime import datetime, timezone
-try:
-    from zoneinfo import ZoneInfo
-except ImportError:
-    from backports.zoneinfo import ZoneInfo  # Python 3.8 이하 호환
+from datetime import datetime
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
-import yfinance as yf
-import pandas as pd
+import argparse
+import multiprocessing
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QLabel, QVBoxLayout, 
-                              QHBoxLayout, QPushButton, QFrame, QGraphicsDropShadowEffect, QToolTip, QDialog)
-from PyQt5.QtCore import Qt, QTimer, QPoint, pyqtSignal, QThread
+                              QHBoxLayout, QPushButton, QFrame, QGraphicsDropShadowEffect, QToolTip, QDialog, QSlider)
+from PyQt5.QtCore import Qt, QTimer, QPoint, pyqtSignal, QThread, QEventLoop
 
 from PyQt5.QtGui import QColor, QFont, QCursor, QIcon
+import numpy as np
 
 
 try:
-    from treemap_layout import calculate_treemap
+    from treemap_layout import calculate_treemap, calculate_nested_treemap, nested_to_relative
 except ImportError:
     def calculate_treemap(data, x, y, w, h, value_key): return []
+    calculate_nested_treemap = nested_to_relative = None
 
 import stocks_data
+import color_lut
+from quote_providers import make_provider
+from quote_fetcher import QuoteFetcher
+from fetch_worker import SharedQuoteBuffer, worker_main, shared_memory
+from fetch_scheduler import TokenBucket
+from quote_status import QuoteStatus, OK
+from layout_cache import make_key
+from snapshot_store import SnapshotStore, HistoryRing
+from refresh_scheduler import RefreshScheduler
+from refresh_tiers import RefreshTiers
+from quote_hub import QuoteHubServer, QuoteHubClient, default_address
+from universe import Universe
+from quote_snapshot import QuoteSnapshot
+from startup_profile import StartupProfile
+from market_stats import MarketAggregates
+from daily_closes import DailyCloses, TIMEFRAMES, COLOR_SCALE
+from market_calendar import eastern_now
+from heatmap_canvas import (HeatmapCanvas, LAYOUT_STORE, SECTOR_HEADER_H, SECTOR_MARGIN,
+                            get_nested_layout, store_nested_layout)
 
 # EXE 실행 시 실행 파일 위치, 소스 실행 시 스크립트 위치
 if getattr(sys, 'frozen', False):
@@ -52,38 +78,38 @@ else:
     BASE_PATH = Path(__file__).parent
 
 CONFIG_FILE = BASE_PATH / "config.json"
+SNAPSHOT_FILE = BASE_PATH / "snapshots.bin"
+PREV_CLOSE_FILE = BASE_PATH / "prev_close.npz"
+DAILY_CLOSE_FILE = BASE_PATH / "daily_closes.npz"
+MAX_WORKER_RESTARTS = 3  # [WORKER-PROCESS] 워커가 이보다 많이 죽으면 UI 프로세스 내 페치로 전환
 ICON_FILE = BASE_PATH / "icon.ico"
 
 # 기본 스톡 데이터가 없을 경우 stocks_data에서 가져옴
 DEFAULT_STOCKS = stocks_data.STOCKS
 
+
+_IMPORTED = time.perf_counter()  # [STARTUP-PROFILE] 모듈 import 완료 (pandas/yfinance는 포함되지 않음)
+
+
+def build_sector_data(stocks):
+    """종목 리스트를 섹터별로 묶어 [{'sector':, 'weight':, 'stocks': [...]}, ...] 반환"""
+    sectors = {}
+    for stock in stocks:
+        s = stock.get("sector", "Unknown")
+        if s not in sectors: sectors[s] = []
+        sectors[s].append(stock)
+    sector_data = []
+    for name, s_stocks in sectors.items():
+        total_w = sum(s.get("weight", 0) for s in s_stocks)
+        sector_data.append({'sector': name, 'weight': total_w, 'stocks': s_stocks})
+    # [DETERMINISTIC] 섹터 데이터를 가중치 내림차순으로 미리 정렬하여 일관된 순서 보장
+    sector_data.sort(key=lambda x: (x['weight'], x['sector']), reverse=True)
+    return sector_data
+
+
 def get_color(change):
-    """[그라데이션 개선] 등락율에 비례하는 부드러운 색상 변화"""
-    if change == 0: return "#2c2c34"  # 0%: 검회색
-    
-    # 기준 색상 정의 (더 밝고 선명한 색상)
-    base_gray = (44, 44, 52)  # #2c2c34
-    green_max = (46, 125, 50)   # #2e7d32 (밝은 진한 녹색)
-    red_max = (211, 47, 47)     # #d32f2f (밝은 진한 빨강)
-    
-    # 등락율을 0~1 범위로 정규화 (+-4% 기준으로 더 빠르게 진해지게)
-    intensity = min(abs(change) / 4.0, 1.0)
-    
-    # 비선형 스케일링 + 최소값 보장 (0.25 ~ 1.0 범위)
-    intensity = 0.25 + (intensity ** 0.6) * 0.75  # 최소 25%부터 시작
-    
-    if change > 0:
-        # 녹색 그라데이션
-        r = int(base_gray[0] + (green_max[0] - base_gray[0]) * intensity)
-        g = int(base_gray[1] + (green_max[1] - base_gray[1]) * intensity)
-        b = int(base_gray[2] + (green_max[2] - base_gray[2]) * intensity)
-    else:
-        # 빨강 그라데이션
-        r = int(base_gray[0] + (red_max[0] - base_gray[0]) * intensity)
-        g = int(base_gray[1] + (red_max[1] - base_gray[1]) * intensity)
-        b = int(base_gray[2] + (red_max[2] - base_gray[2]) * intensity)
-    
-    return f"#{r:02x}{g:02x}{b:02x}"
+    """[그라데이션 개선] 등락율에 비례하는 부드러운 색상 변화 (COLOR-LUT 조회)"""
+    return color_lut.default_lut().hex_for(change)
 
 
 class StockCell(QFrame):
@@ -91,6 +117,10 @@ class StockCell(QFrame):
         super().__init__(parent)
         self.stock = stock
         self.mini = mini
+        # [DIRTY] 마지막으로 적용한 색상/라벨 폰트 크기 (바뀐 경우에만 setStyleSheet)
+        self.current_color = None
+        self._ticker_font = None
+        self._change_font = None
         self.setObjectName("StockCell")
         self.setMouseTracking(True)
         self.tooltip_timer = QTimer(self)
@@ -117,6 +147,8 @@ class StockCell(QFrame):
             self.add_shadow(self.change_label)
         else:
             # 미니 모드: 레이아웃에 추가하지 않고 수동 위치 지정
+            # Qt는 CSS text-shadow를 지원하지 않음 - 제거
+            self.ticker_label.setStyleSheet("color: white; font-size: 6px; font-weight: bold; background: transparent; border: none;")
             self.ticker_label.setParent(self)
             self.change_label.setParent(self)
             self.ticker_label.hide()
@@ -130,7 +162,10 @@ class StockCell(QFrame):
         label.setGraphicsEffect(shadow)
 
     def update_color(self):
-        self.current_color = get_color(self.stock.get("change", 0))
+        """[DIRTY] 색상 버킷이 바뀐 경우에만 스타일시트 재적용, 변경 여부 반환"""
+        color = get_color(self.stock.get("change", 0))
+        if color == self.current_color: return False
+        self.current_color = color
         # [RESTORE] 미니 위젯에서도 기업 간 구분을 위해 1px 테두리 유지
         border_style = "1px solid rgba(0,0,0,0.25)"
         if self.mini: border_style = "1px solid rgba(10, 10, 15, 0.8)"
@@ -140,6 +175,7 @@ class StockCell(QFrame):
             hover_style = f"QFrame#StockCell:hover {{ border: 1.5px solid white; }}"
             
         self.setStyleSheet(f"QFrame#StockCell {{ background-color: {self.current_color}; border: {border_style}; border-radius: {1 if self.mini else 2}px; }} {hover_style}")
+        return True
         
     def update_tooltip(self):
         # 표준 툴팁은 끄고 커스텀 로직 사용
@@ -159,13 +195,17 @@ class StockCell(QFrame):
         QToolTip.showText(QCursor.pos(), text, self)
 
     def update_content(self):
-        self.update_color()
+        """[DIRTY] 색상/텍스트가 바뀐 경우에만 재스타일/재배치, 변경 여부 반환"""
+        dirty = self.update_color()
         if not self.mini:
             change = self.stock.get("change", 0)
             txt = f"{change:+.2f}%" if change != 0 else "-"
-            self.change_label.setText(txt)
-            self.update_tooltip()
-            self.resizeEvent(None)
+            if txt != self.change_label.text():
+                self.change_label.setText(txt)
+                self.update_tooltip()
+                self.resizeEvent(None)
+                dirty = True
+        return dirty
 
     def resizeEvent(self, event):
         w, h = self.width(), self.height()
@@ -173,9 +213,6 @@ class StockCell(QFrame):
         if self.mini:
             # [MINI-TICKER] 미니 위젯에서 큰 셀에 티커 표시 (직관성 향상)
             if w >= 12 and h >= 8:
-                self.ticker_label.setText(self.stock['ticker'])
-                # Qt는 CSS text-shadow를 지원하지 않음 - 제거
-                self.ticker_label.setStyleSheet("color: white; font-size: 6px; font-weight: bold; background: transparent; border: none;")
                 self.ticker_label.setGeometry(1, 0, w-2, h)
                 self.ticker_label.show()
             else:
@@ -197,13 +234,18 @@ class StockCell(QFrame):
             self.change_label.hide()
         else:
             self.ticker_label.show()
-            self.ticker_label.setStyleSheet(f"color: white; font-weight: 800; font-size: {int(font_size)}px; background: transparent; border: none;")
+            if self._ticker_font != int(font_size):
+                self._ticker_font = int(font_size)
+                self.ticker_label.setStyleSheet(f"color: white; font-weight: 800; font-size: {int(font_size)}px; background: transparent; border: none;")
             
             # 세로 공간이 충분하고 가로도 어느 정도 확보될 때만 등락률 표시
             if h > font_size * 2.3 and w > font_size * 2.0:
                 self.change_label.show()
                 # 등락률 폰트도 30% 증가 (0.75 → 0.8 비율)
-                self.change_label.setStyleSheet(f"color: rgba(255,255,255,0.85); font-weight: 500; font-size: {max(2, int(font_size*0.8))}px; background: transparent; border: none;")
+                change_font = max(2, int(font_size*0.8))
+                if self._change_font != change_font:
+                    self._change_font = change_font
+                    self.change_label.setStyleSheet(f"color: rgba(255,255,255,0.85); font-weight: 500; font-size: {change_font}px; background: transparent; border: none;")
 
             else:
                 self.change_label.hide()
@@ -215,7 +257,9 @@ class SectorContainer(QFrame):
         self.sector_name = sector_name
         self.stocks = stocks
         self.is_mini = is_mini
+        self.perf = None
         self.cells = []
+        self.cell_index = {}  # [INDEX] {ticker: StockCell}
         self.setup_ui()
         
     def setup_ui(self):
@@ -255,25 +299,32 @@ class SectorContainer(QFrame):
         for stock in self.stocks:
             cell = StockCell(stock, mini=self.is_mini, parent=self)
             self.cells.append(cell)
+            self.cell_index[stock['ticker']] = cell
             cell.show()
 
+    def set_performance(self, perf):
+        """[AGGREGATE] 섹터 가중 등락률 (TreemapWidget의 MarketAggregates에서 계산, NaN = 유효 비중 없음)"""
+        if perf == self.perf: return
+        self.perf = perf
+        self.update_performance()
+
     def update_performance(self):
         if self.is_mini or not hasattr(self, 'sector_perf'): return
-        valid_stocks = [s for s in self.stocks if s.get("weight", 0) > 0]
-        if not valid_stocks: return
-        total_w = sum(s["weight"] for s in valid_stocks)
-        avg_change = sum(s.get("change", 0) * s["weight"] for s in valid_stocks) / total_w
+        avg_change = self.perf
+        if avg_change is None or avg_change != avg_change: return
         # [가시성 개선] 등락률 투명도 0.55 → 0.85로 증가
         color_rgb = "76, 175, 80" if avg_change >= 0 else "239, 83, 80"
         self.sector_perf.setText(f"{avg_change:+.2f}%")
-        self.sector_perf.setStyleSheet(f"color: rgba({color_rgb}, 0.85); font-size: 9px; font-weight: 700; background: transparent; border: none;")
+        if color_rgb != getattr(self, '_perf_rgb', None):
+            self._perf_rgb = color_rgb
+            self.sector_perf.setStyleSheet(f"color: rgba({color_rgb}, 0.85); font-size: 9px; font-weight: 700; background: transparent; border: none;")
 
     def resizeEvent(self, event):
         w, h = self.width(), self.height()
         if w <= 4 or h <= 4: return # 안전 처리
         
         top_margin = 0
-        header_h = 16
+        header_h = SECTOR_HEADER_H
         
         if not self.is_mini and self.header_bg:
             self.header_bg.setGeometry(0, 0, w, header_h)
@@ -284,53 +335,33 @@ class SectorContainer(QFrame):
             else: self.header_bg.show()
             top_margin = header_h if h > 45 else 0
         
-        margin = 1 if not self.is_mini else 0
+        margin = SECTOR_MARGIN if not self.is_mini else 0
         treemap_w = w - 2*margin
         treemap_h = h - margin - top_margin
         if treemap_w <= 0 or treemap_h <= 0: return
         
-        layout_data = self.stocks
-        
-        # [LAYOUT-SYNC] 확장 위젯에서 레이아웃을 계산하고 캐시
-        if not self.is_mini:
-            rects = calculate_treemap(layout_data, margin, top_margin, treemap_w, treemap_h, value_key='weight')
-            
-            # 정규화된 좌표(0-1 비율)로 캐시
-            if self.sector_name not in TreemapWidget._cached_stock_layouts:
-                TreemapWidget._cached_stock_layouts[self.sector_name] = {}
-            
-            for rect in rects:
-                ticker = rect['data']['ticker']
-                TreemapWidget._cached_stock_layouts[self.sector_name][ticker] = {
-                    'x': (rect['x'] - margin) / treemap_w if treemap_w > 0 else 0,
-                    'y': (rect['y'] - top_margin) / treemap_h if treemap_h > 0 else 0,
-                    'w': rect['w'] / treemap_w if treemap_w > 0 else 0,
-                    'h': rect['h'] / treemap_h if treemap_h > 0 else 0,
-                    'data': rect['data']
-                }
+        # [LAYOUT-SYNC] TreemapWidget이 한 번에 계산한 정규화 레이아웃을 스케일링해서 사용 (확장/미니 공통)
+        cached = TreemapWidget._cached_stock_layouts.get(self.sector_name)
+        if cached:
+            rects = []
+            for ticker, c in cached.items():
+                rects.append({
+                    'x': c['x'] * treemap_w + margin,
+                    'y': c['y'] * treemap_h + top_margin,
+                    'w': c['w'] * treemap_w,
+                    'h': c['h'] * treemap_h,
+                    'data': c['data']
+                })
         else:
-            # 미니 위젯: 캐시된 레이아웃을 스케일링해서 사용
-            cached = TreemapWidget._cached_stock_layouts.get(self.sector_name)
-            if cached:
-                rects = []
-                for ticker, c in cached.items():
-                    rects.append({
-                        'x': c['x'] * treemap_w + margin,
-                        'y': c['y'] * treemap_h + top_margin,
-                        'w': c['w'] * treemap_w,
-                        'h': c['h'] * treemap_h,
-                        'data': c['data']
-                    })
-            else:
-                # 캐시가 없으면 직접 계산 (펴백)
-                rects = calculate_treemap(layout_data, margin, top_margin, treemap_w, treemap_h, value_key='weight')
+            # 캐시가 없으면 직접 계산 (펴백)
+            rects = calculate_treemap(self.stocks, margin, top_margin, treemap_w, treemap_h, value_key='weight')
         
         boundary_x = margin + treemap_w
         boundary_y = top_margin + treemap_h
         
         for rect in rects:
             stock_data = rect['data']
-            target_cell = next((c for c in self.cells if c.stock['ticker'] == stock_data['ticker']), None)
+            target_cell = self.cell_index.get(stock_data['ticker'])
             if target_cell:
                 # [SMART-ROUNDING] w = round(x+w) - round(x)
                 ix, iy = round(rect['x']), round(rect['y'])
@@ -352,35 +383,34 @@ class SectorContainer(QFrame):
                 target_cell.setGeometry(ix, iy, iw, ih)
 
     def update_cells(self):
-        for cell in self.cells: cell.update_content()
-        self.update_performance()
+        """[DIRTY] 바뀐 셀 수 반환 (섹터 등락률은 set_performance로 갱신)"""
+        return sum(1 for cell in self.cells if cell.update_content())
 
 
 class TreemapWidget(QFrame):
     # [LAYOUT-CACHE] 확장 위젯의 레이아웃을 캐시하여 미니 위젯에서 재사용
     _cached_sector_layout = None  # {sector_name: {'x': 0-1, 'y': 0-1, 'w': 0-1, 'h': 0-1}}
     _cached_stock_layouts = {}    # {sector_name: {ticker: {'x': 0-1, 'y': 0-1, 'w': 0-1, 'h': 0-1}}}
+    _cached_layout_key = None     # 현재 캐시에 반영된 레이아웃 키 (유니버스 해시 + 크기)
     
-    def __init__(self, stocks, is_mini=False, parent=None):
+    def __init__(self, universe, is_mini=False, parent=None):
         super().__init__(parent)
-        self.stocks = stocks
+        self.universe = universe
+        # [UNIVERSE] 셀이 참조하는 종목 dict는 위젯 전용 사본 (GUI 스레드에서만 갱신)
+        self.stocks = universe.records()
         self.is_mini = is_mini
         self.sector_containers = []
+        self.container_index = {}  # [INDEX] {sector_name: SectorContainer}
+        self._unsaved_layout = None  # [LAYOUT-DEFER] 표시 전 크기로 계산한 레이아웃 (key, table, w, h)
+        self._placed_key = None  # 마지막 컨테이너 배치 기준 (w, h, universe_hash, _cached_layout_key)
         self.setup_base()
         
     def setup_base(self):
-        sectors = {}
-        for stock in self.stocks:
-            s = stock.get("sector", "Unknown")
-            if s not in sectors: sectors[s] = []
-            sectors[s].append(stock)
-        sector_data = []
-        for name, s_stocks in sectors.items():
-            total_w = sum(s.get("weight", 0) for s in s_stocks)
-            sector_data.append({'sector': name, 'weight': total_w, 'stocks': s_stocks})
-        # [DETERMINISTIC] 섹터 데이터를 가중치 내림차순으로 미리 정렬하여 일관된 순서 보장
-        sector_data.sort(key=lambda x: (x['weight'], x['sector']), reverse=True)
+        sector_data = build_sector_data(self.stocks)
         self.sector_data = sector_data
+        self.universe_hash = self.universe.hash
+        # [AGGREGATE] 섹터 순서는 유니버스 섹터 순서와 같음 (build_sector_data와 동일 정렬)
+        self.stats = MarketAggregates(self.universe.weights[self.universe.order], self.universe.sector_offsets)
         
         # [LAYOUT-INIT] is_mini여도 캐시가 없으면 확장 위젯 크기로 레이아웃 미리 계산
         if TreemapWidget._cached_sector_layout is None:
@@ -389,78 +419,87 @@ class TreemapWidget(QFrame):
         for s_data in sector_data:
             container = SectorContainer(s_data['sector'], s_data['stocks'], is_mini=self.is_mini, parent=self)
             self.sector_containers.append(container)
+            self.container_index[s_data['sector']] = container
             container.show()
     
     def _init_layout_cache(self):
         """[캐시 초기화] 확장 위젯 크기(1200x800)로 레이아웃을 계산하여 캐시 생성"""
-        w, h = 1200, 800
-        rects = calculate_treemap(self.sector_data, 0, 0, w, h, value_key='weight')
+        self._update_layout_cache(1200, 800)
+
+    def _update_layout_cache(self, w, h, persist=True):
+        """[NESTED-LAYOUT] 섹터/종목 레이아웃을 한 번에 계산하여 정규화 좌표(0-1 비율)로 캐시"""
+        if calculate_nested_treemap is None: return
+        if make_key(self.universe_hash, w, h, SECTOR_HEADER_H, SECTOR_MARGIN) == TreemapWidget._cached_layout_key:
+            return  # 유니버스/크기 변화 없음
+        
+        # [PERSISTENT] 같은 유니버스/크기의 레이아웃이 디스크에 있으면 계산 생략
+        key, table = get_nested_layout(self.sector_data, self.universe_hash, w, h, persist=persist)
+        self._unsaved_layout = None if persist else (key, table, w, h)
+        TreemapWidget._cached_layout_key = key
+        rects, top = table['rects'].tolist(), table['top'].tolist()
         
         TreemapWidget._cached_sector_layout = {}
-        for rect in rects:
-            sector_name = rect['data']['sector']
+        row = table['n_sectors']
+        for si, s_data in enumerate(self.sector_data):
+            sector_name = s_data['sector']
+            sx, sy, sw, sh = rects[si]
             TreemapWidget._cached_sector_layout[sector_name] = {
-                'x': rect['x'] / w,
-                'y': rect['y'] / h,
-                'w': rect['w'] / w,
-                'h': rect['h'] / h,
-                'data': rect['data']
+                'x': sx / w, 'y': sy / h, 'w': sw / w, 'h': sh / h, 'data': s_data
             }
             
-            # 종목 레이아웃도 미리 계산
-            s_stocks = rect['data']['stocks']
-            s_w, s_h = rect['w'], rect['h']
-            if s_w > 0 and s_h > 0:
-                stock_rects = calculate_treemap(s_stocks, 0, 0, s_w, s_h, value_key='weight')
-                TreemapWidget._cached_stock_layouts[sector_name] = {}
-                for sr in stock_rects:
-                    ticker = sr['data']['ticker']
-                    TreemapWidget._cached_stock_layouts[sector_name][ticker] = {
-                        'x': sr['x'] / s_w,
-                        'y': sr['y'] / s_h,
-                        'w': sr['w'] / s_w,
-                        'h': sr['h'] / s_h,
-                        'data': sr['data']
+            # 종목 좌표는 섹터 내부 트리맵 영역(헤더/마진 제외) 기준으로 정규화
+            s_stocks = s_data['stocks']
+            inner_x, inner_y = sx + SECTOR_MARGIN, sy + top[si]
+            inner_w, inner_h = sw - 2 * SECTOR_MARGIN, sh - SECTOR_MARGIN - top[si]
+            if inner_w > 0 and inner_h > 0:
+                TreemapWidget._cached_stock_layouts[sector_name] = {
+                    stock['ticker']: {
+                        'x': (x - inner_x) / inner_w,
+                        'y': (y - inner_y) / inner_h,
+                        'w': cw / inner_w,
+                        'h': ch / inner_h,
+                        'data': stock
                     }
-            
+                    for stock, (x, y, cw, ch) in zip(s_stocks, rects[row:row + len(s_stocks)])
+                }
+            else:
+                TreemapWidget._cached_stock_layouts.pop(sector_name, None)
+            row += len(s_stocks)
+
+    def showEvent(self, event):
+        """[LAYOUT-DEFER] 표시 전에 계산한 레이아웃이 실제 표시 크기와 같으면 그때 디스크 캐시에 저장"""
+        super().showEvent(event)
+        pending, self._unsaved_layout = self._unsaved_layout, None
+        if pending is not None and pending[2:] == (self.width(), self.height()):
+            store_nested_layout(*pending)
+
     def resizeEvent(self, event):
         w, h = self.width(), self.height()
         if w <= 0 or h <= 0: return
         
-        # [LAYOUT-SYNC] 확장 위젯(is_mini=False)에서 레이아웃을 계산하고 캐시
+        # [LAYOUT-SYNC] 확장 위젯(is_mini=False)에서 섹터+종목 레이아웃을 한 번에 계산하고 캐시
+        # [LAYOUT-DEFER] 표시 전(생성 직후 기본 크기)에는 디스크 캐시에 넣지 않음
         if not self.is_mini:
-            rects = calculate_treemap(self.sector_data, 0, 0, w, h, value_key='weight')
-            
-            # 정규화된 좌표(0-1 비율)로 캐시
-            TreemapWidget._cached_sector_layout = {}
-            for rect in rects:
-                sector_name = rect['data']['sector']
-                TreemapWidget._cached_sector_layout[sector_name] = {
-                    'x': rect['x'] / w,
-                    'y': rect['y'] / h,
-                    'w': rect['w'] / w,
-                    'h': rect['h'] / h,
-                    'data': rect['data']
-                }
+            self._update_layout_cache(w, h, persist=self.isVisible())
+        
+        # 캐시된 레이아웃을 스케일링해서 사용 (미니 위젯은 확장 위젯 레이아웃을 재사용)
+        if TreemapWidget._cached_sector_layout:
+            rects = []
+            for sector_name, cached in TreemapWidget._cached_sector_layout.items():
+                rects.append({
+                    'x': cached['x'] * w,
+                    'y': cached['y'] * h,
+                    'w': cached['w'] * w,
+                    'h': cached['h'] * h,
+                    'data': cached['data']
+                })
         else:
-            # 미니 위젯: 캐시된 레이아웃을 스케일링해서 사용
-            if TreemapWidget._cached_sector_layout:
-                rects = []
-                for sector_name, cached in TreemapWidget._cached_sector_layout.items():
-                    rects.append({
-                        'x': cached['x'] * w,
-                        'y': cached['y'] * h,
-                        'w': cached['w'] * w,
-                        'h': cached['h'] * h,
-                        'data': cached['data']
-                    })
-            else:
-                # 캐시가 없으면 직접 계산 (펴백)
-                rects = calculate_treemap(self.sector_data, 0, 0, w, h, value_key='weight')
+            # 캐시가 없으면 직접 계산 (펴백)
+            rects = calculate_treemap(self.sector_data, 0, 0, w, h, value_key='weight')
 
         for rect in rects:
             s_data = rect['data']
-            container = next((c for c in self.sector_containers if c.sector_name == s_data['sector']), None)
+            container = self.container_index.get(s_data['sector'])
             if container:
                 # [SMART-ROUNDING]
                 ix, iy = round(rect['x']), round(rect['y'])
@@ -472,29 +511,63 @@ class TreemapWidget(QFrame):
                 if iy + ih >= h - 1: ih = max(ih, h - iy)
                     
                 container.setGeometry(ix, iy, iw, ih)
+        self._placed_key = (w, h, self.universe_hash, TreemapWidget._cached_layout_key)
+
+    def relayout(self):
+        """[LAYOUT-SYNC] 크기/유니버스/공유 레이아웃 캐시가 바뀐 경우에만 컨테이너 재배치 (갱신마다 호출)"""
+        if (self.width(), self.height(), self.universe_hash, TreemapWidget._cached_layout_key) == self._placed_key:
+            return False
+        self.resizeEvent(None)
+        return True
 
     def update_all_cells(self):
-        for container in self.sector_containers: container.update_cells()
+        # [UNIVERSE] 유니버스 등락률 배열 → 위젯 전용 종목 dict
+        for stock, change in zip(self.stocks, self.universe.change.tolist()):
+            stock['change'] = change
+        dirty = sum(container.update_cells() for container in self.sector_containers)
+        self.stats.update(self.universe.change[self.universe.order])
+        for container, perf in zip(self.sector_containers, self.stats.sector_changes().tolist()):
+            container.set_performance(perf)
+        return dirty
 
     def clear_containers(self):
         for c in self.sector_containers:
             for cell in c.cells: cell.setParent(None); cell.deleteLater()
             c.setParent(None); c.deleteLater()
         self.sector_containers = []
+        self.container_index = {}
 
-    def refresh_data(self, stocks):
-        self.stocks = stocks
+    def refresh_data(self, universe):
+        self.universe = universe
+        self.stocks = universe.records()
         self.clear_containers()
         self.setup_base()
         self.resizeEvent(None)
 
+    def set_universe(self, universe):
+        """유니버스 구성이 바뀐 경우에만 셀 재구성 (등락률은 update_all_cells에서 반영)"""
+        if universe is not self.universe and universe.hash != self.universe.hash:
+            self.refresh_data(universe)
+        self.universe = universe
+
 
 class ExpandedWidget(QWidget):
-    closed = pyqtSignal(); position_changed = pyqtSignal(int, int)
-    def __init__(self, stocks, parent=None):
+    closed = pyqtSignal(); position_changed = pyqtSignal(int, int); refresh_requested = pyqtSignal()
+    def __init__(self, universe, legacy=False, parent=None):
         super().__init__(parent)
-        self.stocks = stocks
+        self.universe = universe
+        self.legacy = legacy
         self.dragging = False; self.drag_position = QPoint()
+        # [STALE] 표시 중인 데이터 시각(epoch, None이면 현재 시각)과 stale 종목 수
+        self.data_time = None
+        self.stale_count = 0
+        self.tier_freshness = []  # [REFRESH-TIERS] [(이름, 종목 수, 가장 오래된 성공 시각 epoch)]
+        # [REPLAY] 히스토리 링 버퍼 + 재생 위치 (None이면 실시간)
+        self.history = None
+        self.replay_index = None
+        # [TIMEFRAME] 표시 기간 + 일봉 종가 캐시 (None이면 1D만 선택 가능)
+        self.timeframe = "1D"
+        self.daily_closes = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -525,8 +598,26 @@ class ExpandedWidget(QWidget):
         header = QHBoxLayout()
         header.setContentsMargins(0, 0, 0, 0)
         
-        # 중앙 정렬을 위한 왼쪽 더미 스페이서 (오른쪽 닫기 버튼 폭 고려)
-        header.addSpacing(32) 
+        # [TIMEFRAME] 기간 선택 (일봉 종가 캐시가 준비되기 전에는 1D만 활성)
+        header.addSpacing(8)
+        self.timeframe_buttons = {}
+        for tf in TIMEFRAMES:
+            btn = QPushButton(tf)
+            btn.setCheckable(True)
+            btn.setChecked(tf == self.timeframe)
+            btn.setEnabled(tf == "1D")
+            btn.setFixedSize(34, 20)
+            btn.setStyleSheet("""
+                QPushButton { background: transparent; border: 1px solid rgba(255,255,255,0.15); border-radius: 3px;
+                              color: rgba(255,255,255,0.45); font-size: 10px; }
+                QPushButton:hover { color: white; }
+                QPushButton:checked { background: rgba(255,255,255,0.15); color: white; }
+                QPushButton:disabled { color: rgba(255,255,255,0.15); border-color: rgba(255,255,255,0.06); }
+            """)
+            btn.clicked.connect(lambda _, tf=tf: self.set_timeframe(tf))
+            header.addWidget(btn)
+            self.timeframe_buttons[tf] = btn
+            btn.setVisible(not self.legacy)
         header.addStretch()
         
         # 타이틀 및 수익률 컨테이너
@@ -535,8 +626,12 @@ class ExpandedWidget(QWidget):
         self.title_label.setStyleSheet("color: white; font-size: 24px; font-weight: 800; border: none;")
         self.change_label = QLabel("")
         self.change_label.setStyleSheet("color: #aaa; font-size: 16px; border: none; margin-left: 10px;")
+        # [AGGREGATE] 시장 폭 (상승/하락 종목 수, 툴팁: 등락률 분포 백분위)
+        self.breadth_label = QLabel("")
+        self.breadth_label.setStyleSheet("color: rgba(255,255,255,0.45); font-size: 11px; border: none; margin-left: 10px;")
         title_container.addWidget(self.title_label)
         title_container.addWidget(self.change_label)
+        title_container.addWidget(self.breadth_label)
         header.addLayout(title_container)
         
         header.addStretch()
@@ -546,8 +641,32 @@ class ExpandedWidget(QWidget):
         self.update_time_label.setStyleSheet("color: rgba(255,255,255,0.4); font-size: 11px; border: none;")
         header.addWidget(self.update_time_label)
         
+        # [REFRESH-TIERS] 계층별 최신성 (계층 내 가장 오래된 갱신 시각)
+        header.addSpacing(8)
+        self.tier_label = QLabel("")
+        self.tier_label.setStyleSheet("color: rgba(255,255,255,0.3); font-size: 10px; border: none;")
+        header.addWidget(self.tier_label)
+        
         header.addSpacing(10)
         
+        # [새로고침 버튼] 다음 예약 시각을 기다리지 않고 즉시 갱신 (F5)
+        refresh_btn = QPushButton("⟳")
+        refresh_btn.setFixedSize(24, 24)
+        refresh_btn.setToolTip("Refresh now (F5)")
+        refresh_btn.setStyleSheet("""
+            QPushButton { 
+                background: transparent; 
+                border: none; 
+                color: rgba(255,255,255,0.4); 
+                font-size: 15px; 
+            } 
+            QPushButton:hover { 
+                color: white; 
+            }
+        """)
+        refresh_btn.clicked.connect(self.refresh_requested.emit)
+        header.addWidget(refresh_btn)
+        
         # [About 버튼] 정보 창 열기
         about_btn = QPushButton("ⓘ")
         about_btn.setFixedSize(24, 24)
@@ -588,12 +707,135 @@ class ExpandedWidget(QWidget):
         layout.addLayout(header)
         
         # --- Heatmap ---
-        self.treemap = TreemapWidget(self.stocks, is_mini=False)
-        layout.addWidget(self.treemap)
+        # [CANVAS] 기본은 단일 캔버스, legacy면 종목별 위젯 트리
+        treemap_cls = TreemapWidget if self.legacy else HeatmapCanvas
+        self.treemap = treemap_cls(self.universe, is_mini=False)
+        layout.addWidget(self.treemap, 1)
+
+        # --- Timeline ---
+        # [REPLAY] 갱신 히스토리 타임라인 (캔버스 모드 전용, 오른쪽 끝 = 실시간)
+        self.timeline = QWidget()
+        self.timeline.setFixedHeight(22)
+        timeline = QHBoxLayout(self.timeline)
+        timeline.setContentsMargins(8, 0, 8, 2); timeline.setSpacing(8)
+        self.timeline_slider = QSlider(Qt.Horizontal)
+        self.timeline_slider.setRange(0, 0)
+        self.timeline_slider.setStyleSheet("""
+            QSlider::groove:horizontal { height: 4px; background: rgba(255,255,255,0.12); border-radius: 2px; }
+            QSlider::handle:horizontal { width: 10px; margin: -4px 0; background: rgba(255,255,255,0.6); border-radius: 5px; }
+        """)
+        self.timeline_slider.valueChanged.connect(self.on_timeline_changed)
+        self.timeline_label = QLabel("LIVE")
+        self.timeline_label.setFixedWidth(110)
+        self.timeline_label.setStyleSheet("color: rgba(255,255,255,0.5); font-size: 11px; border: none;")
+        live_btn = QPushButton("LIVE")
+        live_btn.setFixedSize(40, 18)
+        live_btn.setStyleSheet("""
+            QPushButton { background: transparent; border: 1px solid rgba(255,255,255,0.2); border-radius: 3px;
+                          color: rgba(255,255,255,0.5); font-size: 10px; }
+            QPushButton:hover { color: white; border-color: rgba(255,255,255,0.5); }
+        """)
+        live_btn.clicked.connect(self.go_live)
+        timeline.addWidget(self.timeline_slider)
+        timeline.addWidget(self.timeline_label)
+        timeline.addWidget(live_btn)
+        layout.addWidget(self.timeline)
+        self.timeline.setVisible(not self.legacy)
+
+    def set_daily_closes(self, daily_closes):
+        """[TIMEFRAME] 일봉 종가 캐시 연결/교체 (동기화 완료마다 호출), 선택 중인 기간은 새 배율로 다시 색칠"""
+        self.daily_closes = daily_closes
+        for tf, btn in self.timeframe_buttons.items():
+            btn.setEnabled(tf == "1D" or daily_closes.factors(tf) is not None)
+        self.set_timeframe(self.timeframe)
+
+    def set_timeframe(self, timeframe):
+        """[TIMEFRAME] 기간 전환: 캐시된 배율 × 현재 등락률로 다시 색칠 (네트워크 요청 없음)"""
+        if self.legacy: return  # 레거시 위젯은 기간별 보기 미지원 (기간 선택 숨김)
+        factors = None
+        if timeframe != "1D" and self.daily_closes is not None:
+            factors = self.daily_closes.factors(timeframe)
+        if factors is None: timeframe = "1D"
+        self.timeframe = timeframe
+        for tf, btn in self.timeframe_buttons.items():
+            btn.setChecked(tf == timeframe)
+        self.treemap.set_timeframe(factors, color_lut.scaled_lut(COLOR_SCALE[timeframe]))
+        self.update_index()
+
+    def set_history(self, history):
+        """[REPLAY] 히스토리 링 버퍼 연결 (갱신마다 history_appended 호출)"""
+        if self.legacy: return  # 레거시 위젯은 히스토리 재생 미지원 (타임라인 숨김, history는 None 유지)
+        self.history = history
+        self._history_dropped = history.dropped
+        self.history_appended()
+
+    def history_appended(self):
+        """새 스냅샷이 추가됨: 슬라이더 범위 확장, 실시간 보기 중이면 오른쪽 끝 유지"""
+        if self.history is None: return
+        live = self.replay_index is None
+        # 링 버퍼가 가득 차 있었으면 가장 오래된 항목이 밀려난 만큼 인덱스가 앞으로 당겨짐
+        shift = self.history.dropped - self._history_dropped
+        self._history_dropped = self.history.dropped
+        self.timeline_slider.blockSignals(True)
+        self.timeline_slider.setRange(0, max(0, len(self.history) - 1))
+        if live:
+            self.timeline_slider.setValue(self.timeline_slider.maximum())
+        elif shift:
+            # 재생 중이던 시점을 계속 가리키도록 보정 (그 시점까지 밀려났으면 가장 오래된 항목)
+            self.replay_index = max(0, self.replay_index - shift)
+            self.timeline_slider.setValue(self.replay_index)
+        self.timeline_slider.blockSignals(False)
+        if not live and shift:
+            self.show_replay()
+
+    def on_timeline_changed(self, value):
+        if self.history is None or len(self.history) == 0: return
+        if value >= len(self.history) - 1:
+            self.go_live(); return
+        self.replay_index = value
+        self.show_replay()
+
+    def go_live(self):
+        self.replay_index = None
+        if self.history is not None:
+            self.timeline_slider.blockSignals(True)
+            self.timeline_slider.setValue(self.timeline_slider.maximum())
+            self.timeline_slider.blockSignals(False)
+            self.treemap.set_replay(None)
+        self.update_view()
+
+    def show_replay(self):
+        """[REPLAY] 링 버퍼의 과거 등락률로 타일/헤더만 다시 그림 (레이아웃/네트워크 없음)"""
+        timestamp, changes = self.history.at(self.replay_index)
+        self.treemap.set_replay(changes)
+        self.update_index()
+        ts = datetime.fromtimestamp(timestamp)
+        self.timeline_label.setText(f"Replay {ts.strftime('%H:%M' if ts.date() == datetime.now().date() else '%m/%d %H:%M')}")
+        self.timeline_label.setStyleSheet("color: #ffb74d; font-size: 11px; border: none;")
+
+    def update_index(self):
+        """헤더 지수 등락률 + 시장 폭 (트리맵의 MarketAggregates 값)"""
+        stats = self.treemap.stats
+        self.set_index_change(stats.index_change)
+        self.breadth_label.setText(f"▲{stats.advancers}  ▼{stats.decliners}")
+        pct = stats.percentiles()
+        self.breadth_label.setToolTip(
+            f"Advancers {stats.advancers} / Decliners {stats.decliners} / Unchanged {stats.unchanged}<br>"
+            + "  ".join(f"P{p}: {v:+.2f}%" for p, v in pct.items()))
+
+    def set_index_change(self, avg_change):
+        # [STYLE-FIX] 등락율: 더 굵고 선명하게
+        c_color = "#4caf50" if avg_change >= 0 else "#ef5350"  # 더 선명한 초록/빨강
+        self.change_label.setText(f"{avg_change:+.2f}%")
+        self.change_label.setStyleSheet(f"color: {c_color}; font-size: 20px; border: none; margin-left: 12px; font-weight: 800;")
 
     def contextMenuEvent(self, event):
         pass
 
+    def keyPressEvent(self, e):
+        if e.key() == Qt.Key_F5: self.refresh_requested.emit()
+        else: super().keyPressEvent(e)
+
     def mousePressEvent(self, e):
         if e.button() == Qt.LeftButton and e.pos().y() < 40: self.dragging = True; self.drag_position = e.globalPos() - self.frameGeometry().topLeft()
     def mouseMoveEvent(self, e):
@@ -608,20 +850,26 @@ class ExpandedWidget(QWidget):
 
     def update_view(self): 
         try:
+            if self.replay_index is not None:
+                self.show_replay(); return  # 재생 중에는 실시간 값으로 덮어쓰지 않음
             self.treemap.update_all_cells()
             
-            # [FIX] 모든 종목의 변화율 평균 계산 (0.00%도 표시되도록)
-            changes = [s.get("change", 0) for s in self.stocks]
-            avg_change = sum(changes) / len(changes) if changes else 0
-            
-            # [STYLE-FIX] 등락율: 더 굵고 선명하게
-            c_color = "#4caf50" if avg_change >= 0 else "#ef5350"  # 더 선명한 초록/빨강
-            self.change_label.setText(f"{avg_change:+.2f}%")
-            self.change_label.setStyleSheet(f"color: {c_color}; font-size: 20px; border: none; margin-left: 12px; font-weight: 800;")
+            # [AGGREGATE] 지수 등락률은 시가총액 가중 (0.00%도 표시)
+            self.update_index()
+            self.timeline_label.setText("LIVE")
+            self.timeline_label.setStyleSheet("color: rgba(255,255,255,0.5); font-size: 11px; border: none;")
             
-            # [갱신 시간] 마지막 업데이트 시간 표시
-            from datetime import datetime
-            self.update_time_label.setText(f"Last: {datetime.now().strftime('%H:%M')}")
+            # [갱신 시간] 마지막 업데이트 시간 표시 (이전 세션 스냅샷이면 날짜 포함 + stale 개수)
+            ts = datetime.fromtimestamp(self.data_time) if self.data_time else datetime.now()
+            text = f"Last: {ts.strftime('%H:%M' if ts.date() == datetime.now().date() else '%m/%d %H:%M')}"
+            if self.stale_count: text += f" ({self.stale_count} stale)"
+            self.update_time_label.setText(text)
+            self.tier_label.setText("  ".join(
+                f"{name} {datetime.fromtimestamp(t).strftime('%H:%M') if t > 0 else '--:--'}"
+                for name, _, t in self.tier_freshness))
+            self.tier_label.setToolTip("<br>".join(
+                f"{name}: {count} tickers, oldest update {datetime.fromtimestamp(t).strftime('%H:%M:%S') if t > 0 else 'never'}"
+                for name, count, t in self.tier_freshness))
 
         except Exception: pass
     
@@ -739,9 +987,10 @@ class ExpandedWidget(QWidget):
 
 class MiniWidget(QWidget):
     clicked = pyqtSignal(); position_changed = pyqtSignal(int, int)
-    def __init__(self, stocks, parent=None):
+    def __init__(self, universe, legacy=False, parent=None):
         super().__init__(parent)
-        self.stocks = stocks
+        self.universe = universe
+        self.legacy = legacy
         self.dragging = False; self.drag_position = QPoint(); self.click_pos = None
         self.setup_ui()
         
@@ -758,7 +1007,8 @@ class MiniWidget(QWidget):
         # [BEZEL-FIX] 베젤이 왼쪽/위만 보이던 문제 해결: main_frame을 전체 범위에서 2px 안쪽으로 배치
         self.main_frame.setGeometry(2, 2, W - 4, H - 4)
         layout = QVBoxLayout(self.main_frame); layout.setContentsMargins(1, 1, 1, 1)
-        self.treemap = TreemapWidget(self.stocks, is_mini=True)
+        treemap_cls = TreemapWidget if self.legacy else HeatmapCanvas
+        self.treemap = treemap_cls(self.universe, is_mini=True)
         layout.addWidget(self.treemap)
         self.close_btn = QPushButton("✕", self)
         self.close_btn.setFixedSize(BTN_SIZE, BTN_SIZE)
@@ -783,123 +1033,209 @@ class MiniWidget(QWidget):
             self.position_changed.emit(self.pos().x(), self.pos().y())
     def update_view(self):
         self.treemap.update_all_cells()
-        self.treemap.resizeEvent(None)
+        self.treemap.relayout()
 
 
 class DataFetcher(QThread):
-    data_updated = pyqtSignal(list)
-    def __init__(self, stocks): super().__init__(); self.stocks = stocks
+    data_updated = pyqtSignal(object)           # [QUOTE-SNAPSHOT] 갱신 완료 후 새로 만든 불변 스냅샷
+    batch_updated = pyqtSignal(object, object)  # [STREAMING] (유니버스 인덱스 배열, 등락률 배열)
+    def __init__(self, universe, fetch_options=None, provider=None, record_dir=None, streaming=True,
+                 status=None, store=None, request_mask=None, bucket=None):
+        super().__init__()
+        self.streaming = streaming
+        self.request_mask = request_mask  # [REFRESH-TIERS] 이번 회차에 요청할 종목 (None이면 전체)
+        # [QUOTE-FETCHER] 갱신 로직은 Qt와 분리 (워커 프로세스 모드와 공용)
+        # 상태 모델/공급자는 갱신 간 유지를 위해 앱이 소유
+        self.core = QuoteFetcher(universe.tickers.tolist(), universe.weights,
+                                 provider if provider is not None else make_provider(),
+                                 status if status is not None else QuoteStatus(len(universe)),
+                                 fetch_options, store=store, record_dir=record_dir, bucket=bucket)
+        self.changes = np.full(len(universe), np.nan)  # 유니버스 인덱스 정렬 (NaN = 이번 페치 실패)
     
+    def _on_batch(self, indices, changes):
+        """[STREAMING] 배치 완료 즉시 부분 결과(인덱스 + 등락률)를 UI로 전달"""
+        self.batch_updated.emit(indices, changes)
+
     def run(self):
-        batch_size = 50
-        all_tickers = [s['ticker'] for s in self.stocks]
-        
+        # [QUOTE-SNAPSHOT] 상태 모델은 페치 중 이 스레드만 수정, GUI에는 복사본으로 만든 새 스냅샷만 전달
         try:
-            print(f"[INFO] 데이터 페치 시작... ({len(all_tickers)}개 종목)")
-            full_df = pd.DataFrame()
-            failed_tickers = []  # 실패한 종목 추적
-            
-            for i in range(0, len(all_tickers), batch_size):
-                batch = all_tickers[i:i+batch_size]
-                if not batch: continue
-                if i > 0: time.sleep(2.0) # Safety Delay
-                try:
-                    df = yf.download(batch, period="2d", group_by='ticker', progress=False, threads=True)
-                    if not df.empty:
-                        if full_df.empty: full_df = df
-                        else: full_df = pd.concat([full_df, df], axis=1)
-                except: continue
-                    
-            if not full_df.empty:
-                for stock in self.stocks:
-                    try:
-                        t = stock['ticker']
-                        if isinstance(full_df.columns, pd.MultiIndex):
-                            if t in full_df.columns.levels[0]: 
-                                data = full_df[t].ffill().dropna(subset=['Close'])
-                            else: continue
-                        else:
-                            data = full_df.ffill().dropna(subset=['Close']) if len(all_tickers) == 1 else pd.DataFrame()
-
-                        if not data.empty and len(data) >= 1:
-                            last_row = data.iloc[-1]
-                            price = last_row['Close']
-                            
-                            # nan 체크 강화
-                            if pd.isna(price) and len(data) >= 2:
-                                price = data.iloc[-2]['Close']
-                                
-                            prev_close = 0
-                            if len(data) >= 2: prev_close = data.iloc[-2]['Close']
-                            
-                            # prev_close nan 체크 및 Open가 보완
-                            if (pd.isna(prev_close) or prev_close <= 0) and 'Open' in last_row:
-                                prev_close = last_row['Open']
-                            
-                            if pd.notna(price) and pd.notna(prev_close) and prev_close > 0:
-                                change = ((price - prev_close) / prev_close) * 100
-                                stock['change'] = round(change, 2)
-                                # [DEBUG] Major stocks debug log
-                                if t in ['AAPL', 'MSFT', 'FICO', 'KMI']:
-                                    print(f"[CALC] {t}: price={price:.2f}, prev={prev_close:.2f}, change={change:.2f}%")
-                            # [CACHE] New data failed, keep old value
-                    except Exception as ex:
-                        # [DEBUG] Exception log
-                        print(f"[WARN] {t} processing error: {ex}")
-
-                    
-            # [SUCCESS/FAIL STATS]
-            success_count = sum(1 for s in self.stocks if s.get('change', 0) != 0)
-            failed_list = [s['ticker'] for s in self.stocks if s.get('change', 0) == 0]
-            print(f"[INFO] Fetch complete: {success_count}/{len(self.stocks)} success")
-            
-            # [RETRY] Retry failed tickers individually
-            if failed_list:
-                print(f"[RETRY] Retrying {len(failed_list)} failed tickers: {failed_list}")
-                time.sleep(1.0)
-                for ticker in failed_list:
-                    try:
-                        df = yf.download(ticker, period="2d", progress=False)
-                        if not df.empty:
-                            # Fix: dropna without subset, check Close column exists
-                            if 'Close' in df.columns:
-                                df = df.ffill().dropna()
-                            if len(df) >= 1:
-                                price = df.iloc[-1]['Close'] if 'Close' in df.columns else None
-                                prev_close = df.iloc[-2]['Close'] if len(df) >= 2 and 'Close' in df.columns else None
-                                if prev_close is None and 'Open' in df.columns:
-                                    prev_close = df.iloc[-1]['Open']
-
-                                if pd.notna(price) and pd.notna(prev_close) and prev_close > 0:
-                                    change = ((price - prev_close) / prev_close) * 100
-                                    # Find and update the stock
-                                    for s in self.stocks:
-                                        if s['ticker'] == ticker:
-                                            s['change'] = round(change, 2)
-                                            print(f"[RETRY] {ticker}: success, change={change:.2f}%")
-                                            break
-                    except Exception as ex:
-                        print(f"[RETRY] {ticker}: failed - {ex}")
-            
-            # Final stats
-            final_success = sum(1 for s in self.stocks if s.get('change', 0) != 0)
-            final_failed = [s['ticker'] for s in self.stocks if s.get('change', 0) == 0]
-            print(f"[INFO] Final: {final_success}/{len(self.stocks)} success")
-            if final_failed:
-                print(f"[WARN] Still failed: {final_failed}")
-            
-            self.data_updated.emit(self.stocks)
+            self.changes = self.core.fetch(self.request_mask, on_batch=self._on_batch if self.streaming else None)
         except Exception as e: 
             print(f"[ERROR] Fetch failed: {e}")
-            self.data_updated.emit(self.stocks)
+        status = self.core.status
+        self.data_updated.emit(QuoteSnapshot.capture(status.value, status.status, status.last_success))
+
+
+
+class ProcessFetcher(QThread):
+    """
+    [WORKER-PROCESS] 페치/파싱 워커 프로세스 프록시
+    요청은 파이프로 보내고, 이 스레드는 결과 메시지만 받아 시그널로 전달 (pandas 객체는 GUI에 오지 않음)
+    """
+    data_ready = pyqtSignal(int, int)           # (seq, slot)
+    batch_updated = pyqtSignal(object, object)  # [STREAMING] (유니버스 인덱스 배열, 등락률 배열)
+    history_synced = pyqtSignal(bool)           # [TIMEFRAME] 워커의 일봉 종가 동기화 완료 (파일 갱신 여부)
+    worker_lost = pyqtSignal()                  # 워커 프로세스가 예기치 않게 종료됨 (크래시/OOM/kill)
+
+    def __init__(self, universe, provider_name, provider_options, fetch_options=None, store_path=None, store_max=720,
+                 record_dir=None):
+        super().__init__()
+        ctx = multiprocessing.get_context("spawn")  # Qt 스레드가 있는 프로세스에서 fork 금지
+        self.buffer = SharedQuoteBuffer(len(universe))
+        self._requests_recv, self._requests = ctx.Pipe(duplex=False)
+        self._results, self._results_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=worker_main, daemon=True, name="NireumFetchWorker",
+            args=(self._requests_recv, self._results_send, self.buffer.name,
+                  universe.tickers.tolist(), universe.weights.tolist(),
+                  provider_name, provider_options, fetch_options, store_path, store_max, record_dir))
+        self.process.start()
+        # 자식 프로세스에 넘긴 파이프 끝은 닫아야 워커 종료 시 recv()가 EOF를 받음
+        self._requests_recv.close(); self._results_send.close()
+        self.busy = False
+        self.stopping = False
+        self.seq = 0
+        self.start()
+
+    def run(self):
+        while True:
+            try:
+                # 워커가 죽으면 파이프 EOF, 좀비 등으로 EOF가 오지 않아도 1초마다 생존 확인
+                if not self._results.poll(1.0):
+                    if self.process.is_alive(): continue
+                    if not self._results.poll(): break
+                message = self._results.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "batch":
+                self.batch_updated.emit(message[1], message[2])
+            elif message[0] == "done":
+                self.data_ready.emit(message[1], message[2])
+            elif message[0] == "history":
+                self.history_synced.emit(message[1])
+        if not self.stopping:
+            self.process.join(1)  # 종료 코드 확인
+            print(f"[ERROR] Fetch worker exited unexpectedly (exit code {self.process.exitcode})")
+            self.worker_lost.emit()
+
+    def isRunning(self):
+        """DataFetcher와 같은 의미: 요청한 갱신이 아직 끝나지 않음"""
+        return self.busy
+
+    def request(self, request_mask=None):
+        """갱신 요청, 워커가 이미 종료되어 보낼 수 없으면 None (worker_lost로 처리)"""
+        self.seq += 1
+        try:
+            self._requests.send(("fetch", self.seq, request_mask))
+        except OSError:
+            return None
+        self.busy = True
+        return self.seq
+
+    def restore(self, values, timestamp):
+        try: self._requests.send(("restore", values, timestamp))
+        except OSError: pass
+
+    def sync_history(self, path, max_sessions, calendar):
+        """[TIMEFRAME] 워커에서 일봉 종가 동기화 (완료 시 history_synced), 보내지 못하면 False"""
+        try:
+            self._requests.send(("history", path, max_sessions, calendar))
+        except OSError:
+            return False
+        return True
 
+    def stop(self):
+        self.stopping = True
+        try:
+            self._requests.send(("stop",))
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive(): self.process.terminate()
+        self.wait(2000)
+        self.buffer.close(unlink=True)
+
+
+class DailyCloseSync(QThread):
+    """
+    [TIMEFRAME] 일봉 종가 캐시 로드 + (새 세션이면) 동기화
+    GUI가 읽는 인스턴스는 수정하지 않고, 새로 로드한 인스턴스를 동기화한 뒤 통째로 전달 (참조 교체)
+    provider가 None이면 파일만 로드 (워커 프로세스/허브 인스턴스가 동기화, GUI 프로세스는 pandas 미사용)
+    동기화에 실패해도 전달 → GUI 사본의 due()가 백오프 시각(retry_at)까지 다시 요청하지 않음
+    """
+    loaded = pyqtSignal(object)  # DailyCloses
+
+    def __init__(self, tickers, provider=None, fetch_options=None, calendar=None, current=None, max_sessions=260,
+                 bucket=None):
+        super().__init__()
+        self.tickers = tickers
+        self.provider = provider
+        self.fetch_options = fetch_options
+        self.bucket = bucket  # 시세 페치와 공유하는 TokenBucket
+        self.calendar = calendar
+        self.current = current
+        self.max_sessions = max_sessions
+
+    def run(self):
+        try:
+            daily = DailyCloses(DAILY_CLOSE_FILE, self.tickers, self.max_sessions)
+            if self.provider is None:
+                self.loaded.emit(daily)  # 비어 있어도 실패 백오프 시각은 반영
+                return
+            if self.current is None and len(daily):
+                self.loaded.emit(daily)  # 디스크 캐시로 먼저 활성화
+                daily = DailyCloses(DAILY_CLOSE_FILE, self.tickers, self.max_sessions)
+            if not daily.due(eastern_now(), self.calendar): return
+            daily.sync(self.provider, self.fetch_options, bucket=self.bucket)
+            self.loaded.emit(daily)
+        except Exception as e:
+            print(f"[WARN] Daily close sync failed: {e}")
+
+
+class HubSubscriber(QThread):
+    """
+    [QUOTE-HUB] 허브 구독 스레드
+    접속 직후 전체 스냅샷, 이후 델타(바뀐 종목만)를 받아 시그널로 전달
+    """
+    snapshot_received = pyqtSignal(int, object, object, object, object, float)  # (version, 인덱스, value, status, last_success, 데이터 시각)
+    hub_lost = pyqtSignal(bool)  # True = 유니버스 불일치 (다시 접속해도 같은 결과)
+
+    def __init__(self, address, tickers):
+        super().__init__()
+        self.client = QuoteHubClient(address, tickers)
+        self.stopping = False
+
+    def connect_hub(self):
+        """허브가 없으면 OSError"""
+        self.client.connect()
+
+    def run(self):
+        client = self.client
+        while True:
+            try:
+                version, idx = client.receive()
+            except ValueError as e:
+                print(f"[WARN] Hub rejected: {e}")
+                self.hub_lost.emit(True); break
+            except OSError:  # ConnectionError 포함
+                if not self.stopping: self.hub_lost.emit(False)
+                break
+            # 수신 배열은 다음 메시지에서 덮어쓰므로 바뀐 종목만 복사해서 전달
+            self.snapshot_received.emit(version, idx, client.value[idx].copy(), client.status[idx].copy(),
+                                        client.last_success[idx].copy(), client.timestamp)
+
+    def stop(self):
+        self.stopping = True
+        self.client.close()
+        self.wait(2000)
 
 
 class StockHeatmapApp:
-    # [CACHE] Class-level cache to store successful change values
-    _change_cache = {}  # {ticker: change_value}
-    
-    def __init__(self):
+    def __init__(self, args=None):
+        self.args = args if args is not None else parse_args([])
+        # [STARTUP-PROFILE] --profile-startup 이면 첫 갱신 완료 시 단계별 시각 출력
+        self.profile = StartupProfile(_STARTED, enabled=self.args.profile_startup)
+        self.profile.mark("import", _IMPORTED)
         self.app = QApplication(sys.argv)
         self.app.setQuitOnLastWindowClosed(False)
         self.app.setFont(QFont("Segoe UI", 10))
@@ -909,121 +1245,400 @@ class StockHeatmapApp:
 
         
         self.config = self.load_config()
-        self.stocks = self.config.get("tickers")
-        if not self.stocks:
-            self.stocks = [s.copy() for s in DEFAULT_STOCKS]
-        
-        self.first_run = True # Flag for first run
-
-        
-        # 데이터 수신 전 초기 상태 보장 (모두 0으로 설정하여 검회색 유지)
-        for s in self.stocks: 
-            s['change'] = 0
-        
-        self.mini = MiniWidget(self.stocks)
+        # [QUOTE-HUB] CLI --hub 우선, 없으면 config.json "hub"
+        self.hub_address = self._hub_address()
+        if not self.hub_address: ensure_single_instance()
+        # [COLOR-LUT] config.json "color_range": 색이 최대로 진해지는 등락률(%), 기본 4.0
+        if self.config.get("color_range"):
+            color_lut.configure(clamp=float(self.config["color_range"]))
+        # [UNIVERSE] 종목 구성(티커/이름/섹터/비중)과 등락률을 열 지향 배열로 보관
+        self.universe = Universe.from_records(self.config.get("tickers") or DEFAULT_STOCKS)
+        
+        
+        # [QUOTE-PROVIDER] CLI(--provider/--replay) 우선, 없으면 config.json "provider" (기본 yfinance)
+        provider_options = dict(self.config.get("provider_options", {}))
+        provider_options.setdefault("prev_close_file", str(PREV_CLOSE_FILE))
+        provider_name = self.args.provider or self.config.get("provider")
+        if self.args.replay:
+            provider_name, provider_options["dir"] = "replay", self.args.replay
+        self.provider_name, self.provider_options = provider_name, provider_options
+        self.provider = make_provider(provider_name, provider_options)
+        self.record_dir = self.args.record or self.config.get("record_dir")
+        # [RATE-LIMIT] 시세 페치와 일봉 종가 동기화가 나눠 쓰는 토큰 버킷 (config.json "fetch" requests_per_sec)
+        self.rate_limiter = TokenBucket.from_config(self.config.get("fetch"))
+        # [CANVAS] config.json에 "legacy_widgets": true 이면 종목별 QFrame/QLabel 위젯 모드
+        self.legacy_widgets = bool(self.config.get("legacy_widgets", False))
+
+        
+        # 데이터 수신 전 등락률은 모두 0 (검회색 유지)
+        # [QUOTE-STATUS] 종목별 페치 상태 (value/status/마지막 성공 시각/연속 실패 횟수)
+        # [QUOTE-SNAPSHOT] 페치 스레드 전용, GUI는 universe.snapshot(불변)만 읽음
+        self.quote_status = QuoteStatus(len(self.universe))
+        # [WARM-START] 네트워크 요청 전에 마지막 스냅샷으로 색칠 (이전 세션 값은 stale 표시)
+        self.data_time = None
+        self.store = self._open_store()
+        self._warm_start()
+        self.profile.mark("warm start")
+        # [HISTORY] 갱신별 등락률 링 버퍼 (스냅샷 저장소의 최근 레코드로 시작)
+        self.history = self._open_history()
+        
+        self.mini = MiniWidget(self.universe, legacy=self.legacy_widgets)
+        self.expanded = None
         pos = self.config.get("mini_position")
         if pos: self.mini.move(pos["x"], pos["y"])
         else: self.mini.move(self.app.primaryScreen().availableGeometry().width() - 170, 100)
         
         self.mini.clicked.connect(self.toggle_expanded)
         self.mini.position_changed.connect(self.save_pos_mini)
+        self._show_stale(self.universe.snapshot.stale_mask())
+        # [STARTUP] 캐시된 레이아웃 + 마지막 스냅샷으로 미니 위젯을 먼저 그린 뒤 허브/워커/스케줄러 준비
+        self.mini.show()
+        self.app.processEvents(QEventLoop.ExcludeUserInputEvents)  # 클릭은 초기화가 끝난 뒤 처리
+        self.profile.mark("first paint")
+        layout_time = getattr(self.mini.treemap, "layout_time", None)
+        if layout_time is not None:
+            self.profile.mark("layout", layout_time[1])
+            self.profile.layout_ms = (layout_time[1] - layout_time[0]) * 1000
         
-        self.expanded = None
         self.fetcher = None
-        self.timer = QTimer(); self.timer.timeout.connect(self.update_data)
-        
-        self.timer.start(120000) # 2분마다 업데이트 (120,000ms)
-
-        QTimer.singleShot(100, self.update_data) # Start immediately
-        self.mini.show()
+        # [QUOTE-HUB] 허브가 이미 있으면 구독만 하고 직접 페치하지 않음, 없으면 이 인스턴스가 허브가 됨
+        self.hub = None
+        self.hub_subscriber = None
+        if self.hub_address:
+            self._join_hub()
+            self.app.aboutToQuit.connect(self._leave_hub)
+        # [WORKER-PROCESS] config.json "worker_process": true 이면 페치/파싱을 별도 프로세스에서 실행
+        self.fetch_process = None
+        self.worker_restarts = 0
+        if self.config.get("worker_process") and shared_memory is not None and self.hub_subscriber is None:
+            self._start_worker(self.quote_status.value)
+            self.app.aboutToQuit.connect(self._stop_worker)
+        # [LAYOUT-DEFER] 저장 타이머가 돌기 전에 종료되어도 레이아웃 캐시 기록
+        self.app.aboutToQuit.connect(LAYOUT_STORE.flush)
+        # [REFRESH-SCHEDULER] 시장 캘린더 기반 적응형 주기 (장 마감/휴장일에는 대기, 첫 갱신은 즉시)
+        self.scheduler = RefreshScheduler.from_config(self.config.get("refresh"), always_open=self.provider.always_open)
+        self.scheduler.refresh.connect(self.update_data)
+        self._last_values = self.universe.snapshot.value  # 불변이므로 복사 불필요
+        # [REFRESH-TIERS] 비중 순위 계층별 갱신 주기 (config.json "refresh_tiers")
+        self.tiers = RefreshTiers(self.universe.weights, self.config.get("refresh_tiers"))
+        self.cycle = 0
+        self._request_mask = None
+        self._force_full = True  # 첫 갱신/수동 갱신은 전 종목
+        # [TIMEFRAME] 기간별(5D/1M/YTD) 보기용 일봉 종가 캐시 (첫 갱신 후 백그라운드에서 로드/동기화)
+        self.daily_closes = None
+        self.daily_sync = None
+        self._daily_mtime = None      # 마지막으로 읽은 캐시 파일 수정 시각
+        self._history_pending = False  # 워커 프로세스 동기화 진행 중
+        if self.hub_subscriber is None: self.scheduler.start()
         
     def update_data(self):
         # Prevent Thread overlap
-        if self.fetcher and self.fetcher.isRunning(): return
-        
-        # [TEST MODE] 임시 테스트: 랜덤 데이터로 갱신 확인 (개발 완료 후 제거)
-        import random
-        TEST_MODE = False  # True로 변경하면 테스트용 랜덤 데이터 사용
-
-        
-        if TEST_MODE:
-            print("[TEST] 랜덤 데이터로 갱신")
-            for s in self.stocks:
-                s['change'] = round(random.uniform(-5, 5), 2)
-            self.on_data_updated(self.stocks)
+        if self.fetcher and self.fetcher.isRunning():
+            print("[SCHEDULE] Fetch already running, request ignored")
             return
         
-        # [US MARKET HOURS] 미국 동부 시간(ET) 기준으로 정규장 체크
-        try:
-            eastern = ZoneInfo('America/New_York')
-            now_et = datetime.now(eastern)
-        except:
-            # Fallback: UTC에서 5시간 빼기 (EST 근사값)
-            now_et = datetime.now(timezone.utc).replace(tzinfo=None)
-            now_et = now_et.replace(hour=(now_et.hour - 5) % 24)
-        
-        # 미국 정규장: 월~금 09:30~16:00 ET
-        is_weekday = now_et.weekday() < 5  # 0=월, 4=금
-        is_market_hours = is_weekday and (
-            (now_et.hour == 9 and now_et.minute >= 30) or
-            (10 <= now_et.hour < 16)
-        )
-        print(f"[INFO] update_data 호출 - 시간(ET): {now_et.strftime('%H:%M:%S')}, 장시간: {is_market_hours}, first_run: {self.first_run}")
-        
-        if self.first_run or is_market_hours:
-            self.fetcher = DataFetcher(self.stocks)
-            self.fetcher.data_updated.connect(self.on_data_updated)
-            self.fetcher.start()
-            self.first_run = False
+        # [REFRESH-TIERS] 이번 회차 대상 = 주기가 돌아온 계층 + 최신 값이 없는(stale/실패) 종목
+        if self._force_full:
+            self._request_mask = None
         else:
-            pass
-
-
-    def on_data_updated(self, stocks):
-        print(f"[INFO] on_data_updated - UI update start")
-        
-        # [CACHE] Update cache with successful values and restore failed ones
-        for stock in stocks:
-            ticker = stock.get('ticker', '')
-            change = stock.get('change', 0)
-            
-            if change != 0:
-                # Success: save to cache
-                StockHeatmapApp._change_cache[ticker] = change
-            elif ticker in StockHeatmapApp._change_cache:
-                # Failed: restore from cache
-                cached_value = StockHeatmapApp._change_cache[ticker]
-                stock['change'] = cached_value
-                print(f"[CACHE] {ticker}: restored {cached_value}% from cache")
+            self._request_mask = self.tiers.due(self.cycle) | (self.universe.snapshot.status != OK)
+            print(f"[TIERS] Cycle {self.cycle}: {int(self._request_mask.sum())}/{len(self.universe)} tickers due")
+        self._force_full = False
+        self.cycle += 1
+        
+        if self.fetch_process is not None:
+            if self.fetch_process.request(self._request_mask) is None:
+                print("[WARN] Fetch worker unavailable, waiting for restart")
+                self.scheduler.refresh_finished(None)  # worker_lost에서 교체 후 다음 예약 시각에 다시 요청
             else:
-                print(f"[CACHE] {ticker}: no cache available")
-        
-        self.stocks = stocks
-        
-        # Update cell references
-        def update_cell(cell, matched):
-            if matched:
-                cell.stock = matched
-
+                self.scheduler.refresh_started()
+            return
+        self.fetcher = DataFetcher(self.universe, self.config.get("fetch"),
+                                   provider=self.provider, record_dir=self.record_dir,
+                                   streaming=self.config.get("streaming", True), status=self.quote_status,
+                                   store=self.store, request_mask=self._request_mask, bucket=self.rate_limiter)
+        self.fetcher.data_updated.connect(self.on_fetch_done)
+        self.fetcher.batch_updated.connect(self.on_batch_updated)
+        self.fetcher.start()
+        self.scheduler.refresh_started()
+
+    def _start_worker(self, values):
+        """[WORKER-PROCESS] 워커 프로세스 시작 (values: 새 워커 상태 모델에 복원할 마지막 성공 값)"""
+        self.fetch_process = ProcessFetcher(
+            self.universe, self.provider_name, self.provider_options, self.config.get("fetch"),
+            store_path=str(SNAPSHOT_FILE) if self.store is not None else None,
+            store_max=self.config.get("snapshot_max_records", 720), record_dir=self.record_dir)
+        self.fetch_process.data_ready.connect(self.on_process_data)
+        if self.config.get("streaming", True):
+            self.fetch_process.batch_updated.connect(self.on_batch_updated)
+        self.fetch_process.history_synced.connect(self.on_history_synced)
+        self.fetch_process.worker_lost.connect(self.on_worker_lost)
+        if self.data_time is not None:
+            self.fetch_process.restore(values, self.data_time)
+        self.fetcher = self.fetch_process
+
+    def _stop_worker(self):
+        if self.fetch_process is not None: self.fetch_process.stop()
+
+    def on_worker_lost(self):
+        """
+        [WORKER-PROCESS] 워커가 죽으면 진행 중이던 갱신을 실패로 끝내고 새 워커로 교체
+        MAX_WORKER_RESTARTS번을 넘기면 GUI 프로세스 내 페치(DataFetcher)로 전환
+        """
+        lost = self.fetch_process
+        if lost is None: return
+        was_busy = lost.busy
+        lost.busy = False
+        lost.stop()  # 공유 메모리 해제
+        self.fetch_process = self.fetcher = None
+        self._history_pending = False
+        if self.worker_restarts < MAX_WORKER_RESTARTS:
+            self.worker_restarts += 1
+            print(f"[WARN] Restarting fetch worker ({self.worker_restarts}/{MAX_WORKER_RESTARTS})")
+            self._start_worker(self.universe.snapshot.value)
+        else:
+            print("[WARN] Fetch worker keeps failing, fetching in the UI process")
+            qs, snap = self.quote_status, self.universe.snapshot
+            if self.data_time is not None: qs.restore(snap.value, self.data_time)
+        # 중단된 갱신은 실패로 처리하고 다음 갱신 예약 (요청 전 상태였다면 예약은 이미 되어 있음)
+        if was_busy: self.scheduler.refresh_finished(None)
+
+    def on_process_data(self, seq, slot):
+        """[WORKER-PROCESS] 워커가 기록한 슬롯에서 스냅샷 생성"""
+        view = self.fetch_process.buffer.view(slot)
+        # 슬롯은 두 번 뒤 갱신에서 워커가 다시 쓰므로 불변 스냅샷으로 복사 (수백 종목, 수 KB)
+        snapshot = QuoteSnapshot.capture(view['value'], view['status'], view['last_success'])
+        self.fetch_process.busy = False
+        self.on_fetch_done(snapshot)
+
+    def on_fetch_done(self, snapshot):
+        """[QUOTE-SNAPSHOT] 페치 결과 스냅샷을 GUI 스레드에서 게시 (참조 교체 1회)"""
+        self.universe.publish(snapshot)
+        self.on_data_updated()
+
+    def refresh_now(self):
+        """[REFRESH-SCHEDULER] 즉시 갱신 (확장 위젯 새로고침 버튼/F5), 전 종목 요청"""
+        if self.hub_subscriber is not None:
+            print("[HUB] Refresh is driven by the hub instance"); return
+        self._force_full = True
+        self.scheduler.refresh_now()
+
+    def _hub_address(self):
+        """config.json "hub": true(기본 주소) | "unix:/path" | "tcp:127.0.0.1:PORT" | {"address": ...}"""
+        hub = self.args.hub or self.config.get("hub")
+        if isinstance(hub, dict): hub = hub.get("address", True) if hub.get("enabled", True) else None
+        if hub is True or hub == "default": return default_address()
+        return hub or None
+
+    def _join_hub(self):
+        """[QUOTE-HUB] 허브 구독 시도, 실패하면 허브 서버 시작"""
+        subscriber = HubSubscriber(self.hub_address, self.universe.tickers.tolist())
+        try:
+            subscriber.connect_hub()
+        except OSError:
+            self._serve_hub(); return
+        print(f"[HUB] Subscribed to {self.hub_address}")
+        subscriber.snapshot_received.connect(self.on_hub_snapshot)
+        subscriber.hub_lost.connect(self.on_hub_lost)
+        self.hub_subscriber = subscriber
+        subscriber.start()
+
+    def _serve_hub(self):
+        server = QuoteHubServer(self.hub_address, self.universe.tickers.tolist())
+        try:
+            server.start()
+        except OSError as e:
+            print(f"[WARN] Hub unavailable, fetching standalone: {e}"); return
+        self.hub = server
+        # 웜 스타트 값이 있으면 첫 페치 전에 접속한 구독자도 바로 그릴 수 있도록 게시
+        if self.data_time is not None: self._publish()
+
+    def _publish(self):
+        snap = self.universe.snapshot
+        version, changed = self.hub.publish(snap.value, snap.status, snap.last_success, self.data_time or 0.0)
+        print(f"[HUB] Published v{version} ({changed.size} changed)")
+
+    def _leave_hub(self):
+        if self.hub_subscriber is not None: self.hub_subscriber.stop()
+        if self.hub is not None: self.hub.close()
+
+    def on_hub_snapshot(self, version, indices, value, status, last_success, timestamp):
+        """[QUOTE-HUB] 허브가 게시한 스냅샷(바뀐 종목만)으로 새 버전 게시"""
+        snap = self.universe.snapshot
+        change = np.where(np.isfinite(value), value, snap.change[indices])
+        snap = snap.evolve(indices, timestamp=timestamp, change=change, value=value, status=status,
+                           last_success=last_success)
+        self.universe.publish(snap)
+        if timestamp > 0 and timestamp != self.data_time:
+            self.data_time = timestamp
+            self.history.append(timestamp, snap.value)
+            if self.expanded: self.expanded.history_appended()
+        print(f"[HUB] Received v{version} ({indices.size} changed)")
+        self.profile.mark("first data")
+        self._render()
+        self.profile.mark("first refresh")
+        self.profile.report()
+        self._sync_daily_closes()
+
+    def on_hub_lost(self, mismatch):
+        """허브 종료: 다른 구독자가 먼저 허브가 될 수 있으므로 잠시 후 다시 접속 시도, 유니버스 불일치면 단독 페치"""
+        self.hub_subscriber.wait(2000)
+        self.hub_subscriber = None
+        if mismatch:
+            self.scheduler.start(); return
+        print("[HUB] Hub connection lost, rejoining")
+        QTimer.singleShot(int(np.random.uniform(100, 1500)), self._rejoin_hub)
+
+    def _rejoin_hub(self):
+        self._join_hub()
+        if self.hub_subscriber is None: self.scheduler.start()
+
+    def _sync_daily_closes(self):
+        """[TIMEFRAME] 캐시를 아직 읽지 않았거나 마지막 동기화 이후 새 세션이 시작되었으면 백그라운드 동기화"""
+        if self.config.get("timeframes", True) is False or self.legacy_widgets: return  # 레거시 위젯은 기간 선택 없음
+        if not hasattr(self.provider, "fetch_history"): return
+        if self.daily_sync is not None and self.daily_sync.isRunning(): return
+        calendar = None if self.provider.always_open else self.scheduler.calendar
+        if self.daily_closes is not None and not self.daily_closes.due(eastern_now(), calendar): return
+        if self.hub_subscriber is not None:
+            # [QUOTE-HUB] 구독자는 직접 받지 않고 허브 인스턴스가 동기화한 파일만 다시 읽음
+            self._load_daily_closes(); return
+        if self.fetch_process is not None:
+            # [WORKER-PROCESS] 다운로드/파싱은 워커 프로세스에서, GUI 프로세스는 완성된 파일만 읽음
+            if self.daily_closes is None: self._load_daily_closes()
+            if not self._history_pending:
+                self._history_pending = self.fetch_process.sync_history(
+                    str(DAILY_CLOSE_FILE), self.config.get("daily_close_sessions", 260), calendar)
+            return
+        self.daily_sync = DailyCloseSync(self.universe.tickers.tolist(), self.provider, self.config.get("fetch"),
+                                         calendar=calendar, current=self.daily_closes,
+                                         max_sessions=self.config.get("daily_close_sessions", 260),
+                                         bucket=self.rate_limiter)
+        self.daily_sync.loaded.connect(self.on_daily_closes)
+        self.daily_sync.start()
+
+    def _load_daily_closes(self):
+        """캐시 파일이 마지막으로 읽은 뒤 바뀌었으면 백그라운드에서 다시 로드 (네트워크 없음)"""
+        try: mtime = os.path.getmtime(DAILY_CLOSE_FILE)
+        except OSError: return
+        if mtime == self._daily_mtime: return
+        if self.daily_sync is not None: self.daily_sync.wait()  # 로드만 하므로 곧 끝남
+        self._daily_mtime = mtime
+        self.daily_sync = DailyCloseSync(self.universe.tickers.tolist(),
+                                         max_sessions=self.config.get("daily_close_sessions", 260))
+        self.daily_sync.loaded.connect(self.on_daily_closes)
+        self.daily_sync.start()
+
+    def on_history_synced(self, synced):
+        """[WORKER-PROCESS] 워커의 일봉 종가 동기화 완료"""
+        self._history_pending = False
+        if synced or self.daily_closes is None: self._load_daily_closes()
+
+    def on_daily_closes(self, daily_closes):
+        self.daily_closes = daily_closes
+        if self.expanded: self.expanded.set_daily_closes(daily_closes)
+
+    def _open_store(self):
+        """config.json "snapshot_store": false 이면 스냅샷 저장/웜 스타트 사용 안 함"""
+        if self.config.get("snapshot_store", True) is False: return None
+        return SnapshotStore(SNAPSHOT_FILE, self.universe.tickers.tolist(),
+                             max_records=self.config.get("snapshot_max_records", 720))
+
+    def _open_history(self):
+        capacity = self.config.get("snapshot_max_records", 720)
+        if self.store is None: return HistoryRing(len(self.universe), capacity)
+        return HistoryRing.from_store(self.store, capacity)
+
+    def _warm_start(self):
+        """[WARM-START] 디스크의 마지막 스냅샷을 종목 dict와 상태 모델에 반영"""
+        if self.store is None: return
+        started = time.perf_counter()
+        latest = self.store.latest()
+        if latest is None: return
+        timestamp, values, _ = latest
+        qs = self.quote_status
+        qs.restore(values, timestamp)
+        self.universe.publish(QuoteSnapshot.capture(qs.value, qs.status, qs.last_success, timestamp))
+        self.data_time = timestamp
+        print(f"[INFO] Warm start from snapshot {datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S} "
+              f"({(time.perf_counter() - started) * 1000:.1f}ms)")
+
+    def _show_stale(self, mask):
+        """[STALE] 캔버스 타일에 stale 해칭 표시 (레거시 위젯은 확장 위젯 헤더의 stale 개수만 표시)"""
+        if self.legacy_widgets: return
+        self.mini.treemap.set_stale(mask)
+        if self.expanded:
+            self.expanded.treemap.set_stale(mask)
+
+    def _apply_freshness(self):
+        """[STALE] stale 타일 표시 + 확장 위젯 헤더의 데이터 시각/stale 개수"""
+        snap = self.universe.snapshot
+        mask = snap.stale_mask()
+        self._show_stale(mask)
+        if self.expanded:
+            self.expanded.data_time = self.data_time
+            self.expanded.stale_count = int(mask.sum())
+            self.expanded.tier_freshness = list(zip(self.tiers.names, self.tiers.counts().tolist(),
+                                                    self.tiers.freshness(snap.last_success).tolist()))
+
+    def on_batch_updated(self, indices, changes):
+        """[STREAMING] 배치 단위 부분 결과를 타일에 바로 반영 (바뀐 타일만 다시 그림)"""
+        ok = np.isfinite(changes)
+        if not ok.any(): return
+        self.profile.mark("first data")
+        self.universe.set_changes(indices, changes)
+        # 배치로 받은 종목은 더 이상 stale 아님 (상태는 갱신 완료 스냅샷에서 반영)
+        mask = self.universe.snapshot.stale_mask()
+        mask[indices[ok]] = False
+        self._show_stale(mask)
+        self.mini.update_view()
+        if self.expanded and self.expanded.isVisible():
+            self.expanded.update_view()
 
+    def on_data_updated(self):
+        print(f"[INFO] on_data_updated - UI update start")
         
-        # MiniWidget와 내부 TreemapWidget 업데이트
-        self.mini.stocks = stocks
-        self.mini.treemap.stocks = stocks
-        for container in self.mini.treemap.sector_containers:
-            for cell in container.cells:
-                matched = next((s for s in stocks if s['ticker'] == cell.stock['ticker']), None)
-                update_cell(cell, matched)
-        
+        # [UNIVERSE] 페치 결과는 항상 앱 유니버스의 인덱스 순서이므로 유니버스 변경 처리 불필요
+        snap = self.universe.snapshot
+        self.data_time = snap.timestamp
+        # [REFRESH-SCHEDULER] 표시값이 바뀐 종목 비율로 다음 갱신 주기 조정
+        values = snap.value
+        if values.shape == self._last_values.shape:
+            moved = np.abs(values - self._last_values) >= 0.01
+            moved |= np.isfinite(values) != np.isfinite(self._last_values)
+            # 이번 회차에 요청한 종목 기준 (계층 갱신으로 요청하지 않은 종목은 제외)
+            moved = moved if self._request_mask is None else moved[self._request_mask]
+            activity = float(np.mean(moved)) if moved.size else None
+        else:
+            activity = None
+        self._last_values = values
+        self.scheduler.refresh_finished(activity)
+        # [HISTORY] 이번 갱신 결과(종목별 마지막 성공 값)를 링 버퍼에 추가
+        self.history.append(self.data_time, snap.value)
+        if self.expanded: self.expanded.history_appended()
+        # [QUOTE-HUB] 구독자에게 이번 갱신에서 바뀐 종목만 델타로 게시
+        if self.hub is not None: self._publish()
+        self._render()
+        self.profile.mark("first data")  # 스트리밍을 끈 경우 첫 배치 = 첫 갱신 완료
+        self.profile.mark("first refresh")
+        self.profile.report()
+        self._sync_daily_closes()
+
+    def _render(self):
+        """미니/확장 위젯 갱신 (각 위젯은 직전에 그린 스냅샷과 비교하여 바뀐 타일만 다시 그림)"""
+        # [QUOTE-STATUS] 이번 갱신에 실패한 종목은 스냅샷의 마지막 성공 값으로 표시됨
+        stale = int(self.universe.snapshot.stale_mask().sum())
+        if stale:
+            print(f"[CACHE] {stale} tickers kept their last good value")
+        
+        # MiniWidget와 내부 트리맵(캔버스/레거시 위젯) 업데이트
+        self.mini.treemap.set_universe(self.universe)
         self.mini.update_view()
         
         if self.expanded and self.expanded.isVisible(): 
-            self.expanded.stocks = stocks
-            self.expanded.treemap.stocks = stocks
-            for container in self.expanded.treemap.sector_containers:
-                for cell in container.cells:
-                    matched = next((s for s in stocks if s['ticker'] == cell.stock['ticker']), None)
-                    update_cell(cell, matched)
+            self.expanded.treemap.set_universe(self.universe)
+        self._apply_freshness()
+        if self.expanded and self.expanded.isVisible():
             self.expanded.update_view()
         
 
@@ -1050,7 +1665,10 @@ class StockHeatmapApp:
             self.expanded.hide()
         else:
             if not self.expanded:
-                self.expanded = ExpandedWidget(self.stocks)
+                self.expanded = ExpandedWidget(self.universe, legacy=self.legacy_widgets)
+                self.expanded.set_history(self.history)
+                if self.daily_closes is not None: self.expanded.set_daily_closes(self.daily_closes)
+                self.expanded.refresh_requested.connect(self.refresh_now)
                 self.expanded.closed.connect(lambda: None)
                 self.expanded.position_changed.connect(self.save_pos_exp)
                 pos = self.config.get("expanded_position")
@@ -1059,9 +1677,25 @@ class StockHeatmapApp:
             self.expanded.show()
             self.expanded.raise_()
             # [FIX] 창 표시 시점에 최신 데이터와 등락률을 확실하게 반영
-            self.expanded.stocks = self.stocks 
+            self.expanded.treemap.set_universe(self.universe)
+            self._apply_freshness()
             self.expanded.update_view()
 
+def parse_args(argv=None):
+    """명령행 인자 (Qt 인자는 그대로 통과)"""
+    parser = argparse.ArgumentParser(description="Nireum Heatmap")
+    parser.add_argument("--provider", choices=["yfinance", "synthetic", "replay"], help="quote provider (default: config or yfinance)")
+    parser.add_argument("--replay", metavar="DIR", help="replay recorded snapshots from DIR (implies --provider replay)")
+    parser.add_argument("--record", metavar="DIR", help="record every refresh to DIR for later replay")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print startup timings (import, layout, first paint, first data)")
+    parser.add_argument("--hub", nargs="?", const="default", metavar="ADDRESS",
+                        help="share one fetcher between instances through a local quote hub (unix:/path or tcp:host:port)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 if __name__ == "__main__":
-    try: app = StockHeatmapApp(); sys.exit(app.run())
+    multiprocessing.freeze_support()  # [WORKER-PROCESS] PyInstaller EXE에서 워커 프로세스 시작 지원
+    try: app = StockHeatmapApp(parse_args(sys.argv[1:])); sys.exit(app.run())
     except: pass
@@ -0,0 +1,137 @@
+"""
+[LAYOUT-CACHE] 트리맵 레이아웃 영구 캐시
+유니버스 해시(ticker, weight, sector) + 대상 크기를 키로 정규화 좌표를 바이너리 파일에 저장
+메모리/디스크 모두 최근 사용 순(LRU)으로 max_entries개까지만 유지
+put은 메모리만 갱신하고 dirty 표시, 디스크 기록은 호출자가 flush로 모아서 수행 (리사이즈마다 파일 재작성 방지)
+"""
+import os
+import struct
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# 파일 포맷: [MAGIC][VERSION u32][COUNT u32] + 엔트리 * COUNT
+# 엔트리: [KEY 16B][M u32][K u32][rects float32 M*4][parent int32 M][top float32 K]
+MAGIC = b"NHLC"
+VERSION = 1
+KEY_SIZE = 16
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct(f"<{KEY_SIZE}sII")
+
+
+def universe_hash(hierarchy, value_key='weight', children_key='stocks'):
+    """섹터 → 종목 계층의 (ticker, weight, sector)를 배치 순서대로 해시"""
+    h = hashlib.blake2b(digest_size=KEY_SIZE)
+    for sector in hierarchy:
+        name = sector.get('sector', '')
+        for stock in sector.get(children_key, ()):
+            h.update(f"{stock.get('ticker', '')}|{stock.get(value_key, 0)!r}|{name}\n".encode("utf-8"))
+        h.update(b"\x00")
+    return h.digest()
+
+
+def make_key(u_hash, width, height, *params):
+    """유니버스 해시 + 대상 크기(+ 헤더/마진 등 레이아웃 파라미터)로 캐시 키 생성"""
+    h = hashlib.blake2b(u_hash, digest_size=KEY_SIZE)
+    h.update(repr((round(width, 3), round(height, 3)) + tuple(params)).encode("utf-8"))
+    return h.digest()
+
+
+class LayoutCache:
+    def __init__(self, path, max_entries=8):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {key: (rects_norm float32 (m,4), parent int32 (m,), top_norm float32 (k,))}
+        self._loaded = False
+        self._dirty = False
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        return key in self._entries
+
+    def get(self, key, width, height):
+        """
+        캐시된 nested 레이아웃 테이블을 (width, height) 좌표로 복원하여 반환
+        반환: calculate_nested_treemap과 같은 형식의 dict, 없으면 None
+        """
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        if entry is None: return None
+        self._entries.move_to_end(key)
+
+        rects_norm, parent, top_norm = entry
+        n_sectors = top_norm.shape[0]
+        rects = rects_norm.astype(np.float64) * np.array([width, height, width, height])
+        top = np.zeros(rects.shape[0], dtype=np.float64)
+        top[:n_sectors] = top_norm * height
+        return {'rects': rects, 'parent': parent.copy(), 'top': top, 'n_sectors': n_sectors}
+
+    def put(self, key, table, width, height):
+        """nested 레이아웃 테이블을 정규화하여 메모리에 저장 (디스크 기록은 flush)"""
+        if width <= 0 or height <= 0: return
+        self._ensure_loaded()
+        n_sectors = table['n_sectors']
+        rects_norm = (table['rects'] / np.array([width, height, width, height])).astype(np.float32)
+        top_norm = (table['top'][:n_sectors] / height).astype(np.float32)
+        parent = table['parent'].astype(np.int32)
+        self._entries[key] = (rects_norm, parent, top_norm)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def flush(self):
+        """put 이후 변경분이 있을 때만 디스크에 기록"""
+        if not self._dirty: return
+        self._dirty = False
+        self.save()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self.load()
+
+    def load(self):
+        """디스크에서 캐시 로드 (손상/버전 불일치 시 빈 캐시)"""
+        self._entries.clear()
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        try:
+            magic, version, count = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION: return
+            offset = _HEADER.size
+            for _ in range(count):
+                key, m, k = _ENTRY.unpack_from(data, offset)
+                offset += _ENTRY.size
+                rects = np.frombuffer(data, dtype="<f4", count=m * 4, offset=offset).reshape(m, 4).copy()
+                offset += m * 4 * 4
+                parent = np.frombuffer(data, dtype="<i4", count=m, offset=offset).copy()
+                offset += m * 4
+                top = np.frombuffer(data, dtype="<f4", count=k, offset=offset).copy()
+                offset += k * 4
+                self._entries[key] = (rects, parent, top)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        except (struct.error, ValueError) as e:
+            print(f"[WARN] Layout cache corrupted, ignoring: {e}")
+            self._entries.clear()
+
+    def save(self):
+        """LRU 순서(오래된 것 먼저)로 디스크에 기록 (임시 파일 후 교체)"""
+        parts = [_HEADER.pack(MAGIC, VERSION, len(self._entries))]
+        for key, (rects, parent, top) in self._entries.items():
+            parts.append(_ENTRY.pack(key, rects.shape[0], top.shape[0]))
+            parts.append(rects.astype("<f4").tobytes())
+            parts.append(parent.astype("<i4").tobytes())
+            parts.append(top.astype("<f4").tobytes())
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(parts))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Layout cache save failed: {e}")
@@ -0,0 +1,127 @@
+"""
+[MARKET-CALENDAR] 미국 정규장(NYSE) 로컬 캘린더
+공휴일/조기 폐장일을 규칙으로 계산 (네트워크 불필요), config로 추가 휴장일/조기 폐장일 지정 가능
+시각은 모두 미국 동부 시간(ET) naive datetime 기준
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    try:
+        from backports.zoneinfo import ZoneInfo  # Python 3.8 이하 호환
+    except ImportError:
+        ZoneInfo = None
+
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """month의 n번째 weekday (n=-1이면 마지막)"""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    d = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """부활절 (그레고리력, Anonymous 알고리즘)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(d):
+    """토요일 → 금요일, 일요일 → 월요일"""
+    if d.weekday() == 5: return d - timedelta(days=1)
+    if d.weekday() == 6: return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=8)
+def nyse_holidays(year):
+    """연도별 NYSE 휴장일 집합"""
+    days = {
+        _nth_weekday(year, 1, 0, 3),            # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),            # Washington's Birthday
+        _easter(year) - timedelta(days=2),      # Good Friday
+        _nth_weekday(year, 5, 0, -1),           # Memorial Day
+        _observed(date(year, 7, 4)),            # Independence Day
+        _nth_weekday(year, 9, 0, 1),            # Labor Day
+        _nth_weekday(year, 11, 3, 4),           # Thanksgiving
+        _observed(date(year, 12, 25)),          # Christmas
+    }
+    # 새해: 토요일이면 전년도 12/31을 대체하지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5: days.add(_observed(new_year))
+    if year >= 2022: days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+
+@lru_cache(maxsize=8)
+def nyse_early_closes(year):
+    """연도별 13:00 조기 폐장일 집합"""
+    holidays = nyse_holidays(year)
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # 추수감사절 다음 날
+    for d in (date(year, 7, 3), date(year, 12, 24)):
+        if d.weekday() < 5 and d not in holidays: days.add(d)
+    return frozenset(days)
+
+
+def eastern_now():
+    """현재 ET 시각 (naive), zoneinfo가 없으면 미국 서머타임 규칙으로 계산"""
+    if ZoneInfo is not None:
+        try:
+            return datetime.now(ZoneInfo('America/New_York')).replace(tzinfo=None)
+        except Exception:
+            pass
+    utc = datetime.now(timezone.utc).replace(tzinfo=None)
+    # 서머타임: 3월 둘째 일요일 02:00 EST ~ 11월 첫째 일요일 02:00 EDT
+    dst_start = datetime.combine(_nth_weekday(utc.year, 3, 6, 2), time(7))
+    dst_end = datetime.combine(_nth_weekday(utc.year, 11, 6, 1), time(6))
+    return utc - timedelta(hours=4 if dst_start <= utc < dst_end else 5)
+
+
+class MarketCalendar:
+    def __init__(self, extra_holidays=(), extra_early_closes=()):
+        """extra_*: "YYYY-MM-DD" 문자열 또는 date (규칙에 없는 임시 휴장/조기 폐장)"""
+        self.extra_holidays = {self._to_date(d) for d in extra_holidays}
+        self.extra_early_closes = {self._to_date(d) for d in extra_early_closes}
+
+    @staticmethod
+    def _to_date(d):
+        return d if isinstance(d, date) else date.fromisoformat(str(d))
+
+    def is_trading_day(self, d):
+        return d.weekday() < 5 and d not in nyse_holidays(d.year) and d not in self.extra_holidays
+
+    def session(self, d):
+        """d의 정규장 (개장, 폐장) ET datetime, 휴장일이면 None"""
+        if not self.is_trading_day(d): return None
+        early = d in nyse_early_closes(d.year) or d in self.extra_early_closes
+        return datetime.combine(d, REGULAR_OPEN), datetime.combine(d, EARLY_CLOSE if early else REGULAR_CLOSE)
+
+    def is_open(self, now):
+        s = self.session(now.date())
+        return s is not None and s[0] <= now < s[1]
+
+    def next_session(self, now):
+        """now 이후(진행 중 포함) 가장 가까운 정규장 (개장, 폐장)"""
+        d = now.date()
+        for _ in range(15):
+            s = self.session(d)
+            if s is not None and now < s[1]: return s
+            d += timedelta(days=1)
+        return None
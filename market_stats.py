@@ -0,0 +1,80 @@
+"""
+[AGGREGATE] 지수/섹터 집계 + 시장 폭 (타일 순서 = 섹터별 연속 구간 배열 기준)
+- 섹터 가중 등락률: np.add.reduceat(비중 × 등락률, 섹터 시작 위치) / 섹터 비중 합
+- 지수 등락률: 시가총액 가중 평균 (비중 0 이하 종목은 가중 평균에서 제외)
+- 시장 폭: 상승/하락/보합 종목 수, 등락률 분포 백분위 (백분위는 조회 시 계산)
+- 일부 종목만 바뀌면 바뀐 종목의 차이만 섹터 합계/종목 수에 반영
+"""
+import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90)
+INCREMENTAL_RATIO = 0.125  # 바뀐 종목이 이 비율 이하일 때만 증분 갱신 (부동소수 누적 오차 방지 겸)
+
+
+class MarketAggregates:
+    def __init__(self, weights, sector_offsets):
+        """weights: 타일 순서 비중, sector_offsets: 섹터 구간 경계 (k + 1,)"""
+        weights = np.asarray(weights, dtype=np.float64)
+        self.weights = np.where(weights > 0, weights, 0.0)
+        offsets = np.asarray(sector_offsets, dtype=np.intp)
+        counts = np.diff(offsets)
+        self.n = weights.shape[0]
+        self.starts = np.minimum(offsets[:-1], max(self.n - 1, 0))  # reduceat은 n 이상의 시작 위치 불가
+        self.empty = counts == 0
+        self.sector_of = np.repeat(np.arange(counts.shape[0], dtype=np.intp), counts)
+        self.sector_weight = self._reduce(self.weights)
+        self.total_weight = float(self.weights.sum())
+
+        self.changes = np.zeros(self.n)
+        self.sector_sum = np.zeros(counts.shape[0])
+        self.advancers = self.decliners = 0
+        self._percentiles = None
+
+    def _reduce(self, values):
+        """섹터별 합 (빈 섹터는 0)"""
+        if self.n == 0 or self.starts.size == 0: return np.zeros(self.starts.shape[0])
+        sums = np.add.reduceat(values, self.starts)
+        sums[self.empty] = 0.0
+        return sums
+
+    def update(self, changes, indices=None):
+        """
+        changes: 현재 등락률 전체 (타일 순서, NaN 없음), 전달한 배열은 이후 수정하지 않아야 함
+        indices: 직전 호출 대비 바뀐 위치 (None이면 전체 재계산)
+        """
+        changes = np.asarray(changes, dtype=np.float64)
+        if indices is None or len(indices) > self.n * INCREMENTAL_RATIO:
+            self.sector_sum = self._reduce(self.weights * changes)
+            self.advancers = int(np.count_nonzero(changes > 0))
+            self.decliners = int(np.count_nonzero(changes < 0))
+        else:
+            idx = np.asarray(indices, dtype=np.intp)
+            old, new = self.changes[idx], changes[idx]
+            self.sector_sum += np.bincount(self.sector_of[idx], weights=self.weights[idx] * (new - old),
+                                           minlength=self.sector_sum.shape[0])
+            self.advancers += int(np.count_nonzero(new > 0)) - int(np.count_nonzero(old > 0))
+            self.decliners += int(np.count_nonzero(new < 0)) - int(np.count_nonzero(old < 0))
+        self.changes = changes
+        self._percentiles = None
+
+    @property
+    def unchanged(self):
+        return self.n - self.advancers - self.decliners
+
+    @property
+    def index_change(self):
+        """시가총액 가중 지수 등락률 (비중 합이 0이면 0)"""
+        if self.total_weight <= 0: return 0.0
+        return float(self.sector_sum.sum() / self.total_weight)
+
+    def sector_changes(self):
+        """섹터별 가중 등락률 배열 (유효 비중이 없는 섹터는 NaN)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.sector_weight > 0, self.sector_sum / self.sector_weight, np.nan)
+
+    def percentiles(self):
+        """등락률 분포 백분위 {10: .., 25: .., 50: .., 75: .., 90: ..}"""
+        if self._percentiles is None:
+            values = np.percentile(self.changes, PERCENTILES) if self.n else np.zeros(len(PERCENTILES))
+            self._percentiles = dict(zip(PERCENTILES, values.tolist()))
+        return self._percentiles
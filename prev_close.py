@@ -0,0 +1,62 @@
+"""
+[PREV-CLOSE] 직전 종가 캐시 (세션 기준일별, 디스크 영구 저장)
+직전 종가는 하루 동안 변하지 않으므로 세션이 바뀔 때만 다시 받고, 장중 갱신은 최근가만 요청
+세션 기준일 = 종목별 마지막 유효 종가 행의 날짜 서수 (date.toordinal())
+"""
+import os
+import threading
+
+import numpy as np
+
+
+class PrevCloseCache:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}  # {ticker: (prev_close, session)}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def lookup(self, tickers, session):
+        """
+        tickers의 직전 종가 배열 (session에 해당하는 값이 없으면 NaN)
+        session: 세션 서수 하나 또는 종목별 배열 (0 = 세션 없음)
+        """
+        nan = (np.nan, 0)
+        sessions = np.broadcast_to(np.asarray(session, dtype=np.int64), (len(tickers),)).tolist()
+        with self._lock:
+            pairs = [self._entries.get(t, nan) for t in tickers]
+        return np.fromiter((p if s == want and want > 0 else np.nan for (p, s), want in zip(pairs, sessions)),
+                           dtype=np.float64, count=len(pairs))
+
+    def update(self, tickers, prev, session):
+        """session(하나 또는 종목별 배열) 기준 직전 종가 기록 (NaN/0 이하는 무시)"""
+        sessions = np.broadcast_to(np.asarray(session, dtype=np.int64), (len(tickers),)).tolist()
+        with self._lock:
+            for t, p, s in zip(tickers, np.asarray(prev, dtype=np.float64).tolist(), sessions):
+                if p == p and p > 0:
+                    self._entries[t] = (p, s)
+                    self._dirty = True
+
+    def load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                self._entries = dict(zip(data["tickers"].tolist(),
+                                         zip(data["prev"].tolist(), data["session"].tolist())))
+        except (OSError, KeyError, ValueError):
+            self._entries = {}
+
+    def save(self):
+        """바뀐 내용이 있을 때만 기록 (임시 파일 후 교체)"""
+        with self._lock:
+            if not self._dirty: return
+            tickers = list(self._entries)
+            prev = np.array([self._entries[t][0] for t in tickers], dtype=np.float64)
+            session = np.array([self._entries[t][1] for t in tickers], dtype=np.int32)
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp.npz"
+        try:
+            np.savez(tmp_path, tickers=np.array(tickers, dtype=str), prev=prev, session=session)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Prev-close cache save failed: {e}")
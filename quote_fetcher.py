@@ -0,0 +1,115 @@
+"""
+[QUOTE-FETCHER] 갱신 1회 로직 (Qt 없음: DataFetcher 스레드와 워커 프로세스 공용)
+요청 대상 선정 → 배치 병렬 다운로드 → 등락률 계산 → 상태 기록 → 재시도 → 스냅샷 저장
+결과는 유니버스 인덱스 정렬 배열 (NaN = 이번 갱신에서 받지 못한 종목)
+"""
+import time
+
+import numpy as np
+
+from quote_parse import changes_from_prices
+from fetch_scheduler import FetchScheduler, RetryPolicy, TokenBucket
+from quote_providers import record_snapshot
+
+
+class QuoteFetcher:
+    def __init__(self, tickers, weights, provider, status, fetch_options=None, store=None, record_dir=None,
+                 bucket=None):
+        self.tickers = list(tickers)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.provider = provider
+        self.status = status
+        self.fetch_options = fetch_options or {}  # config.json "fetch" 섹션
+        self.store = store
+        self.record_dir = record_dir
+        # [RATE-LIMIT] 일봉 종가 동기화와 공유하는 토큰 버킷 (설정한 요청 속도는 프로세스 전체 합계)
+        self.bucket = bucket if bucket is not None else TokenBucket.from_config(self.fetch_options)
+
+    def _indices(self, batch):
+        return np.array([self.ticker_index[t] for t in batch], dtype=np.intp)
+
+    @staticmethod
+    def _failed_in(batch, result):
+        """배치 결과 중 등락률을 계산하지 못한 티커"""
+        changes = changes_from_prices(*result)
+        return [t for t, c in zip(batch, changes.tolist()) if c != c]
+
+    def fetch(self, request_mask=None, on_batch=None):
+        """
+        request_mask: 이번 회차에 요청할 종목 (None이면 전체)
+        on_batch(indices, changes): 배치 완료 시 부분 결과 (스트리밍용, 완료 순서)
+        반환: 등락률 배열 (NaN = 받지 못함, 호출자는 기존 값 유지)
+        """
+        tickers = self.tickers
+        n = len(tickers)
+        price, prev = np.full(n, np.nan), np.full(n, np.nan)
+        stream = None
+        if on_batch is not None:
+            stream = lambda batch, result: on_batch(self._indices(batch), changes_from_prices(*result))
+
+        print(f"[INFO] 데이터 페치 시작... ({n}개 종목, provider={self.provider.name})")
+        started = time.monotonic()
+        self.provider.begin_refresh()
+
+        # [STREAMING] 시가총액 큰 종목부터 요청하여 화면 면적이 큰 타일이 먼저 채워지도록 함
+        # [QUOTE-STATUS] 서킷 브레이커가 열린 종목은 요청에서 제외
+        requestable = self.status.requestable()
+        if request_mask is not None:
+            requestable &= request_mask
+        candidates = np.nonzero(requestable)[0]
+        requested = candidates[np.argsort(-self.weights[candidates], kind="stable")]
+
+        # [FETCH-SCHEDULER] 동시 실행 수 + 토큰 버킷 속도 제한으로 배치 병렬 요청, 결과는 마지막에 한 번에 병합
+        scheduler = FetchScheduler.from_config(self.provider.fetch_batch, self.fetch_options, bucket=self.bucket)
+        results = scheduler.run([tickers[i] for i in requested.tolist()], on_batch=stream)
+        done = 0
+        for batch, result in results:
+            if result is None: continue
+            idx = self._indices(batch)
+            price[idx], prev[idx] = result
+            done += 1
+        print(f"[INFO] Download done in {time.monotonic() - started:.1f}s ({done} batches)")
+
+        # [VECTOR-PARSE] 전 종목 등락률을 한 번에 계산 (유니버스 인덱스 정렬)
+        changes = changes_from_prices(price, prev)
+        self.status.record(requested, changes[requested])
+
+        # [SUCCESS/FAIL STATS] 보합(0%)은 성공, 값을 받지 못한 종목만 실패
+        failed = requested[~np.isfinite(changes[requested])]
+        print(f"[INFO] Fetch complete: {requested.size - failed.size}/{requested.size} success "
+              f"({n - requested.size} not due)")
+
+        # [RETRY] 실패 종목을 작은 배치로 병렬 재시도 (지터 백오프, 라운드/시간 예산 제한)
+        # 예산 안에 복구되지 못한 종목은 다음 정기 갱신으로 넘기고 이번 결과는 지연시키지 않음
+        retry = self.status.retry_candidates(failed)
+        if retry.size:
+            print(f"[RETRY] Retrying {retry.size}/{failed.size} failed tickers: {[tickers[i] for i in retry.tolist()]}")
+            policy = RetryPolicy.from_config(self.fetch_options)
+            results, leftover = policy.run(scheduler, [tickers[i] for i in retry.tolist()],
+                                           self._failed_in, on_batch=stream)
+            for batch, (b_price, b_prev) in results:
+                idx = self._indices(batch)
+                b_changes = changes_from_prices(b_price, b_prev)
+                ok = np.isfinite(b_changes)
+                price[idx[ok]], prev[idx[ok]], changes[idx[ok]] = b_price[ok], b_prev[ok], b_changes[ok]
+                self.status.record(idx[ok], b_changes[ok])
+            # 남은 실패는 다음 갱신까지 종목별 지수 백오프
+            self.status.backoff([self.ticker_index[t] for t in leftover])
+
+        # Final stats
+        final_failed = [tickers[i] for i in requested.tolist() if not np.isfinite(changes[i])]
+        print(f"[INFO] Final: {requested.size - len(final_failed)}/{requested.size} success, status={self.status.summary()}")
+        if final_failed:
+            print(f"[WARN] Still failed: {final_failed}")
+
+        self.provider.end_refresh()
+
+        # [SNAPSHOT-STORE] 다음 실행 시 즉시 그릴 수 있도록 종목별 마지막 성공 값 저장
+        if self.store is not None:
+            self.store.append(time.time(), self.status.value, self.status.status)
+
+        # [RECORD] ReplayProvider로 재생할 수 있도록 이번 갱신 결과 저장
+        if self.record_dir:
+            record_snapshot(self.record_dir, tickers, price, prev)
+        return changes
@@ -0,0 +1,298 @@
+"""
+[QUOTE-HUB] 같은 호스트의 여러 인스턴스가 하나의 페처를 공유하는 로컬 시세 허브
+- 허브(서버): 평소처럼 페치하고 갱신마다 버전 번호가 붙은 스냅샷을 게시
+- 구독자(클라이언트): 접속 직후 전체 스냅샷 1회, 이후에는 바뀐 종목만 담은 델타 수신
+- 전송은 구독자별 전용 스레드 + 제한된 큐 (publish는 큐에 넣기만 하므로 GUI 스레드를 막지 않음),
+  큐가 가득 찰 만큼 밀린 구독자는 연결을 끊음 (재접속하면 전체 스냅샷부터 다시 받음)
+주소: "unix:/path/to.sock" (POSIX) 또는 "tcp:127.0.0.1:PORT"
+  기본 주소는 $XDG_RUNTIME_DIR(없으면 사용자별 0700 임시 디렉터리)의 유닉스 소켓, 유닉스 소켓이 없으면 TCP
+메시지: [LEN u32][HEADER][본문], 본문은 numpy 배열 바이트 (pickle 사용 안 함)
+  FULL : [TICKERS_HASH 16B][value f8 N][status i1 N][last_success f8 N]
+  DELTA: [indices u32 K][value f8 K][status i1 K][last_success f8 K]
+"""
+import os
+import queue
+import socket
+import stat
+import struct
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+
+from snapshot_store import tickers_hash
+
+MAGIC = b"NHQH"
+FULL, DELTA = 1, 2
+_LEN = struct.Struct("<I")
+_HEADER = struct.Struct("<4sBQQdI")  # magic, kind, version, base_version, timestamp, count
+DEFAULT_TCP = "tcp:127.0.0.1:47653"
+SOCKET_NAME = "nireum_heatmap_hub.sock"
+SEND_TIMEOUT = 2.0
+MAX_PENDING = 8  # 구독자별 전송 대기 프레임 수 (넘치면 밀린 구독자로 보고 연결 종료)
+
+
+def runtime_dir():
+    """
+    기본 유닉스 소켓 디렉터리: $XDG_RUNTIME_DIR, 없으면 임시 디렉터리 아래 사용자별 0700 디렉터리
+    다른 사용자 소유이거나 그룹/기타 사용자에게 열려 있으면 OSError (남이 만든 허브에 붙거나 가로채이지 않도록)
+    """
+    path = os.environ.get("XDG_RUNTIME_DIR")
+    if not path or not os.path.isdir(path):
+        path = os.path.join(tempfile.gettempdir(), f"nireum-heatmap-{os.getuid()}")
+        try: os.mkdir(path, 0o700)
+        except FileExistsError: pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"insecure hub socket directory {path}")
+    return path
+
+
+def default_address():
+    if hasattr(socket, "AF_UNIX") and os.name == "posix":
+        try:
+            return "unix:" + os.path.join(runtime_dir(), SOCKET_NAME)
+        except OSError as e:
+            print(f"[WARN] {e}, using {DEFAULT_TCP}")
+    return DEFAULT_TCP
+
+
+def _parse(address):
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, rest
+    host, _, port = rest.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk: raise ConnectionError("hub connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _frame(kind, version, base, timestamp, count, parts):
+    body = _HEADER.pack(MAGIC, kind, version, base, timestamp, count) + b"".join(parts)
+    return _LEN.pack(len(body)) + body
+
+
+class _Subscriber:
+    """허브 쪽 구독자 연결 1개: 프레임은 전용 스레드가 순서대로 전송"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.queue = queue.Queue(MAX_PENDING)
+        self.alive = True
+        threading.Thread(target=self._send_loop, name="QuoteHubSend", daemon=True).start()
+
+    def offer(self, frame):
+        """전송 대기열에 추가 (대기 없음), 연결이 끊겼거나 대기열이 가득 차면 False"""
+        if not self.alive: return False
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            return False
+        return True
+
+    def _send_loop(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None: break
+            try:
+                self.conn.sendall(frame)
+            except OSError:
+                break
+        self.alive = False
+        self.conn.close()
+
+    def close(self):
+        """연결 종료 (전송 중인 sendall도 즉시 실패하도록 소켓 shutdown)"""
+        self.alive = False
+        try: self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError: pass
+        try: self.queue.put_nowait(None)
+        except queue.Full: pass
+
+
+class QuoteHubServer:
+    def __init__(self, address, tickers):
+        self.family, self.sockaddr = _parse(address)
+        self.key = tickers_hash(tickers)
+        n = len(tickers)
+        self.value = np.full(n, np.nan)
+        self.status = np.zeros(n, dtype=np.int8)
+        self.last_success = np.zeros(n, dtype=np.float64)
+        self.version = 0
+        self.timestamp = 0.0
+        self.clients = []
+        self.lock = threading.Lock()
+        self.sock = None
+        self._lock_fd = None  # 유닉스 소켓 경로 소유 락 (허브가 살아 있는 동안 유지)
+
+    def start(self):
+        """바인드 + 접속 대기 스레드 시작, 이미 다른 허브가 있으면(락 또는 바인드 실패) OSError"""
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            if self.family == socket.AF_UNIX:
+                self._bind_unix(sock)
+            else:
+                sock.bind(self.sockaddr)
+            sock.listen(8)
+        except OSError:
+            sock.close()
+            self._release_path()
+            raise
+        self.sock = sock
+        threading.Thread(target=self._accept_loop, name="QuoteHubAccept", daemon=True).start()
+        print(f"[HUB] Serving quotes at {self.sockaddr}")
+
+    def _bind_unix(self, sock):
+        """
+        소켓 경로 옆 락 파일을 잡은 허브만 경로를 다룸: 락을 잡았다면 남아 있는 소켓 파일은 비정상 종료 흔적이므로 정리
+        락을 못 잡거나 바인드가 실패하면 다른 허브가 먼저 시작한 것 (파일은 건드리지 않음)
+        소켓 파일은 소유자만 접속할 수 있도록 제한된 umask로 생성
+        """
+        if fcntl is not None:
+            fd = os.open(self.sockaddr + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                raise OSError(f"hub already running at {self.sockaddr}")
+            self._lock_fd = fd
+            try: os.unlink(self.sockaddr)
+            except FileNotFoundError: pass
+        mask = os.umask(0o177)
+        try:
+            sock.bind(self.sockaddr)
+        finally:
+            os.umask(mask)
+
+    def _release_path(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _full_frame(self):
+        return _frame(FULL, self.version, 0, self.timestamp, self.value.shape[0],
+                      [self.key, self.value.astype("<f8").tobytes(), self.status.tobytes(),
+                       self.last_success.astype("<f8").tobytes()])
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            conn.settimeout(SEND_TIMEOUT)
+            subscriber = _Subscriber(conn)
+            with self.lock:
+                subscriber.offer(self._full_frame())  # 접속 직후 전체 스냅샷 (이후 델타보다 먼저 전송)
+                self.clients.append(subscriber)
+            print(f"[HUB] Subscriber connected ({len(self.clients)} total)")
+
+    def publish(self, value, status, last_success, timestamp):
+        """새 버전 게시: 바뀐 종목만 델타로 각 구독자 대기열에 추가 (전송을 기다리지 않음), 끊기거나 밀린 구독자는 제거"""
+        value = np.asarray(value, dtype=np.float64)
+        status = np.asarray(status, dtype=np.int8)
+        last_success = np.asarray(last_success, dtype=np.float64)
+        with self.lock:
+            same_value = (value == self.value) | (np.isnan(value) & np.isnan(self.value))
+            changed = np.nonzero(~same_value | (status != self.status) | (last_success != self.last_success))[0]
+            base = self.version
+            self.version += 1
+            self.timestamp = timestamp
+            self.value[:], self.status[:], self.last_success[:] = value, status, last_success
+            frame = _frame(DELTA, self.version, base, timestamp, changed.size,
+                           [changed.astype("<u4").tobytes(), value[changed].astype("<f8").tobytes(),
+                            status[changed].tobytes(), last_success[changed].astype("<f8").tobytes()])
+            alive = []
+            for subscriber in self.clients:
+                if subscriber.offer(frame):
+                    alive.append(subscriber)
+                else:
+                    subscriber.close()
+            dropped = len(self.clients) - len(alive)
+            self.clients = alive
+        if dropped:
+            print(f"[HUB] Dropped {dropped} closed or lagging subscriber(s)")
+        return self.version, changed
+
+    def close(self):
+        with self.lock:
+            for subscriber in self.clients: subscriber.close()
+            self.clients = []
+        if self.sock is not None:
+            self.sock.close()
+            if self.family == socket.AF_UNIX:
+                # 락을 놓기 전에 지워야 다음 허브의 소켓 파일을 지우지 않음
+                try: os.unlink(self.sockaddr)
+                except OSError: pass
+            self._release_path()
+
+
+class QuoteHubClient:
+    """허브 구독 (blocking recv, 호출자 스레드에서 사용)"""
+    def __init__(self, address, tickers):
+        self.family, self.sockaddr = _parse(address)
+        self.key = tickers_hash(tickers)
+        n = len(tickers)
+        self.value = np.full(n, np.nan)
+        self.status = np.zeros(n, dtype=np.int8)
+        self.last_success = np.zeros(n, dtype=np.float64)
+        self.version = -1
+        self.timestamp = 0.0
+        self.sock = None
+
+    def connect(self, timeout=1.0):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.sockaddr)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        self.sock = sock
+
+    def receive(self):
+        """
+        다음 스냅샷 1개 수신 후 로컬 배열에 반영
+        반환: (version, 바뀐 인덱스 배열), 연결 종료 시 ConnectionError, 유니버스 불일치 시 ValueError
+        """
+        size, = _LEN.unpack(_recv_exact(self.sock, _LEN.size))
+        body = _recv_exact(self.sock, size)
+        magic, kind, version, base, timestamp, count = _HEADER.unpack_from(body, 0)
+        if magic != MAGIC: raise ValueError("not a quote hub")
+        offset = _HEADER.size
+        if kind == FULL:
+            if body[offset:offset + 16] != self.key or count != self.value.shape[0]:
+                raise ValueError("hub serves a different ticker universe")
+            offset += 16
+            idx = np.arange(count)
+        else:
+            if base != self.version: raise ConnectionError(f"missed hub version {base}")
+            idx = np.frombuffer(body, dtype="<u4", count=count, offset=offset).astype(np.intp)
+            offset += 4 * count
+        self.value[idx] = np.frombuffer(body, dtype="<f8", count=count, offset=offset)
+        offset += 8 * count
+        self.status[idx] = np.frombuffer(body, dtype="i1", count=count, offset=offset)
+        offset += count
+        self.last_success[idx] = np.frombuffer(body, dtype="<f8", count=count, offset=offset)
+        self.version, self.timestamp = version, timestamp
+        return version, idx
+
+    def close(self):
+        if self.sock is not None:
+            try: self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError: pass
+            self.sock.close()
+            self.sock = None
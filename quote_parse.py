@@ -0,0 +1,108 @@
+"""
+[VECTOR-PARSE] yfinance 다운로드 결과(MultiIndex DataFrame) → 유니버스 인덱스에 정렬된 등락률 배열
+종목별 슬라이싱/iloc 없이 Close/Open 필드를 2D 배열로 꺼내 한 번에 계산
+"""
+import numpy as np
+
+
+def field_matrix(df, field, tickers):
+    """
+    df에서 field(Close/Open 등) 레벨을 꺼내 (T, N) float 배열로 반환
+    열 순서는 tickers(유니버스 순서)와 같고, 없는 종목은 NaN
+    """
+    import pandas as pd  # 프레임을 다루는 쪽(페치 스레드/워커 프로세스)에서만 로드
+    n = len(tickers)
+    if df is None or df.empty: return np.full((0, n), np.nan)
+    cols = df.columns
+    if isinstance(cols, pd.MultiIndex):
+        # yfinance 버전에 따라 (Ticker, Price) / (Price, Ticker) 순서가 다름
+        for level in range(cols.nlevels):
+            if field in cols.get_level_values(level):
+                frame = df.xs(field, axis=1, level=level)
+                break
+        else:
+            return np.full((len(df), n), np.nan)
+    else:
+        # 단일 종목 다운로드: 컬럼이 필드 이름
+        if field not in cols or n != 1: return np.full((len(df), n), np.nan)
+        frame = df[[field]]
+        frame.columns = list(tickers)
+    # 배치 병합 시 중복된 종목 열은 첫 번째만 사용
+    frame = frame.loc[:, ~frame.columns.duplicated()]
+    return frame.reindex(columns=list(tickers)).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def ffill_2d(arr):
+    """열 방향(시간축) forward-fill (선행 NaN은 그대로 유지)"""
+    if arr.shape[0] == 0: return arr
+    valid = ~np.isnan(arr)
+    idx = np.where(valid, np.arange(arr.shape[0])[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return arr[idx, np.arange(arr.shape[1])]
+
+
+def session_ordinals(df):
+    """프레임 행별 날짜 서수 배열 (일봉 종가 캐시의 세션 키)"""
+    import pandas as pd
+    if df is None or df.empty: return np.zeros(0, dtype=np.int32)
+    return np.array([pd.Timestamp(t).date().toordinal() for t in df.index], dtype=np.int32)
+
+
+def last_two_closes(df, tickers):
+    """
+    종목별 (최근 종가, 직전 종가) 배열 반환
+    직전 종가가 없거나 0 이하이면 마지막 행의 Open으로 보완, 계산 불가 종목은 NaN
+    """
+    close = ffill_2d(field_matrix(df, 'Close', tickers))
+    n = len(tickers)
+    if close.shape[0] == 0: return np.full(n, np.nan), np.full(n, np.nan)
+
+    price = close[-1]
+    prev = close[-2] if close.shape[0] >= 2 else np.full(n, np.nan)
+
+    # prev_close nan 체크 및 Open가 보완
+    open_ = ffill_2d(field_matrix(df, 'Open', tickers))
+    open_last = open_[-1] if open_.shape[0] else np.full(n, np.nan)
+    with np.errstate(invalid='ignore'):
+        prev = np.where(np.isnan(prev) | (prev <= 0), open_last, prev)
+    return price, prev
+
+
+def last_valid_closes(df, tickers):
+    """
+    종목별 자기 마지막 유효 종가 행 기준 (최근가, 직전 종가, 세션 서수, 실제 직전 종가 여부) 배열
+    여러 종목을 한 번에 받으면 종목마다 마지막 행 날짜가 다를 수 있음 (거래 정지/상장 직후 등)
+    - 세션: 그 종목의 마지막 유효 종가 행 날짜 서수 (직전 종가 캐시의 세션 키), 데이터가 없으면 0
+    - 직전 종가: 그 이전의 유효 종가, 없거나 0 이하이면 마지막 유효 행의 Open
+    - 실제 직전 종가 여부: Open 보완이 아닌 이전 행 종가이면 True (캐시에는 이 값만 저장)
+    """
+    close = field_matrix(df, 'Close', tickers)
+    n = len(tickers)
+    if close.shape[0] == 0:
+        return np.full(n, np.nan), np.full(n, np.nan), np.zeros(n, dtype=np.int32), np.zeros(n, dtype=bool)
+    valid = ~np.isnan(close)
+    rows = np.arange(close.shape[0])[:, None]
+    cols = np.arange(n)
+    has = valid.any(axis=0)
+    last = np.where(valid, rows, -1).max(axis=0)
+    before = np.where(valid & (rows < last), rows, -1).max(axis=0)
+    last_row = np.maximum(last, 0)
+
+    price = np.where(has, close[last_row, cols], np.nan)
+    prev = np.where(before >= 0, close[np.maximum(before, 0), cols], np.nan)
+    open_last = np.where(has, ffill_2d(field_matrix(df, 'Open', tickers))[last_row, cols], np.nan)
+    with np.errstate(invalid='ignore'):
+        real = prev > 0
+    prev = np.where(real, prev, open_last)
+    sessions = np.where(has, session_ordinals(df)[last_row], 0).astype(np.int32)
+    return price, prev, sessions, real
+
+
+def changes_from_prices(price, prev):
+    """(최근가, 직전 종가) 배열 → 등락률(%) 배열, 계산 불가 종목은 NaN"""
+    price = np.asarray(price, dtype=np.float64)
+    prev = np.asarray(prev, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        changes = np.where(np.isfinite(price) & np.isfinite(prev) & (prev > 0),
+                           (price - prev) / prev * 100, np.nan)
+    return np.round(changes, 2)
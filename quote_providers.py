@@ -0,0 +1,233 @@
+"""
+[QUOTE-PROVIDER] 시세 공급자 인터페이스
+- YFinanceProvider: yfinance 다운로드 (기본)
+- SyntheticProvider: 네트워크 없이 결정적인 가상 시세 (벤치마크/부하 테스트용)
+- ReplayProvider: record_snapshot()으로 저장한 스냅샷을 순서대로 재생
+공급자 인터페이스 (덕 타이핑, 공통 베이스 클래스 없음)
+- name: 공급자 이름, always_open: True면 장 시간과 무관하게 갱신 (오프라인 공급자)
+- begin_refresh() / end_refresh(): 전체 갱신 1회의 시작(배치 요청 전)/종료(재시도 포함, 캐시 저장 등) 시 호출
+- fetch_batch(tickers) → (price, prev_close) float 배열 (tickers 순서, 계산 불가 종목은 NaN)
+- fetch_history(tickers, period) → (세션 날짜 서수 (T,), 일봉 종가 (T, K)), period: "5d" | "1mo" | "1y"
+  진행 중인 당일 세션 포함, 선택 구현 (없으면 기간별 보기 비활성, hasattr로 확인)
+"""
+import os
+import time
+import zlib
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+
+class YFinanceProvider:
+    """
+    prev_cache(PrevCloseCache)가 있으면 장중 갱신은 period="1d"(최근가)만 요청하고,
+    세션이 바뀌었거나 캐시에 없는 종목만 period="2d"로 직전 종가를 채움
+    """
+    name = "yfinance"
+    always_open = False
+
+    def __init__(self, prev_cache=None):
+        self.prev_cache = prev_cache
+        self._yf = None
+
+    def begin_refresh(self):
+        self._load()
+
+    def _load(self):
+        # [LAZY-IMPORT] yfinance/pandas는 첫 갱신 때 페치 스레드(또는 워커 프로세스)에서 로드
+        # GUI 시작 경로(미니 위젯 첫 표시)에는 데이터 스택 import 비용이 들지 않음
+        if self._yf is None:
+            started = time.perf_counter()
+            import yfinance as yf
+            self._yf = yf
+            print(f"[INFO] Data stack loaded ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+    def end_refresh(self):
+        if self.prev_cache is not None:
+            self.prev_cache.save()
+
+    def _download(self, tickers, period):
+        # 배치 간 병렬화는 FetchScheduler가 담당하므로 yfinance 내부 스레드는 사용하지 않음
+        return self._yf.download(tickers, period=period, group_by='ticker', progress=False, threads=False)
+
+    def fetch_batch(self, tickers):
+        from quote_parse import last_two_closes, last_valid_closes
+        tickers = list(tickers)
+        if self.prev_cache is None:
+            return last_two_closes(self._download(tickers, "2d"), tickers)
+
+        # 세션은 종목마다 자기 마지막 유효 행 기준 (배치에 그 날짜 행이 없는 종목도 있음)
+        df = self._download(tickers, "1d")
+        price, _, session, _ = last_valid_closes(df, tickers)
+        prev = self.prev_cache.lookup(tickers, session)
+        missing = np.isnan(prev)
+        if missing.any():
+            # [PREV-CLOSE] 새 세션 첫 갱신, 캐시 없음, 또는 1일치에 행이 없는 종목만 2일치로 직전 종가 확보
+            sub = [t for t, m in zip(tickers, missing.tolist()) if m]
+            sub_price, sub_prev, sub_session, real = last_valid_closes(self._download(sub, "2d"), sub)
+            # 1일치보다 오래된 행만 있으면 사용하지 않음 (다음 갱신에서 다시 요청)
+            ok = (sub_session > 0) & (sub_session >= session[missing])
+            # Open 보완 값은 이번 결과에만 사용하고 캐시하지 않음 (다음 갱신에서 실제 직전 종가를 다시 확인)
+            cache = ok & real
+            self.prev_cache.update([t for t, k in zip(sub, cache.tolist()) if k], sub_prev[cache], sub_session[cache])
+            price[missing] = np.where(ok, sub_price, price[missing])
+            prev[missing] = np.where(ok, sub_prev, np.nan)
+        return price, prev
+
+    def fetch_history(self, tickers, period):
+        """[TIMEFRAME] 일봉 종가 (세션 서수 (T,), 종가 (T, K)), 빈 값은 NaN 그대로 (캐시 병합 시 기존 값 유지)"""
+        from quote_parse import field_matrix, session_ordinals
+        self._load()
+        tickers = list(tickers)
+        df = self._yf.download(tickers, period=period, interval="1d", group_by='ticker', progress=False, threads=False)
+        return session_ordinals(df), field_matrix(df, 'Close', tickers)
+
+
+def _mix32(x):
+    """32비트 정수 해시 믹서 (벡터화)"""
+    x = x.astype(np.uint64) & 0xFFFFFFFF
+    x ^= x >> 16; x = (x * 0x7FEB352D) & 0xFFFFFFFF
+    x ^= x >> 15; x = (x * 0x846CA68B) & 0xFFFFFFFF
+    x ^= x >> 16
+    return x
+
+
+class SyntheticProvider:
+    """
+    티커/seed/갱신 회차만으로 결정되는 가상 시세
+    latency: 배치당 지연(초), failure_rate: 종목별 실패(NaN) 비율
+    """
+    name = "synthetic"
+    always_open = True
+
+    def __init__(self, seed=0, volatility=2.0, latency=0.0, failure_rate=0.0):
+        self.seed = int(seed)
+        self.volatility = float(volatility)
+        self.latency = float(latency)
+        self.failure_rate = float(failure_rate)
+        self.step = 0
+
+    def begin_refresh(self):
+        self.step += 1
+
+    def end_refresh(self):
+        pass
+
+    def _uniform(self, tickers, salt):
+        codes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tickers), dtype=np.uint64, count=len(tickers))
+        h = _mix32(codes ^ np.uint64((self.seed * 0x9E3779B1 + salt) & 0xFFFFFFFF))
+        h = _mix32(h ^ np.uint64((self.step * 0x85EBCA6B) & 0xFFFFFFFF))
+        return (h.astype(np.float64) + 0.5) / 4294967296.0
+
+    @staticmethod
+    def _codes(tickers):
+        return np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tickers), dtype=np.uint64, count=len(tickers))
+
+    @staticmethod
+    def _base(codes):
+        return 20.0 + (_mix32(codes) % 48000).astype(np.float64) / 100.0  # 종목별 고정 기준가 20~500
+
+    def fetch_batch(self, tickers):
+        if self.latency > 0: time.sleep(self.latency)
+        tickers = list(tickers)
+        prev = self._base(self._codes(tickers))
+        # 두 균등분포 합으로 종 모양 분포 근사 (-volatility ~ +volatility 중심)
+        u = self._uniform(tickers, 1) + self._uniform(tickers, 2) - 1.0
+        price = prev * (1.0 + u * self.volatility / 100.0)
+        if self.failure_rate > 0:
+            price[self._uniform(tickers, 3) < self.failure_rate] = np.nan
+        return price, prev
+
+    def fetch_history(self, tickers, period):
+        """
+        [TIMEFRAME] 오늘까지 평일 세션의 가상 일봉 종가 (날짜/티커/seed로 결정, 다시 받아도 같은 값)
+        오늘 직전 세션 종가 = fetch_batch의 기준가 (1D 등락률과 이어지도록 과거 방향으로 역산)
+        """
+        if self.latency > 0: time.sleep(self.latency)
+        days = {"5d": 5, "1mo": 21}.get(period, 252)
+        today = np.datetime64(date.today(), "D")
+        dates = np.busday_offset(today, -np.arange(days)[::-1], roll="backward")
+        sessions = (dates - np.datetime64("0001-01-01", "D")).astype(np.int64) + 1  # date.toordinal()
+        codes = self._codes(list(tickers))
+        salt = np.uint64((self.seed * 0x9E3779B1 + 7) & 0xFFFFFFFF)
+        h1 = _mix32(codes[None, :] ^ _mix32(sessions.astype(np.uint64) ^ salt)[:, None])
+        h2 = _mix32(h1 ^ np.uint64(0x5BD1E995))
+        u = ((h1.astype(np.float64) + 0.5) + (h2.astype(np.float64) + 0.5)) / 4294967296.0 - 1.0
+        drift = ((_mix32(codes ^ salt) % 1000).astype(np.float64) / 1000.0 - 0.5) * 0.004  # 종목별 추세
+        returns = u * self.volatility / 100.0 * 0.8 + drift  # 세션 t의 전 세션 대비 수익률
+        # closes[t] = closes[t + 1] / (1 + returns[t + 1]), closes[-2] = 기준가
+        growth = np.cumprod((1.0 + returns[:0:-1]), axis=0)[::-1]  # growth[t] = Π(1 + returns[t+1:])
+        closes = np.empty((days, len(codes)))
+        closes[:-1] = self._base(codes) * (1.0 + returns[-1]) / growth
+        closes[-1] = closes[-2] * (1.0 + returns[-1])
+        return sessions.astype(np.int32), closes
+
+
+class ReplayProvider:
+    """
+    디렉터리의 스냅샷 파일(*.npz, 이름순)을 갱신마다 하나씩 재생
+    loop=False면 마지막 스냅샷에서 멈춤
+    """
+    name = "replay"
+    always_open = True
+
+    def __init__(self, directory, loop=True):
+        self.files = sorted(Path(directory).glob("*.npz"))
+        if not self.files:
+            print(f"[WARN] Replay: no snapshots in {directory}")
+        self.loop = loop
+        self.position = -1
+        self.current = {}  # {ticker: (price, prev)}
+
+    def begin_refresh(self):
+        if not self.files: return
+        self.position += 1
+        if self.position >= len(self.files):
+            self.position = 0 if self.loop else len(self.files) - 1
+        with np.load(self.files[self.position], allow_pickle=False) as data:
+            self.current = dict(zip(data["tickers"].tolist(), zip(data["price"].tolist(), data["prev"].tolist())))
+        print(f"[INFO] Replay snapshot {self.position + 1}/{len(self.files)}: {self.files[self.position].name}")
+
+    def end_refresh(self):
+        pass
+
+    def fetch_batch(self, tickers):
+        nan = (np.nan, np.nan)
+        pairs = [self.current.get(t, nan) for t in tickers]
+        price = np.fromiter((p for p, _ in pairs), dtype=np.float64, count=len(pairs))
+        prev = np.fromiter((q for _, q in pairs), dtype=np.float64, count=len(pairs))
+        return price, prev
+
+
+def record_snapshot(directory, tickers, price, prev, timestamp=None):
+    """ReplayProvider가 읽을 수 있는 스냅샷 파일 저장"""
+    timestamp = time.time() if timestamp is None else timestamp
+    os.makedirs(directory, exist_ok=True)
+    path = Path(directory) / f"{int(timestamp * 1000):015d}.npz"
+    np.savez_compressed(path, tickers=np.array(tickers, dtype=str), price=np.asarray(price, dtype=np.float64),
+                        prev=np.asarray(prev, dtype=np.float64), timestamp=np.float64(timestamp))
+    return path
+
+
+def make_provider(name=None, options=None):
+    """
+    이름으로 공급자 생성 ("yfinance" | "synthetic" | "replay")
+    options: config.json "provider_options" 섹션
+             (yfinance: prev_close_file, synthetic: seed/volatility/latency/failure_rate, replay: dir/loop)
+    """
+    options = options or {}
+    name = (name or "yfinance").lower()
+    if name == "synthetic":
+        return SyntheticProvider(seed=options.get("seed", 0), volatility=options.get("volatility", 2.0),
+                                 latency=options.get("latency", 0.0), failure_rate=options.get("failure_rate", 0.0))
+    if name == "replay":
+        return ReplayProvider(options.get("dir", "snapshots"), loop=options.get("loop", True))
+    if name != "yfinance":
+        print(f"[WARN] Unknown provider '{name}', using yfinance")
+    # [PREV-CLOSE] prev_close_file이 없거나 비어 있으면(false/"") 매번 2일치 다운로드
+    path = options.get("prev_close_file")
+    if not path:
+        return YFinanceProvider()
+    from prev_close import PrevCloseCache
+    return YFinanceProvider(prev_cache=PrevCloseCache(path))
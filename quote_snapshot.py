@@ -0,0 +1,82 @@
+"""
+[QUOTE-SNAPSHOT] 불변 버전 시세 스냅샷 (페치 스레드 → GUI 스레드)
+- 모든 배열은 읽기 전용, 한 번 게시된 스냅샷은 바뀌지 않음 (잠금 없이 어느 스레드에서나 읽기 가능)
+- evolve(): 바뀐 필드만 복사하는 copy-on-write, 바뀌지 않은 배열은 이전 스냅샷과 공유
+- diff(): 두 스냅샷 사이에 값/상태가 바뀐 종목 인덱스 (공유 배열은 비교 생략)
+버전 번호는 프로세스 전역 카운터에서 발급되므로 스레드가 달라도 게시 순서대로 증가
+"""
+import itertools
+import time
+
+import numpy as np
+
+from quote_status import NEVER, STALE
+
+_versions = itertools.count(1)  # next()는 GIL 아래에서 원자적
+
+
+def _frozen(array, dtype):
+    array = np.array(array, dtype=dtype)  # 호출자 배열과 분리 (이후 수정이 스냅샷에 번지지 않도록)
+    array.flags.writeable = False
+    return array
+
+
+class QuoteSnapshot:
+    """
+    change: 화면 표시 등락률 (받은 적 없는 종목은 0)
+    value / status / last_success: QuoteStatus의 마지막 성공 값 / 상태 / 성공 시각
+    """
+    __slots__ = ("version", "timestamp", "change", "value", "status", "last_success")
+
+    def __init__(self, version, timestamp, change, value, status, last_success):
+        self.version = version
+        self.timestamp = timestamp
+        self.change, self.value = change, value
+        self.status, self.last_success = status, last_success
+
+    @classmethod
+    def empty(cls, n):
+        return cls(0, 0.0, _frozen(np.zeros(n), np.float64), _frozen(np.full(n, np.nan), np.float64),
+                   _frozen(np.full(n, NEVER), np.int8), _frozen(np.zeros(n), np.float64))
+
+    @classmethod
+    def capture(cls, value, status, last_success, timestamp=None):
+        """QuoteStatus 배열(또는 공유 메모리 뷰)을 복사하여 새 버전 생성, 표시값 = 마지막 성공 값"""
+        value = _frozen(value, np.float64)
+        change = _frozen(np.nan_to_num(value), np.float64)
+        return cls(next(_versions), time.time() if timestamp is None else timestamp, change, value,
+                   _frozen(status, np.int8), _frozen(last_success, np.float64))
+
+    def __len__(self):
+        return self.change.shape[0]
+
+    def evolve(self, indices, timestamp=None, **fields):
+        """
+        indices 종목의 필드만 바꾼 새 버전 (copy-on-write)
+        fields: change / value / status / last_success = indices와 같은 길이의 배열
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        parts = {}
+        for name in self.__slots__[2:]:
+            old = getattr(self, name)
+            if name not in fields:
+                parts[name] = old  # 바뀌지 않은 배열은 공유
+                continue
+            new = old.copy()
+            new[indices] = fields[name]
+            new.flags.writeable = False
+            parts[name] = new
+        return QuoteSnapshot(next(_versions), self.timestamp if timestamp is None else timestamp, **parts)
+
+    def diff(self, other):
+        """other(이전 스냅샷) 대비 표시값/상태가 바뀐 종목 인덱스, other가 None이면 전체"""
+        if other is None or len(other) != len(self):
+            return np.arange(len(self))
+        moved = np.zeros(len(self), dtype=bool)
+        if self.change is not other.change: moved |= self.change != other.change
+        if self.status is not other.status: moved |= self.status != other.status
+        return np.nonzero(moved)[0]
+
+    def stale_mask(self):
+        """마지막 성공 값을 표시 중이지만 최신이 아닌 종목"""
+        return self.status == STALE
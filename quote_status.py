@@ -0,0 +1,94 @@
+"""
+[QUOTE-STATUS] 종목별 페치 상태 (유니버스 인덱스 정렬 배열)
+change == 0(보합)을 실패로 보지 않고, 실제로 값을 받지 못한 종목만 실패로 기록
+- 개별 재시도는 지수 백오프로 간격을 늘림 (백오프 중인 종목은 다음 정기 갱신 요청에서도 제외)
+- 연속 실패가 breaker_threshold회 이상이면 서킷 브레이커를 열어 cooldown 동안 요청 제외
+"""
+import time
+
+import numpy as np
+
+NEVER, OK, STALE, FAILED = 0, 1, 2, 3
+STATUS_NAMES = {NEVER: "never", OK: "ok", STALE: "stale", FAILED: "failed"}
+
+
+class QuoteStatus:
+    def __init__(self, n, base_backoff=60.0, max_backoff=1800.0, breaker_threshold=6, breaker_cooldown=1800.0):
+        self.base_backoff = float(base_backoff)
+        self.max_backoff = float(max_backoff)
+        self.breaker_threshold = int(breaker_threshold)
+        self.breaker_cooldown = float(breaker_cooldown)
+
+        self.value = np.full(n, np.nan)                  # 마지막 성공 등락률
+        self.status = np.full(n, NEVER, dtype=np.int8)
+        self.last_success = np.zeros(n, dtype=np.float64)  # epoch 초 (0 = 없음)
+        self.attempts = np.zeros(n, dtype=np.int32)        # 연속 실패 횟수
+        self.next_retry = np.zeros(n, dtype=np.float64)    # 개별 재시도 가능 시각
+        self.breaker_until = np.zeros(n, dtype=np.float64) # 서킷 브레이커 해제 시각
+
+    def __len__(self):
+        return self.status.shape[0]
+
+    def record(self, indices, changes, now=None):
+        """
+        페치 결과 기록 (changes가 NaN이면 실패)
+        반환: 성공한 인덱스 배열
+        """
+        now = time.time() if now is None else now
+        indices = np.asarray(indices, dtype=np.intp)
+        changes = np.asarray(changes, dtype=np.float64)
+        ok = np.isfinite(changes)
+
+        good = indices[ok]
+        self.value[good] = changes[ok]
+        self.status[good] = OK
+        self.last_success[good] = now
+        self.attempts[good] = 0
+        self.next_retry[good] = 0
+        self.breaker_until[good] = 0
+
+        bad = indices[~ok]
+        if bad.size:
+            self.attempts[bad] += 1
+            self.status[bad] = np.where(self.last_success[bad] > 0, STALE, FAILED)
+            tripped = bad[self.attempts[bad] >= self.breaker_threshold]
+            if tripped.size:
+                self.breaker_until[tripped] = now + self.breaker_cooldown
+                print(f"[STATUS] Circuit open for {tripped.size} tickers ({self.breaker_cooldown:.0f}s)")
+        return good
+
+    def restore(self, values, timestamp):
+        """[WARM-START] 디스크 스냅샷의 마지막 성공 값으로 초기화 (이번 세션에서 갱신 전이므로 STALE)"""
+        values = np.round(np.asarray(values, dtype=np.float64), 2)  # float32 저장값 → 표시 정밀도
+        ok = np.isfinite(values)
+        self.value[ok] = values[ok]
+        self.status[ok] = STALE
+        self.last_success[ok] = timestamp
+
+    def stale_mask(self):
+        """마지막 성공 값을 표시 중이지만 최신이 아닌 종목"""
+        return self.status == STALE
+
+    def backoff(self, indices, now=None):
+        """재시도 예산 안에 복구되지 못한 종목: 다음 재시도까지 연속 실패 횟수 기준 지수 백오프"""
+        now = time.time() if now is None else now
+        indices = np.asarray(indices, dtype=np.intp)
+        if not indices.size: return
+        delay = np.minimum(self.base_backoff * 2.0 ** (np.maximum(self.attempts[indices], 1) - 1), self.max_backoff)
+        self.next_retry[indices] = now + delay
+
+    def requestable(self, now=None):
+        """백오프가 끝났고 서킷 브레이커가 닫혀 있는(요청 가능한) 종목 마스크 (쿨다운이 끝나면 다시 한 번 시도)"""
+        now = time.time() if now is None else now
+        return (self.breaker_until <= now) & (self.next_retry <= now)
+
+    def retry_candidates(self, indices, now=None):
+        """이번 갱신에서 실패한 종목 중 백오프/브레이커 조건상 지금 재시도할 종목"""
+        now = time.time() if now is None else now
+        indices = np.asarray(indices, dtype=np.intp)
+        due = (self.next_retry[indices] <= now) & (self.breaker_until[indices] <= now)
+        return indices[due]
+
+    def summary(self):
+        counts = np.bincount(self.status, minlength=4)
+        return {STATUS_NAMES[s]: int(counts[s]) for s in STATUS_NAMES}
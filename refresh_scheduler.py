@@ -0,0 +1,122 @@
+"""
+[REFRESH-SCHEDULER] 시장 캘린더 기반 적응형 갱신 주기
+- 장중: 기본 base초, 개장/폐장 전후 edge_minutes분은 min_interval초
+- 최근 갱신에서 변화가 적으면(quiet) 주기를 점점 늘려 max_interval초까지
+- 장 마감/주말/휴장일: 갱신하지 않고 다음 개장까지 대기 (최대 1시간마다 깨어나 대기 시간만 다시 계산)
+- refresh_now(): 즉시 갱신 요청 (확장 위젯 새로고침 버튼/F5)
+  갱신을 실제로 시작한 쪽이 refresh_started()를 호출해야 예약이 취소됨 (무시된 요청은 예약을 그대로 둠)
+"""
+from datetime import timedelta
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from market_calendar import MarketCalendar, eastern_now
+
+IDLE_RECHECK = 3600  # 장 마감 중 최대 대기(초): 절전/시계 변경 대비 깨어나서 대기 시간만 다시 계산 (갱신 없음)
+
+
+class RefreshScheduler(QObject):
+    refresh = pyqtSignal()
+
+    def __init__(self, calendar=None, base=120, min_interval=30, max_interval=600, edge_minutes=30,
+                 quiet_threshold=0.05, backoff=1.5, always_open=False, parent=None):
+        """
+        quiet_threshold: 직전 갱신 대비 표시값이 바뀐 종목 비율이 이보다 작으면 주기를 backoff배 늘림
+        always_open: 오프라인 공급자(synthetic/replay)처럼 장 시간과 무관하게 base 주기로 갱신
+        """
+        super().__init__(parent)
+        self.calendar = calendar if calendar is not None else MarketCalendar()
+        self.base = float(base)
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.edge = timedelta(minutes=edge_minutes)
+        self.quiet_threshold = float(quiet_threshold)
+        self.backoff = float(backoff)
+        self.always_open = always_open
+        self.interval = self.base  # 장중 현재 주기 (변화량에 따라 조정)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+        self._idle = False  # 현재 타이머가 장 마감 중 재계산용이면 True (만료 시 장중일 때만 갱신)
+        self._started = False  # refresh 시그널 처리 중 갱신이 실제로 시작되었는지
+
+    @classmethod
+    def from_config(cls, options, always_open=False, parent=None):
+        """config.json "refresh" 섹션 (base/min_interval/max_interval/edge_minutes/quiet_threshold/holidays/early_closes)"""
+        options = options or {}
+        calendar = MarketCalendar(options.get("holidays", ()), options.get("early_closes", ()))
+        return cls(calendar, base=options.get("base", 120), min_interval=options.get("min_interval", 30),
+                   max_interval=options.get("max_interval", 600), edge_minutes=options.get("edge_minutes", 30),
+                   quiet_threshold=options.get("quiet_threshold", 0.05), always_open=always_open, parent=parent)
+
+    def start(self, delay=0.1):
+        """첫 갱신은 장 시간과 무관하게 바로 실행"""
+        self._schedule(delay, "startup")
+
+    def refresh_now(self):
+        """즉시 갱신 요청: 갱신이 시작되지 않았으면(진행 중인 페치 등) 예약이 남아 있도록 보장"""
+        print("[SCHEDULE] Refresh requested")
+        self._started = False
+        try:
+            self.refresh.emit()
+        finally:
+            if not self._started and not self.timer.isActive():
+                self.refresh_finished(None)
+
+    def refresh_started(self):
+        """갱신이 실제로 시작됨: 대기 중인 예약 취소 (완료 후 refresh_finished에서 다시 예약)"""
+        self.timer.stop()
+        self._idle = False
+        self._started = True
+
+    def refresh_finished(self, activity=None):
+        """
+        갱신 1회 완료 후 다음 갱신 예약
+        activity: 직전 갱신 대비 값이 바뀐 종목 비율 (0~1, None이면 주기 유지)
+        """
+        if activity is not None:
+            if activity < self.quiet_threshold:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            else:
+                self.interval = self.base
+        now = eastern_now()
+        delay, reason = self.next_delay(now)
+        self._schedule(delay, reason, idle=self._is_closed(now))
+
+    def _is_closed(self, now):
+        return not self.always_open and not self.calendar.is_open(now)
+
+    def _on_timeout(self):
+        """예약 만료: 장중(또는 장중에 예약한 폐장 직후 종가 갱신)이면 갱신, 장 마감 중 재계산이면 다시 대기"""
+        if self._idle:
+            now = eastern_now()
+            if self._is_closed(now):
+                delay, reason = self.next_delay(now)
+                self._schedule(delay, reason, idle=True)
+                return
+        self._idle = False
+        self.refresh.emit()
+
+    def next_delay(self, now):
+        """now(ET) 기준 다음 갱신까지 대기(초)와 사유"""
+        if self.always_open:
+            return self.interval, "offline provider"
+        session = self.calendar.next_session(now)
+        if session is None:
+            return IDLE_RECHECK, "no session in calendar"
+        open_, close = session
+        if now < open_:
+            wait = (open_ - now).total_seconds() + 5  # 개장 직후 첫 체결 반영 여유
+            return min(wait, IDLE_RECHECK), f"closed, opens {open_:%m/%d %H:%M} ET"
+        # 장중: 개장 직후 / 폐장 직전은 짧게, 폐장 시각은 넘기지 않음 (종가 반영)
+        if now - open_ < self.edge or close - now < self.edge:
+            delay, reason = min(self.interval, self.min_interval), "open/close window"
+        else:
+            delay, reason = self.interval, "market open"
+        until_close = (close - now).total_seconds() + 60
+        return min(delay, until_close), reason
+
+    def _schedule(self, delay, reason, idle=False):
+        self._idle = idle
+        print(f"[SCHEDULE] {'Next check' if idle else 'Next refresh'} in {delay:.0f}s ({reason})")
+        self.timer.start(int(max(0.0, delay) * 1000))
@@ -0,0 +1,41 @@
+"""
+[REFRESH-TIERS] 시가총액 비중 순위 기반 계층별 갱신 주기
+트리맵 면적 대부분을 차지하는 상위 종목은 매 갱신, 롱테일은 몇 회에 한 번만 요청
+같은 계층 안에서는 순위별로 갱신 회차를 엇갈리게 배정하여 요청 수를 회차마다 고르게 분산
+"""
+import numpy as np
+
+# {"top": 비중 순위 상한(누적), "every": N회마다 갱신}, 마지막 계층은 나머지 전부
+DEFAULT_TIERS = [{"top": 30, "every": 1}, {"top": 150, "every": 3}, {"every": 6}]
+
+
+class RefreshTiers:
+    def __init__(self, weights, tiers=None):
+        tiers = tiers or DEFAULT_TIERS
+        weights = np.asarray(weights, dtype=np.float64)
+        n = weights.shape[0]
+        rank = np.empty(n, dtype=np.intp)
+        rank[np.argsort(-weights, kind="stable")] = np.arange(n)
+
+        bounds = [min(int(t["top"]), n) if t.get("top") is not None else n for t in tiers]
+        bounds[-1] = n
+        self.names = [f"T{k + 1}" for k in range(len(tiers))]
+        self.every = np.array([max(1, int(t.get("every", 1))) for t in tiers], dtype=np.int64)
+        self.tier = np.searchsorted(np.maximum.accumulate(bounds), rank, side="right").astype(np.intp)
+        self.tier = np.minimum(self.tier, len(tiers) - 1)
+        # 계층 내 순위 % every = 갱신 회차 오프셋
+        starts = np.concatenate(([0], np.maximum.accumulate(bounds)[:-1]))
+        self.offset = (rank - starts[self.tier]) % self.every[self.tier]
+
+    def due(self, cycle):
+        """cycle번째 갱신에서 요청할 종목 마스크 (유니버스 인덱스)"""
+        return (cycle + self.offset) % self.every[self.tier] == 0
+
+    def counts(self):
+        return np.bincount(self.tier, minlength=len(self.names))
+
+    def freshness(self, last_success):
+        """계층별 가장 오래된 성공 시각 (epoch, 한 번도 성공하지 못한 종목이 있으면 0)"""
+        oldest = np.full(len(self.names), np.inf)
+        np.minimum.at(oldest, self.tier, np.asarray(last_success, dtype=np.float64))
+        return np.where(np.isfinite(oldest), oldest, 0.0)
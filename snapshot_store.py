@@ -0,0 +1,155 @@
+"""
+[SNAPSHOT-STORE] 갱신마다 등락률 벡터를 디스크에 추가 기록하는 스냅샷 저장소
+고정 크기 레코드의 append-only 바이너리 파일 → 시작 시 memmap으로 마지막 레코드만 읽어 즉시 그리기
+레코드가 max_records의 2배를 넘으면 최근 max_records개만 남기고 다시 씀
+"""
+import os
+import struct
+import hashlib
+
+import numpy as np
+
+# 파일 포맷: [MAGIC][VERSION u32][N u32][TICKERS_HASH 16B] + 레코드 * COUNT
+# 레코드: [timestamp float64][change float32 N][status int8 N] (유니버스 인덱스 순서)
+MAGIC = b"NHSS"
+VERSION = 1
+HASH_SIZE = 16
+_HEADER = struct.Struct(f"<4sII{HASH_SIZE}s")
+DEFAULT_MAX_RECORDS = 720  # 2분 간격 24시간
+
+
+def tickers_hash(tickers):
+    """유니버스 티커 순서 해시 (비중/섹터가 바뀌어도 같은 종목 순서면 스냅샷 재사용)"""
+    h = hashlib.blake2b(digest_size=HASH_SIZE)
+    h.update("\n".join(tickers).encode("utf-8"))
+    return h.digest()
+
+
+def record_dtype(n):
+    return np.dtype([('timestamp', '<f8'), ('change', '<f4', (n,)), ('status', 'i1', (n,))])
+
+
+class SnapshotStore:
+    def __init__(self, path, tickers, max_records=DEFAULT_MAX_RECORDS):
+        self.path = path
+        self.n = len(tickers)
+        self.key = tickers_hash(tickers)
+        self.max_records = max(1, int(max_records))
+        self.dtype = record_dtype(self.n)
+
+    def _header(self):
+        return _HEADER.pack(MAGIC, VERSION, self.n, self.key)
+
+    def _valid(self):
+        """파일 헤더가 현재 유니버스와 일치하는지 확인"""
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(_HEADER.size)
+        except OSError:
+            return False
+        if len(head) != _HEADER.size: return False
+        magic, version, n, key = _HEADER.unpack(head)
+        return magic == MAGIC and version == VERSION and n == self.n and key == self.key
+
+    def records(self):
+        """전체 레코드를 읽기 전용 memmap으로 반환 (없거나 유니버스가 다르면 None)"""
+        if not self._valid(): return None
+        size = os.path.getsize(self.path) - _HEADER.size
+        count = size // self.dtype.itemsize
+        if count <= 0: return None
+        return np.memmap(self.path, dtype=self.dtype, mode="r", offset=_HEADER.size, shape=(count,))
+
+    def latest(self):
+        """
+        마지막 스냅샷 (timestamp, change float64 배열, status int8 배열), 없으면 None
+        NaN = 한 번도 성공하지 못한 종목
+        """
+        records = self.records()
+        if records is None: return None
+        last = records[-1]
+        result = float(last['timestamp']), last['change'].astype(np.float64), last['status'].copy()
+        del last, records  # Windows에서 파일 교체(compact)가 가능하도록 매핑 해제
+        return result
+
+    def append(self, timestamp, changes, status):
+        """
+        스냅샷 1개 추가 (유니버스가 바뀌었거나 파일이 없으면 새로 생성)
+        changes: 종목별 마지막 성공 등락률 (NaN = 없음), status: QuoteStatus 상태 코드
+        """
+        record = np.zeros(1, dtype=self.dtype)
+        record['timestamp'] = timestamp
+        record['change'] = np.asarray(changes, dtype=np.float32)
+        record['status'] = np.asarray(status, dtype=np.int8)
+        try:
+            if not self._valid():
+                self._rewrite(record)
+                return
+            with open(self.path, "ab") as f:
+                f.write(record.tobytes())
+            count = (os.path.getsize(self.path) - _HEADER.size) // self.dtype.itemsize
+            if count > self.max_records * 2:
+                self.compact()
+        except OSError as e:
+            print(f"[WARN] Snapshot store write failed: {e}")
+
+    def compact(self):
+        """최근 max_records개만 남기고 다시 씀"""
+        records = self.records()
+        if records is None: return
+        keep = np.array(records[-self.max_records:])
+        del records
+        self._rewrite(keep)
+
+    def _rewrite(self, records):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._header())
+            f.write(records.tobytes())
+        os.replace(tmp_path, self.path)
+
+
+class HistoryRing:
+    """
+    [HISTORY] 갱신별 등락률 벡터 링 버퍼 (유니버스 인덱스 정렬, 고정 크기 NumPy 배열)
+    디스크 기록은 SnapshotStore가 담당하고, 시작 시 저장소의 최근 레코드로 채움
+    """
+    def __init__(self, n, capacity=DEFAULT_MAX_RECORDS):
+        self.capacity = max(1, int(capacity))
+        self.times = np.zeros(self.capacity, dtype=np.float64)
+        self.changes = np.full((self.capacity, n), np.nan, dtype=np.float32)
+        self.head = 0   # 다음에 쓸 슬롯
+        self.count = 0
+        self.dropped = 0  # 가득 찬 상태에서 밀려난 누적 항목 수 (재생 위치 보정용)
+
+    @classmethod
+    def from_store(cls, store, capacity=DEFAULT_MAX_RECORDS):
+        ring = cls(store.n if store is not None else 0, capacity)
+        records = store.records() if store is not None else None
+        if records is not None:
+            tail = records[-ring.capacity:]
+            m = tail.shape[0]
+            ring.times[:m] = tail['timestamp']
+            ring.changes[:m] = tail['change']
+            ring.head, ring.count = m % ring.capacity, m
+            del tail
+        del records
+        return ring
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, changes):
+        if self.count == self.capacity: self.dropped += 1
+        self.times[self.head] = timestamp
+        self.changes[self.head] = changes
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _slot(self, i):
+        """시간순 i번째(0 = 가장 오래된) → 배열 슬롯"""
+        return (self.head - self.count + i) % self.capacity
+
+    def at(self, i):
+        """시간순 i번째 (timestamp, 등락률 float32 배열 사본), 링이 돌아 슬롯을 덮어써도 반환값은 그대로"""
+        slot = self._slot(i)
+        return float(self.times[slot]), self.changes[slot].copy()
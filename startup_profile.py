@@ -0,0 +1,32 @@
+"""
+[STARTUP-PROFILE] --profile-startup: 시작 단계별 시각 (모듈 로드 시작 기준 ms)
+import → warm start → layout → first paint → first data(첫 배치) → first refresh(첫 갱신 완료)
+각 단계는 처음 도달한 시각만 기록하고, 첫 갱신이 끝나면 한 줄로 출력
+"""
+import time
+
+STAGES = ("import", "warm start", "layout", "first paint", "first data", "first refresh")
+
+
+class StartupProfile:
+    def __init__(self, origin, enabled=True):
+        self.origin = origin
+        self.enabled = enabled
+        self.marks = {}
+        self.layout_ms = None  # 미니 위젯 레이아웃 계산(또는 캐시 복원)에 걸린 시간
+        self.reported = False
+
+    def mark(self, stage, at=None):
+        if stage in self.marks: return
+        self.marks[stage] = ((time.perf_counter() if at is None else at) - self.origin) * 1000
+
+    def report(self):
+        if not self.enabled or self.reported: return
+        self.reported = True
+        parts = []
+        for stage in STAGES:
+            if stage not in self.marks: continue
+            text = f"{stage} {self.marks[stage]:.0f}ms"
+            if stage == "layout" and self.layout_ms is not None: text += f" ({self.layout_ms:.1f}ms)"
+            parts.append(text)
+        print("[STARTUP] " + " | ".join(parts))
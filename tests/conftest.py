@@ -0,0 +1,17 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 저장소 루트의 모듈(treemap_layout, quote_parse, ...)을 그대로 import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """위젯 테스트용 QApplication (화면 없이 offscreen)"""
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield app
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+
+import heatmap_canvas
+import heatmap_widget
+from layout_cache import LayoutCache
+
+
+@pytest.fixture
+def app(qapp, tmp_path, monkeypatch):
+    """synthetic 공급자 + 임시 디렉터리 파일로 만든 앱 (스케줄러 타이머는 멈춘 상태)"""
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"streaming": False, "timeframes": False, "fetch": {"requests_per_sec": 0}}))
+    monkeypatch.setattr(heatmap_widget, "CONFIG_FILE", config)
+    monkeypatch.setattr(heatmap_widget, "SNAPSHOT_FILE", tmp_path / "snapshots.bin")
+    monkeypatch.setattr(heatmap_widget, "PREV_CLOSE_FILE", tmp_path / "prev_close.npz")
+    monkeypatch.setattr(heatmap_widget, "DAILY_CLOSE_FILE", tmp_path / "daily_closes.npz")
+    monkeypatch.setattr(heatmap_canvas, "LAYOUT_STORE", LayoutCache(tmp_path / "layout_cache.bin"))
+    monkeypatch.setattr(heatmap_widget, "QApplication", lambda argv: qapp)
+    instance = heatmap_widget.StockHeatmapApp(heatmap_widget.parse_args(["--provider", "synthetic"]))
+    instance.scheduler.timer.stop()
+    yield instance
+    instance.scheduler.timer.stop()
+    if instance.fetcher is not None: instance.fetcher.wait()
+    instance.mini.close()
+    if instance.expanded is not None: instance.expanded.close()
+
+
+def refresh(app, qapp):
+    """예약 타이머 대신 직접 갱신 요청 → 페치 스레드 완료 → 큐 시그널 전달"""
+    app.update_data()
+    app.fetcher.wait()
+    qapp.processEvents()
+
+
+def test_refresh_keeps_status_store_and_history(app, qapp):
+    """큐 시그널로 받은 스냅샷은 사본이지만 상태 모델/저장소/히스토리를 초기화하지 않음"""
+    status, store, history, universe = app.quote_status, app.store, app.history, app.universe
+    refresh(app, qapp)
+    assert app.universe.snapshot.version > 0
+    first_success = status.last_success.copy()
+    assert (status.summary()["ok"], len(history), len(store.records())) == (len(universe), 1, 1)
+
+    refresh(app, qapp)
+    assert app.quote_status is status and app.store is store and app.history is history
+    assert app.universe is universe
+    assert len(history) == 2 and len(store.records()) == 2
+    # 두 번째 갱신은 상태 모델을 이어서 기록 (초기화되었다면 첫 성공 시각이 사라짐)
+    assert (status.last_success >= first_success).all() and (first_success > 0).all()
+    np.testing.assert_array_equal(app.universe.snapshot.value, status.value)
+
+
+class BusyFetcher:
+    """진행 중인 페치 (update_data가 요청을 무시하게 만듦)"""
+    def isRunning(self): return True
+    def wait(self): pass
+
+
+def test_refresh_now_keeps_schedule_when_ignored(app, qapp):
+    """진행 중인 페치 때문에 무시된 즉시 갱신은 예약을 없애지 않고, 실제로 시작된 갱신만 예약을 취소"""
+    scheduler = app.scheduler
+    app.fetcher = BusyFetcher()
+    app.refresh_now()
+    assert scheduler.timer.isActive()
+
+    scheduler.refresh_finished(None)
+    remaining = scheduler.timer.remainingTime()
+    app.refresh_now()  # 이미 예약이 있으면 그대로 유지
+    assert scheduler.timer.isActive() and scheduler.timer.remainingTime() <= remaining
+
+    app.fetcher = None
+    app.refresh_now()
+    assert not scheduler.timer.isActive()  # 갱신 시작 → 완료 후 다시 예약
+    app.fetcher.wait()
+    qapp.processEvents()
+    assert scheduler.timer.isActive()
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+
+import color_lut
+from color_lut import ColorLUT
+
+
+def baseline_get_color(change):
+    """원래 get_color (호출마다 pow/보간/문자열 포맷)"""
+    if change == 0: return "#2c2c34"
+    base_gray, green_max, red_max = (44, 44, 52), (46, 125, 50), (211, 47, 47)
+    intensity = min(abs(change) / 4.0, 1.0)
+    intensity = 0.25 + (intensity ** 0.6) * 0.75
+    target = green_max if change > 0 else red_max
+    r, g, b = (int(base_gray[c] + (target[c] - base_gray[c]) * intensity) for c in range(3))
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+# 표시 등락률은 소수점 2자리로 반올림되어 들어옴
+CHANGES = np.round(np.arange(-800, 801) * 0.01, 2).tolist() + [-25.0, 12.345, 99.99, -0.004, 0.004]
+
+
+def test_hex_matches_get_color():
+    lut = ColorLUT()
+    assert [lut.hex_for(c) for c in CHANGES] == [baseline_get_color(round(c, 2)) for c in CHANGES]
+
+
+def test_exact_at_saturation_and_zero():
+    lut = ColorLUT()
+    for change in (0.0, -0.0, 4.0, 7.5, -4.0, -30.0):
+        assert lut.hex_for(change) == baseline_get_color(change)
+    assert lut.hex_for(float("nan")) == baseline_get_color(0)
+
+
+def test_vector_indices_match_scalar_lookup():
+    lut = ColorLUT()
+    changes = np.array(CHANGES + [np.nan])
+    idx = lut.indices(changes)
+    assert [lut.hex[i] for i in idx.tolist()] == [lut.hex_for(c) for c in changes.tolist()]
+    assert [c.name() for c in lut.colors_for(changes)] == [lut.hex_for(c) for c in changes.tolist()]
+
+
+def test_scaled_lut_matches_scaled_input():
+    base = color_lut.default_lut()
+    scaled = color_lut.scaled_lut(4)
+    assert color_lut.scaled_lut(1) is base
+    assert color_lut.scaled_lut(4) is scaled
+    for change in (0.0, 0.5, -1.3, 3.99, 8.0, -20.0):
+        assert scaled.hex_for(change * 4) == base.hex_for(change)
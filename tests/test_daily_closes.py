@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import numpy as np
+
+import daily_closes
+from daily_closes import DailyCloses, RETRY_BASE, RETRY_MAX
+from fetch_scheduler import TokenBucket
+from quote_providers import SyntheticProvider
+
+
+class EmptyHistoryProvider:
+    """fetch_history가 아무 세션도 돌려주지 않는 공급자 (다운로드 실패)"""
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_history(self, tickers, period):
+        self.calls += 1
+        return np.zeros(0, dtype=np.int32), np.full((0, len(tickers)), np.nan)
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(0)  # 속도 제한 없음, 호출 횟수만 셈
+        self.acquired = 0
+
+    def acquire(self, deadline=None):
+        self.acquired += 1
+        return super().acquire(deadline)
+
+
+TICKERS = [f"T{i}" for i in range(12)]
+OPTIONS = {"batch_size": 5, "requests_per_sec": 0}
+
+
+def test_failed_sync_backs_off(tmp_path, monkeypatch):
+    path = tmp_path / "daily_closes.npz"
+    now = [1_000_000.0]
+    monkeypatch.setattr(daily_closes.time, "time", lambda: now[0])
+    provider = EmptyHistoryProvider()
+
+    daily = DailyCloses(path, TICKERS)
+    assert daily.due(datetime.now())
+    assert daily.sync(provider, OPTIONS) is None
+    assert provider.calls == 3  # 12종목 / 5
+    assert daily.failures == 1 and daily.retry_at == now[0] + RETRY_BASE
+    assert not daily.due(datetime.now())
+
+    # 실패 기록은 파일에 남아 다른 인스턴스(워커/GUI/재시작)도 다시 요청하지 않음
+    reloaded = DailyCloses(path, TICKERS)
+    assert reloaded.failures == 1 and not reloaded.due(datetime.now())
+
+    now[0] = reloaded.retry_at
+    assert reloaded.due(datetime.now())
+    reloaded.sync(provider, OPTIONS)
+    assert reloaded.retry_at == now[0] + 2 * RETRY_BASE
+    for _ in range(10):
+        reloaded.fail()
+    assert reloaded.retry_at == now[0] + RETRY_MAX
+
+    # 성공하면 백오프 해제
+    now[0] = reloaded.retry_at
+    assert reloaded.sync(SyntheticProvider(), OPTIONS) is not None
+    assert reloaded.failures == 0 and reloaded.retry_at == 0.0
+    assert not reloaded.due(datetime.now(), calendar=None)
+
+
+def test_sync_uses_shared_bucket(tmp_path):
+    bucket = CountingBucket()
+    daily = DailyCloses(tmp_path / "daily_closes.npz", TICKERS)
+    assert daily.sync(SyntheticProvider(), OPTIONS, bucket=bucket) is not None
+    assert bucket.acquired == 3
+    assert len(daily) > 0
+
+
+def test_old_file_without_retry_fields(tmp_path):
+    path = tmp_path / "daily_closes.npz"
+    np.savez(path, tickers=np.array(TICKERS, dtype=str), sessions=np.array([738000], dtype=np.int32),
+             closes=np.ones((1, len(TICKERS)), dtype=np.float32), head=np.int32(738001), synced=np.float64(1.0))
+    daily = DailyCloses(path, TICKERS)
+    assert len(daily) == 1
+    assert (daily.failures, daily.retry_at) == (0, 0.0)
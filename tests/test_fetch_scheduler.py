@@ -0,0 +1,118 @@
+import random
+import threading
+
+import pytest
+
+from fetch_scheduler import FetchScheduler, RetryPolicy, TokenBucket
+
+
+class FakeClock:
+    """sleep이 즉시 시각을 앞당기는 가짜 monotonic 시계 (스레드 안전)"""
+    def __init__(self, now=100.0):
+        self.now = now
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+
+def bucket(rate, burst=1, clock=None):
+    clock = clock or FakeClock()
+    return TokenBucket(rate, burst, clock=clock, sleep=clock.sleep), clock
+
+
+def test_token_bucket_rate_and_burst():
+    limiter, clock = bucket(rate=2.0, burst=3)
+    start = clock()
+    waits = [limiter.acquire() for _ in range(7)]
+    assert waits[:3] == [0.0, 0.0, 0.0]  # burst만큼은 바로
+    assert waits[3:] == pytest.approx([0.5] * 4)  # 이후 초당 2개
+    assert clock() - start == pytest.approx(2.0)
+
+    # 쉬는 동안 burst까지만 다시 채워짐
+    clock.sleep(60)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_deadline_does_not_consume():
+    limiter, clock = bucket(rate=1.0)
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire(deadline=clock() + 0.5) is None  # 1초 뒤에야 토큰
+    assert clock() == 100.0
+    assert limiter.acquire(deadline=clock() + 2.0) == pytest.approx(1.0)
+
+
+def test_batches_after_deadline_are_skipped():
+    limiter, clock = bucket(rate=1.0)
+    calls = []
+    def fetch(batch):
+        calls.append(list(batch))
+        return batch
+
+    scheduler = FetchScheduler(fetch, batch_size=2, max_in_flight=1, bucket=limiter)
+    streamed = []
+    results = scheduler.run(list("ABCDEFG"), on_batch=lambda b, r: streamed.append(b), deadline=clock() + 1.5)
+    # 토큰은 즉시 1개 + 1초 뒤 1개, 그 다음은 마감(1.5초) 이후라 요청하지 않음
+    assert calls == [["A", "B"], ["C", "D"]]
+    assert [r for _, r in results] == [["A", "B"], ["C", "D"], None, None]
+    assert [b for b, _ in results] == [["A", "B"], ["C", "D"], ["E", "F"], ["G"]]
+    assert streamed == calls
+
+    # 이미 지난 마감이면 아무것도 요청하지 않음
+    calls.clear()
+    assert [r for _, r in scheduler.run(list("AB"), deadline=clock() - 1)] == [None]
+    assert calls == []
+
+
+def test_failed_batch_is_none():
+    def fetch(batch):
+        if "B" in batch: raise OSError("boom")
+        return batch
+    scheduler = FetchScheduler(fetch, batch_size=1, max_in_flight=2, requests_per_sec=0)
+    assert scheduler.run(list("ABC")) == [(["A"], ["A"]), (["B"], None), (["C"], ["C"])]
+
+
+def test_retry_budget_stops_mid_round_and_returns_leftovers():
+    """라운드 도중 예산이 끝나면 남은 배치는 요청하지 않고 실패 종목과 함께 남은 목록으로 반환"""
+    limiter, clock = bucket(rate=1.0)
+    calls = []
+    def fetch(batch):
+        calls.append(list(batch))
+        return batch
+
+    scheduler = FetchScheduler(fetch, max_in_flight=1, bucket=limiter)
+    policy = RetryPolicy(batch_size=2, max_attempts=5, base_delay=0.0, budget=2.5, rng=random.Random(0))
+    failed_of = lambda batch, result: [t for t in batch if t in ("A", "D")]  # A, D는 계속 실패
+    collected, leftover = policy.run(scheduler, list("ABCDEFGH"), failed_of)
+
+    # 1라운드: 0초/1초/2초에 배치 3개, 네 번째 배치(3초)는 예산(2.5초) 밖 → 요청하지 않음 (이후 라운드도 토큰을 얻지 못해 중단)
+    assert calls == [["A", "B"], ["C", "D"], ["E", "F"]]
+    assert [b for b, _ in collected] == calls
+    assert leftover == ["A", "D", "G", "H"]
+    assert clock() - 100.0 < 2.5
+
+
+def test_retry_rounds_recover_and_stop_when_empty():
+    attempts = {}
+    def fetch(batch):
+        for t in batch: attempts[t] = attempts.get(t, 0) + 1
+        return batch
+    scheduler = FetchScheduler(fetch, requests_per_sec=0)
+    policy = RetryPolicy(batch_size=10, max_attempts=3, base_delay=0.0, budget=60, rng=random.Random(0))
+    # 첫 시도에서 모두 실패, 두 번째 시도에서 복구되면 남은 라운드는 생략
+    collected, leftover = policy.run(scheduler, ["A", "B"], lambda b, r: [t for t in b if attempts[t] < 2])
+    assert leftover == []
+    assert attempts == {"A": 2, "B": 2}
+    assert [b for b, _ in collected] == [["A", "B"], ["A", "B"]]
+
+
+def test_retry_delay_is_jittered_exponential():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, rng=random.Random(1))
+    for attempt, base in enumerate([1, 2, 4, 8, 8]):
+        assert 0.5 * base <= policy.delay(attempt) < 1.5 * base
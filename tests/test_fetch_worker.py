@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from fetch_worker import SharedQuoteBuffer, shared_memory
+from quote_status import OK, STALE, QuoteStatus
+
+pytestmark = pytest.mark.skipif(shared_memory is None, reason="multiprocessing.shared_memory unavailable")
+
+
+def make_status(n, value, now):
+    status = QuoteStatus(n)
+    changes = np.full(n, float(value))
+    changes[0] = np.nan  # 첫 종목은 실패
+    status.record(np.arange(n), changes, now=now)
+    return status
+
+
+def test_write_and_view_alternate_slots():
+    n = 5
+    gui = SharedQuoteBuffer(n)
+    worker = SharedQuoteBuffer(n, name=gui.name)  # 워커 프로세스 쪽 연결
+    try:
+        assert gui.slots['seq'].tolist() == [-1, -1]
+        assert set(gui.dtype.names) == {'seq', 'value', 'last_success', 'status'}
+
+        worker.write(0, 1, make_status(n, 1.5, now=100.0))
+        front = gui.view(0)
+        assert front['seq'] == 1
+        np.testing.assert_array_equal(front['value'][1:], 1.5)
+        assert np.isnan(front['value'][0])
+        assert front['status'].tolist()[1:] == [OK] * (n - 1)
+        np.testing.assert_array_equal(front['last_success'], [0.0] + [100.0] * (n - 1))
+
+        # 다음 갱신은 반대 슬롯에 기록: GUI가 보고 있는 슬롯은 그대로
+        status = make_status(n, -2.0, now=200.0)
+        status.record([1], [np.nan], now=210.0)
+        worker.write(1, 2, status)
+        np.testing.assert_array_equal(front['value'][1:], 1.5)
+        assert front['seq'] == 1
+        back = gui.view(1)
+        assert back['seq'] == 2 and back['status'][1] == STALE and back['value'][1] == -2.0
+
+        # 그 다음은 다시 0번 슬롯
+        worker.write(0, 3, make_status(n, 0.0, now=300.0))
+        assert gui.view(0)['seq'] == 3 and gui.view(1)['seq'] == 2
+        np.testing.assert_array_equal(gui.view(0)['value'][1:], 0.0)
+        del front, back
+    finally:
+        worker.close()
+        gui.close(unlink=True)
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+
+import color_lut
+import heatmap_canvas
+import heatmap_widget
+from daily_closes import COLOR_SCALE, apply_factors
+from layout_cache import LayoutCache
+from market_stats import MarketAggregates
+from universe import Universe
+
+
+def make_universe(n=48, sectors=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return Universe.from_records([
+        {'ticker': f"T{i:03d}", 'name': f"Stock {i}", 'sector': f"S{i % sectors}",
+         'weight': float(rng.uniform(0.1, 5.0))}
+        for i in range(n)])
+
+
+@pytest.fixture
+def canvas(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(heatmap_canvas, "LAYOUT_STORE", LayoutCache(tmp_path / "layout_cache.bin"))
+    widget = heatmap_canvas.HeatmapCanvas(make_universe())
+    widget.resize(600, 400)
+    yield widget
+    widget.deleteLater()
+
+
+def assert_stats_match(stats, expected, weights, offsets):
+    full = MarketAggregates(weights, offsets)
+    full.update(expected)
+    np.testing.assert_allclose(stats.sector_changes(), full.sector_changes(), atol=1e-9)
+    assert stats.index_change == pytest.approx(full.index_change, abs=1e-9)
+    assert (stats.advancers, stats.decliners) == (full.advancers, full.decliners)
+
+
+def test_replay_in_timeframe_diffs_scaled_values(canvas):
+    """5D 등에서 재생 행을 넘기면 배율을 적용한 표시값 기준으로 바뀐 타일만 집계에 반영"""
+    rng = np.random.default_rng(1)
+    n = len(canvas.universe)
+    factors = rng.uniform(0.8, 1.2, n)
+    factors[[3, 17]] = np.nan  # 기간 기준 종가 없음
+    canvas.set_timeframe(factors, color_lut.scaled_lut(COLOR_SCALE["5D"]))
+
+    calls = []
+    update = canvas.stats.update
+    def spy(changes, indices=None):
+        calls.append(None if indices is None else np.asarray(indices).copy())
+        update(changes, indices)
+    canvas.stats.update = spy
+
+    order = canvas.tile_universe
+    row = np.round(rng.normal(0, 1.5, n), 2).astype(np.float32)
+    previous = None
+    for step in range(6):
+        if step:
+            row = row.copy()
+            row[rng.choice(n, 3, replace=False)] += np.float32(0.5)  # 갱신 사이에 몇 종목만 움직임
+        calls.clear()
+        canvas.set_replay(row)
+
+        expected = np.nan_to_num(apply_factors(np.nan_to_num(row[order].astype(np.float64)), factors[order]))
+        np.testing.assert_array_equal(canvas._changes, expected)
+        if previous is not None:
+            assert len(calls) == 1
+            np.testing.assert_array_equal(calls[0], np.nonzero(expected != previous)[0])
+        assert_stats_match(canvas.stats, expected, canvas._weights, canvas.sector_offsets)
+        previous = expected
+
+    # 같은 행을 다시 재생하면 바뀐 타일 없음
+    calls.clear()
+    assert canvas.set_replay(row) == 0
+    assert calls == []
+
+
+def test_mini_relayouts_when_reference_layout_is_replaced(qapp, tmp_path, monkeypatch):
+    """확장 위젯이 새 비율 레이아웃을 저장하면 (객체 id가 재사용되더라도) 미니 위젯은 다시 계산"""
+    monkeypatch.setattr(heatmap_canvas, "LAYOUT_STORE", LayoutCache(tmp_path / "layout_cache.bin"))
+    monkeypatch.setattr(heatmap_canvas.HeatmapCanvas, "_ref_layout", None)
+    monkeypatch.setattr(heatmap_canvas.HeatmapCanvas, "_ref_layout_version", 0)
+    universe = make_universe()
+    expanded = heatmap_canvas.HeatmapCanvas(universe)
+    mini = heatmap_canvas.HeatmapCanvas(universe, is_mini=True)
+    expanded.resize(600, 400)
+    mini.resize(140, 90)
+    assert expanded._relayout() and mini._relayout()
+    assert not mini._relayout()
+    old_rects = mini._tile_rects.copy()
+
+    version = heatmap_canvas.HeatmapCanvas._ref_layout_version
+    expanded.resize(900, 300)
+    assert expanded._relayout()
+    assert heatmap_canvas.HeatmapCanvas._ref_layout_version == version + 1
+    assert mini._relayout()
+    assert not np.array_equal(mini._tile_rects, old_rects)
+    assert not mini._relayout()
+
+
+def test_legacy_mini_relayouts_only_on_layout_change(qapp, tmp_path, monkeypatch):
+    """레거시 미니 위젯은 갱신마다 컨테이너를 다시 배치하지 않고 크기/유니버스/공유 레이아웃이 바뀔 때만 배치"""
+    monkeypatch.setattr(heatmap_canvas, "LAYOUT_STORE", LayoutCache(tmp_path / "layout_cache.bin"))
+    for name in ("_cached_sector_layout", "_cached_layout_key"):
+        monkeypatch.setattr(heatmap_widget.TreemapWidget, name, None)
+    monkeypatch.setattr(heatmap_widget.TreemapWidget, "_cached_stock_layouts", {})
+    mini = heatmap_widget.MiniWidget(make_universe(), legacy=True)
+    treemap = mini.treemap
+    placed = []
+    resize = treemap.resizeEvent
+    treemap.resizeEvent = lambda event: (placed.append(event), resize(event))
+
+    mini.update_view()
+    first = len(placed)
+    for _ in range(3): mini.update_view()
+    assert len(placed) == first
+
+    # 확장 위젯이 공유 레이아웃을 다시 계산하면 다음 갱신에서 재배치
+    expanded = heatmap_widget.TreemapWidget(make_universe())
+    expanded.resize(900, 300)
+    expanded.resizeEvent(None)
+    mini.update_view()
+    assert len(placed) == first + 1
+    mini.update_view()
+    assert len(placed) == first + 1
+
+    treemap.resize(treemap.width() + 10, treemap.height())
+    assert treemap.relayout()
+    mini.close(); expanded.deleteLater(); mini.deleteLater()
+
+
+def test_legacy_expanded_disables_canvas_features(qapp, tmp_path, monkeypatch):
+    """레거시 확장 위젯은 재생/기간별 보기를 연결하지 않음 (TreemapWidget에는 해당 기능 없음)"""
+    monkeypatch.setattr(heatmap_canvas, "LAYOUT_STORE", LayoutCache(tmp_path / "layout_cache.bin"))
+    expanded = heatmap_widget.ExpandedWidget(make_universe(), legacy=True)
+    assert isinstance(expanded.treemap, heatmap_widget.TreemapWidget)
+    expanded.set_history(object())  # 링 버퍼는 사용하지 않음
+    assert expanded.history is None
+    expanded.set_timeframe("5D")
+    assert expanded.timeframe == "1D"
+    expanded.go_live()
+    assert not expanded.timeline.isVisibleTo(expanded)
+    expanded.deleteLater()
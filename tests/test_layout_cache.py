@@ -0,0 +1,85 @@
+import numpy as np
+
+import layout_cache
+from layout_cache import LayoutCache, make_key, universe_hash
+from treemap_layout import calculate_nested_treemap
+
+
+def hierarchy(seed=0, sectors=3, per_sector=5):
+    rng = np.random.default_rng(seed)
+    result = []
+    for s in range(sectors):
+        stocks = [{'ticker': f"S{s}T{i}", 'weight': float(rng.uniform(0.5, 5))} for i in range(per_sector)]
+        result.append({'sector': f"Sector {s}", 'weight': sum(x['weight'] for x in stocks), 'stocks': stocks})
+    return result
+
+
+def layout(seed=0, w=800, h=500):
+    data = hierarchy(seed)
+    return make_key(universe_hash(data), w, h, 16, 1), calculate_nested_treemap(data, w, h)
+
+
+def assert_same_table(actual, expected):
+    np.testing.assert_allclose(actual['rects'], expected['rects'], rtol=1e-5, atol=1e-3)  # float32 저장
+    np.testing.assert_array_equal(actual['parent'], expected['parent'])
+    np.testing.assert_allclose(actual['top'], expected['top'], rtol=1e-5, atol=1e-3)
+    assert actual['n_sectors'] == expected['n_sectors']
+
+
+def test_put_save_load_round_trip(tmp_path):
+    path = tmp_path / "layout_cache.bin"
+    key, table = layout()
+    cache = LayoutCache(path)
+    cache.put(key, table, 800, 500)
+    cache.flush()
+
+    loaded = LayoutCache(path)
+    assert key in loaded
+    assert_same_table(loaded.get(key, 800, 500), table)
+    # 다른 크기로 복원하면 비율 좌표 그대로 스케일
+    scaled = loaded.get(key, 400, 1000)
+    np.testing.assert_allclose(scaled['rects'], table['rects'] * [0.5, 2, 0.5, 2], rtol=1e-5, atol=1e-3)
+
+
+def test_lru_eviction(tmp_path):
+    path = tmp_path / "layout_cache.bin"
+    cache = LayoutCache(path, max_entries=2)
+    (ka, ta), (kb, tb), (kc, tc) = layout(1), layout(2), layout(3)
+    cache.put(ka, ta, 800, 500)
+    cache.put(kb, tb, 800, 500)
+    assert cache.get(ka, 800, 500) is not None  # a를 최근 사용으로
+    cache.put(kc, tc, 800, 500)
+    assert ka in cache and kc in cache and kb not in cache
+
+    # 디스크에도 LRU 순서가 유지되어 다음 put에서 가장 오래된 a가 빠짐
+    cache.flush()
+    loaded = LayoutCache(path, max_entries=2)
+    kd, td = layout(4)
+    loaded.put(kd, td, 800, 500)
+    assert ka not in loaded and kc in loaded and kd in loaded
+
+
+def test_mismatch_is_a_miss(tmp_path, monkeypatch):
+    path = tmp_path / "layout_cache.bin"
+    key, table = layout()
+    cache = LayoutCache(path)
+    cache.put(key, table, 800, 500)
+    cache.flush()
+
+    # 비중이 바뀐 유니버스/다른 크기/다른 레이아웃 파라미터는 다른 키
+    changed = hierarchy()
+    changed[0]['stocks'][0]['weight'] += 1.0
+    loaded = LayoutCache(path)
+    assert loaded.get(make_key(universe_hash(changed), 800, 500, 16, 1), 800, 500) is None
+    assert loaded.get(make_key(universe_hash(hierarchy()), 801, 500, 16, 1), 801, 500) is None
+    assert loaded.get(make_key(universe_hash(hierarchy()), 800, 500, 20, 1), 800, 500) is None
+    assert loaded.get(key, 800, 500) is not None
+
+    # 파일 포맷 버전이 다르면 빈 캐시
+    monkeypatch.setattr(layout_cache, "VERSION", layout_cache.VERSION + 1)
+    assert LayoutCache(path).get(key, 800, 500) is None
+
+    # 손상된 파일도 빈 캐시
+    monkeypatch.undo()
+    path.write_bytes(path.read_bytes()[:40])
+    assert LayoutCache(path).get(key, 800, 500) is None
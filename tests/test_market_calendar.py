@@ -0,0 +1,36 @@
+from datetime import date, datetime
+
+from market_calendar import MarketCalendar, nyse_early_closes, nyse_holidays
+
+
+def test_rule_based_holidays():
+    assert date(2026, 4, 3) in nyse_holidays(2026)   # Good Friday (부활절 4/5)
+    assert date(2027, 3, 26) in nyse_holidays(2027)  # Good Friday (부활절 3/28)
+    assert date(2026, 7, 3) in nyse_holidays(2026)   # 7/4 토요일 → 금요일 대체
+    assert date(2026, 1, 19) in nyse_holidays(2026)  # MLK Day (1월 셋째 월요일)
+    assert date(2026, 6, 19) in nyse_holidays(2026)  # Juneteenth
+    assert date(2021, 6, 18) not in nyse_holidays(2021)  # 2022년 이전에는 없음
+    assert date(2027, 12, 24) in nyse_holidays(2027)  # 12/25 토요일 → 금요일 대체
+    # 2028/1/1이 토요일이어도 2027/12/31은 휴장하지 않음
+    assert date(2027, 12, 31) not in nyse_holidays(2027) | nyse_holidays(2028)
+    assert MarketCalendar().is_trading_day(date(2027, 12, 31))
+
+
+def test_early_closes():
+    assert date(2026, 11, 27) in nyse_early_closes(2026)  # 추수감사절(11/26) 다음 날
+    assert date(2026, 12, 24) in nyse_early_closes(2026)
+    assert date(2026, 7, 3) not in nyse_early_closes(2026)  # 휴장일이면 조기 폐장 아님
+    assert date(2027, 12, 24) not in nyse_early_closes(2027)
+    assert MarketCalendar().session(date(2026, 11, 27)) == (datetime(2026, 11, 27, 9, 30), datetime(2026, 11, 27, 13, 0))
+
+
+def test_sessions_and_extra_days():
+    calendar = MarketCalendar(extra_holidays=["2026-03-10"], extra_early_closes=[date(2026, 3, 11)])
+    assert calendar.session(date(2026, 3, 7)) is None  # 토요일
+    assert calendar.session(date(2026, 3, 10)) is None
+    assert calendar.session(date(2026, 3, 11))[1] == datetime(2026, 3, 11, 13, 0)
+    assert calendar.is_open(datetime(2026, 3, 9, 9, 30))
+    assert not calendar.is_open(datetime(2026, 3, 9, 16, 0))
+    # 금요일 장 마감 후 → 월요일 장, 휴장일(3/10)은 건너뜀
+    assert calendar.next_session(datetime(2026, 3, 6, 17, 0))[0] == datetime(2026, 3, 9, 9, 30)
+    assert calendar.next_session(datetime(2026, 3, 9, 17, 0))[0] == datetime(2026, 3, 11, 9, 30)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from market_stats import INCREMENTAL_RATIO, MarketAggregates, PERCENTILES
+
+
+def full(weights, offsets, changes):
+    stats = MarketAggregates(weights, offsets)
+    stats.update(changes)
+    return stats
+
+
+def reference(weights, offsets, changes):
+    """섹터/지수 가중 평균과 상승/하락 종목 수를 종목별 루프로 계산"""
+    w = np.where(weights > 0, weights, 0.0)
+    sectors = []
+    for s in range(len(offsets) - 1):
+        sl = slice(offsets[s], offsets[s + 1])
+        total = w[sl].sum()
+        sectors.append((w[sl] * changes[sl]).sum() / total if total > 0 else np.nan)
+    index = (w * changes).sum() / w.sum() if w.sum() > 0 else 0.0
+    return np.array(sectors), index, int((changes > 0).sum()), int((changes < 0).sum())
+
+
+def assert_matches(stats, weights, offsets, changes):
+    sectors, index, adv, dec = reference(weights, offsets, changes)
+    np.testing.assert_allclose(stats.sector_changes(), sectors, atol=1e-9)
+    assert stats.index_change == pytest.approx(index, abs=1e-9)
+    assert (stats.advancers, stats.decliners) == (adv, dec)
+    assert stats.unchanged == len(changes) - adv - dec
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_updates_match_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    n = 200
+    offsets = np.array([0, 40, 40, 95, 150, 151, 200])  # 빈 섹터/1종목 섹터 포함
+    weights = rng.uniform(0.1, 10, n)
+    weights[rng.choice(n, 8, replace=False)] = 0.0
+    weights[3] = -1.0  # 0 이하 비중은 가중 평균에서 제외
+    weights[151:] = 0.0  # 유효 비중이 없는 섹터 → NaN
+
+    stats = MarketAggregates(weights, offsets)
+    changes = np.round(rng.normal(0, 2, n), 2)
+    stats.update(changes)
+    assert_matches(stats, weights, offsets, changes)
+
+    for step in range(300):
+        k = int(rng.integers(0, int(n * INCREMENTAL_RATIO) + 1)) if step % 10 else n // 2
+        idx = np.sort(rng.choice(n, k, replace=False))
+        changes = changes.copy()
+        new = np.round(rng.normal(0, 2, k), 2)
+        new[rng.random(k) < 0.2] = 0.0  # 보합으로 바뀌는 종목
+        changes[idx] = new
+        stats.update(changes, idx)
+        assert_matches(stats, weights, offsets, changes)
+
+    # 누적 후에도 전체 재계산과 같은 값
+    fresh = full(weights, offsets, changes)
+    np.testing.assert_allclose(stats.sector_sum, fresh.sector_sum, atol=1e-9)
+
+
+def test_unchanged_indices_included():
+    """바뀌지 않은 위치가 후보에 섞여 있어도 결과는 같음"""
+    weights, offsets = np.ones(10), np.array([0, 5, 10])
+    stats = MarketAggregates(weights, offsets)
+    changes = np.linspace(-1, 1, 10)
+    stats.update(changes)
+    changes = changes.copy()
+    changes[2] = 3.0
+    stats.update(changes, [0, 1, 2])
+    assert_matches(stats, weights, offsets, changes)
+
+
+def test_percentiles_and_empty():
+    changes = np.arange(-5.0, 6.0)
+    stats = full(np.ones(11), [0, 11], changes)
+    assert stats.percentiles() == dict(zip(PERCENTILES, np.percentile(changes, PERCENTILES).tolist()))
+
+    empty = MarketAggregates(np.zeros(0), [0])
+    empty.update(np.zeros(0))
+    assert empty.index_change == 0.0
+    assert empty.sector_changes().shape == (0,)
+    assert list(empty.percentiles().values()) == [0.0] * len(PERCENTILES)
@@ -0,0 +1,80 @@
+import os
+import socket
+import stat
+import time
+
+import numpy as np
+import pytest
+
+import quote_hub
+from quote_hub import QuoteHubClient, QuoteHubServer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX") or os.name != "posix", reason="unix sockets only")
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture
+def private_dir(tmp_path):
+    path = tmp_path / "run"
+    path.mkdir(mode=0o700)
+    return path
+
+
+def test_default_address_uses_private_runtime_dir(private_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(private_dir))
+    assert quote_hub.default_address() == f"unix:{private_dir / quote_hub.SOCKET_NAME}"
+
+    # XDG_RUNTIME_DIR가 없으면 임시 디렉터리 아래 사용자별 0700 디렉터리 생성
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr(quote_hub.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = quote_hub.runtime_dir()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+    # 다른 사용자도 접근할 수 있는 디렉터리는 사용하지 않음
+    os.chmod(path, 0o755)
+    with pytest.raises(OSError):
+        quote_hub.runtime_dir()
+    assert quote_hub.default_address() == quote_hub.DEFAULT_TCP
+
+
+def test_second_hub_loses_without_removing_socket(private_dir):
+    address = f"unix:{private_dir / 'hub.sock'}"
+    first = QuoteHubServer(address, TICKERS)
+    first.start()
+    try:
+        assert stat.S_IMODE(os.stat(first.sockaddr).st_mode) & 0o077 == 0
+        second = QuoteHubServer(address, TICKERS)
+        with pytest.raises(OSError):
+            second.start()
+
+        # 먼저 시작한 허브는 계속 접속 가능
+        client = QuoteHubClient(address, TICKERS)
+        client.connect()
+        deadline = time.monotonic() + 2.0
+        while not first.clients and time.monotonic() < deadline: time.sleep(0.01)  # 접속 대기 스레드 등록 대기
+        first.publish(np.array([1.0, 2.0, 3.0]), np.ones(3, dtype=np.int8), np.full(3, 5.0), 5.0)
+        assert client.receive()[0] == 0  # 접속 직후 전체 스냅샷
+        version, changed = client.receive()
+        assert version == 1 and changed.tolist() == [0, 1, 2]
+        client.close()
+    finally:
+        first.close()
+    assert not os.path.exists(first.sockaddr)
+
+
+def test_stale_socket_file_is_replaced(private_dir):
+    """비정상 종료로 남은 소켓 파일은 락을 잡은 다음 허브가 정리"""
+    path = str(private_dir / "hub.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # 파일은 남음
+    server = QuoteHubServer(f"unix:{path}", TICKERS)
+    server.start()
+    try:
+        client = QuoteHubClient(f"unix:{path}", TICKERS)
+        client.connect()
+        assert client.receive()[0] == 0
+        client.close()
+    finally:
+        server.close()
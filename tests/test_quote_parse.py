@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from quote_parse import changes_from_prices, field_matrix, last_two_closes, last_valid_closes
+
+
+def baseline_change(full_df, t, n_tickers):
+    """원래 DataFetcher의 종목별 루프 (ffill → dropna(Close) → iloc[-1]/[-2], Open 보완), 실패는 NaN"""
+    if isinstance(full_df.columns, pd.MultiIndex):
+        if t not in full_df.columns.levels[0]: return np.nan
+        data = full_df[t].ffill().dropna(subset=['Close'])
+    else:
+        data = full_df.ffill().dropna(subset=['Close']) if n_tickers == 1 else pd.DataFrame()
+    if data.empty: return np.nan
+    last_row = data.iloc[-1]
+    price = last_row['Close']
+    if pd.isna(price) and len(data) >= 2:
+        price = data.iloc[-2]['Close']
+    prev_close = 0
+    if len(data) >= 2: prev_close = data.iloc[-2]['Close']
+    if (pd.isna(prev_close) or prev_close <= 0) and 'Open' in last_row:
+        prev_close = last_row['Open']
+    if pd.notna(price) and pd.notna(prev_close) and prev_close > 0:
+        return round(((price - prev_close) / prev_close) * 100, 2)
+    return np.nan
+
+
+def baseline_last_close(full_df, t):
+    if t not in full_df.columns.levels[0]: return np.nan
+    data = full_df[t].ffill().dropna(subset=['Close'])
+    return np.nan if data.empty else data.iloc[-1]['Close']
+
+
+def compute_changes(df, tickers):
+    """공급자가 쓰는 경로와 같은 조합: 2일치 프레임 → (최근가, 직전 종가) → 등락률"""
+    return changes_from_prices(*last_two_closes(df, tickers))
+
+
+def make_frame(rng, tickers, rows, hole_rate=0.25, price_first=False):
+    """yfinance group_by='ticker' 형태 (Ticker, Price) MultiIndex 프레임, 무작위 NaN 구멍"""
+    index = pd.date_range("2026-03-02", periods=rows, freq="B")
+    fields = ["Open", "High", "Low", "Close", "Volume"]
+    data = np.round(rng.uniform(5, 500, (rows, len(tickers) * len(fields))), 2)
+    data[rng.random(data.shape) < hole_rate] = np.nan
+    data[:, 0] = 0.0  # Open 0 (보완 불가)
+    columns = pd.MultiIndex.from_product([tickers, fields], names=["Ticker", "Price"])
+    df = pd.DataFrame(data, index=index, columns=columns)
+    if price_first:
+        df = df.swaplevel(0, 1, axis=1)
+    return df
+
+
+def assert_same(actual, expected):
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual[~np.isnan(actual)], expected[~np.isnan(expected)], rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("rows", [1, 2, 3, 5])
+@pytest.mark.parametrize("seed", range(5))
+def test_changes_match_baseline_loop(rows, seed):
+    rng = np.random.default_rng(seed)
+    in_frame = [f"T{i}" for i in range(30)]
+    df = make_frame(rng, in_frame, rows)
+    # 유니버스에는 있지만 다운로드에 없는 종목 + 유니버스와 다른 순서
+    tickers = ["MISSING"] + in_frame[::-1] + ["GONE"]
+    expected = [baseline_change(df, t, len(tickers)) for t in tickers]
+    assert_same(compute_changes(df, tickers), expected)
+    last = [baseline_last_close(df, t) for t in tickers]
+    assert_same(last_two_closes(df, tickers)[0], last)
+    assert_same(last_valid_closes(df, tickers)[0], last)
+
+
+def test_all_nan_column_and_single_row():
+    df = make_frame(np.random.default_rng(7), ["A", "B", "C"], 1, hole_rate=0.0)
+    df[("B", "Close")] = np.nan
+    df[("C", "Open")] = np.nan
+    tickers = ["A", "B", "C"]
+    price, prev = last_two_closes(df, tickers)
+    assert np.isnan(price[1]) and np.isnan(prev[2])
+    assert_same(compute_changes(df, tickers), [baseline_change(df, t, 3) for t in tickers])
+
+
+def test_field_level_order_and_single_ticker_frame():
+    rng = np.random.default_rng(3)
+    tickers = ["A", "B", "C"]
+    df = make_frame(rng, tickers, 4, hole_rate=0.1)
+    swapped = make_frame(np.random.default_rng(3), tickers, 4, hole_rate=0.1, price_first=True)
+    np.testing.assert_array_equal(field_matrix(swapped, "Close", tickers), field_matrix(df, "Close", tickers))
+
+    flat = df["B"]  # 단일 종목 다운로드: 컬럼이 필드 이름
+    assert_same(compute_changes(flat, ["B"]), [baseline_change(flat, "B", 1)])
+    assert field_matrix(flat, "Close", ["A", "B"]).shape == (4, 2)
+    assert np.isnan(field_matrix(flat, "Close", ["A", "B"])).all()
+
+
+def test_empty_frame():
+    assert np.isnan(compute_changes(pd.DataFrame(), ["A", "B"])).all()
+    assert field_matrix(None, "Close", ["A"]).shape == (0, 1)
+
+
+def test_changes_from_prices_rejects_bad_prev():
+    changes = changes_from_prices([10.0, 10.0, np.nan, 10.0], [8.0, 0.0, 8.0, -1.0])
+    assert changes[0] == 25.0
+    assert np.isnan(changes[1:]).all()
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from prev_close import PrevCloseCache
+from quote_parse import last_two_closes, last_valid_closes
+from quote_providers import YFinanceProvider
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def make_frame(rows):
+    """{날짜: {티커: (open, close)}} → yfinance group_by='ticker' 형태 프레임 (없는 값은 NaN)"""
+    index = pd.DatetimeIndex(sorted(rows))
+    tickers = sorted({t for day in rows.values() for t in day})
+    columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Price"])
+    df = pd.DataFrame(np.nan, index=index, columns=columns)
+    for day, quotes in rows.items():
+        for t, (open_, close) in quotes.items():
+            df.loc[pd.Timestamp(day), (t, "Open")] = open_
+            df.loc[pd.Timestamp(day), (t, "Close")] = close
+    return df
+
+
+class FakeYF:
+    """period별 고정 프레임에서 요청 종목 열만 돌려주는 yfinance 대역"""
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def download(self, tickers, period, **kwargs):
+        self.calls.append((period, list(tickers)))
+        df = self.frames[period]
+        keep = [t for t in tickers if t in df.columns.get_level_values(0)]
+        return df.loc[:, df.columns.get_level_values(0).isin(keep)]
+
+
+TODAY, YESTERDAY, OLDER = "2026-03-06", "2026-03-05", "2026-03-04"
+
+
+def ordinal(day):
+    return pd.Timestamp(day).date().toordinal()
+
+
+def test_last_valid_closes_uses_each_tickers_own_last_row():
+    df = make_frame({
+        OLDER: {"A": (9.0, 10.0), "B": (20.0, 20.0), "C": (5.0, 0.0)},
+        YESTERDAY: {"A": (10.0, 11.0), "B": (20.0, 21.0), "C": (6.0, np.nan)},
+        TODAY: {"A": (11.0, 12.0), "B": (np.nan, np.nan), "C": (7.0, 7.5)},
+    })
+    price, prev, session, real = last_valid_closes(df, ["A", "B", "C", "X"])
+    np.testing.assert_array_equal(price[:3], [12.0, 21.0, 7.5])
+    np.testing.assert_array_equal(prev[:3], [11.0, 20.0, 7.0])  # C: 직전 종가 0 → Open 보완
+    np.testing.assert_array_equal(real, [True, True, False, False])
+    np.testing.assert_array_equal(session, [ordinal(TODAY), ordinal(YESTERDAY), ordinal(TODAY), 0])
+    assert np.isnan(price[3]) and np.isnan(prev[3])
+
+    # 모든 종목의 마지막 행이 같으면 배치 기준 계산과 같음
+    same = df.loc[:, df.columns.get_level_values(0).isin(["A", "C"])]
+    np.testing.assert_array_equal(np.stack(last_valid_closes(same, ["A", "C"])[:2]),
+                                  np.stack(last_two_closes(same, ["A", "C"])))
+
+
+def test_fetch_batch_keys_prev_close_by_ticker_session(tmp_path):
+    """배치 마지막 세션에 행이 없는 종목도 자기 세션 기준으로 직전 종가를 찾고, 그 종목만 2일치로 보완"""
+    cache = PrevCloseCache(tmp_path / "prev_close.npz")
+    cache.update(["A", "B"], [100.0, 50.0], [ordinal(TODAY), ordinal(OLDER)])  # B는 지난 세션 값
+    one_day = make_frame({
+        YESTERDAY: {"B": (50.0, 51.0)},  # 오늘 행 없음 (거래 정지 등)
+        TODAY: {"A": (100.0, 101.0), "C": (30.0, 33.0)},
+    })
+    two_day = make_frame({
+        YESTERDAY: {"A": (99.0, 100.0), "B": (50.0, 51.0), "C": (29.0, 30.0), "D": (9.0, 10.0)},
+        TODAY: {"A": (100.0, 101.0), "C": (30.0, 33.0)},
+    })
+    provider = YFinanceProvider(prev_cache=cache)
+    provider._yf = FakeYF({"1d": one_day, "2d": two_day})
+
+    price, prev = provider.fetch_batch(["A", "B", "C", "D"])
+    np.testing.assert_array_equal(price, [101.0, 51.0, 33.0, 10.0])
+    # A: 캐시 적중, C: 2일치 직전 종가, B/D: 2일치에 이전 행이 없어 Open 보완
+    np.testing.assert_array_equal(prev, [100.0, 50.0, 30.0, 9.0])
+    assert provider._yf.calls == [("1d", ["A", "B", "C", "D"]), ("2d", ["B", "C", "D"])]
+
+    # Open 보완 값(B/D)은 캐시하지 않음, 실제 직전 종가가 있던 C만 자기 세션 기준으로 저장
+    lookup = cache.lookup(["B", "C", "D"], [ordinal(YESTERDAY), ordinal(TODAY), ordinal(YESTERDAY)])
+    np.testing.assert_array_equal(np.isnan(lookup), [True, False, True])
+    assert lookup[1] == 30.0
+
+    # 두 번째 갱신은 캐시에 있는 종목은 1일치만, B는 다시 2일치로 확인
+    provider._yf.calls.clear()
+    price2, prev2 = provider.fetch_batch(["A", "B", "C"])
+    np.testing.assert_array_equal(prev2, prev[:3])
+    np.testing.assert_array_equal(price2, price[:3])
+    assert provider._yf.calls == [("1d", ["A", "B", "C"]), ("2d", ["B"])]
@@ -0,0 +1,60 @@
+import numpy as np
+
+from quote_fetcher import QuoteFetcher
+from quote_status import FAILED, OK, STALE, QuoteStatus
+
+
+class FlakyProvider:
+    """failing 집합의 종목은 항상 실패 (NaN), 나머지는 +1%"""
+    name = "flaky"
+    always_open = True
+
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.requested = []
+
+    def begin_refresh(self): pass
+    def end_refresh(self): pass
+
+    def fetch_batch(self, tickers):
+        tickers = list(tickers)
+        self.requested.extend(tickers)
+        prev = np.full(len(tickers), 100.0)
+        price = np.where([t in self.failing for t in tickers], np.nan, 101.0)
+        return price, prev
+
+
+def test_backed_off_ticker_is_not_requested_until_due():
+    status = QuoteStatus(3, base_backoff=60.0)
+    status.record([0, 1, 2], [1.0, np.nan, 0.0], now=1000.0)
+    assert status.status.tolist() == [OK, FAILED, OK]
+    status.backoff([1], now=1000.0)
+
+    np.testing.assert_array_equal(status.requestable(now=1030.0), [True, False, True])
+    np.testing.assert_array_equal(status.requestable(now=1060.0), [True, True, True])
+
+    # 연속 실패마다 간격 2배
+    status.record([1], [np.nan], now=1060.0)
+    status.backoff([1], now=1060.0)
+    assert not status.requestable(now=1060.0 + 119.0)[1]
+    assert status.requestable(now=1060.0 + 120.0)[1]
+
+    # 성공하면 백오프 해제, 마지막 성공 값이 있으면 이후 실패는 STALE
+    status.record([1], [2.0], now=1200.0)
+    assert status.requestable(now=1200.0).all()
+    status.record([1], [np.nan], now=1300.0)
+    assert status.status[1] == STALE
+
+
+def test_fetcher_skips_backed_off_tickers_on_next_refresh():
+    tickers = ["AAA", "BBB", "CCC"]
+    provider = FlakyProvider({"BBB"})
+    status = QuoteStatus(len(tickers), base_backoff=600.0)
+    fetcher = QuoteFetcher(tickers, [3.0, 2.0, 1.0], provider, status,
+                           {"requests_per_sec": 0, "retry_attempts": 1, "retry_base_delay": 0})
+    changes = fetcher.fetch()
+    assert np.isnan(changes[1]) and status.next_retry[1] > 0
+
+    provider.requested.clear()
+    fetcher.fetch()
+    assert provider.requested == ["AAA", "CCC"]
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+import refresh_scheduler
+from market_calendar import MarketCalendar
+from refresh_scheduler import IDLE_RECHECK, RefreshScheduler
+
+MONDAY = datetime(2026, 3, 9)
+
+
+def at(hour, minute=0, second=0, day=MONDAY):
+    return day.replace(hour=hour, minute=minute, second=second)
+
+
+@pytest.fixture
+def scheduler(qapp):
+    instance = RefreshScheduler(MarketCalendar(), base=120, min_interval=30, edge_minutes=30)
+    yield instance
+    instance.timer.stop()
+
+
+def test_next_delay_edges_and_mid_session(scheduler):
+    assert scheduler.next_delay(at(9, 40)) == (30, "open/close window")   # 개장 직후
+    assert scheduler.next_delay(at(12, 0)) == (120, "market open")
+    assert scheduler.next_delay(at(15, 45)) == (30, "open/close window")  # 폐장 직전
+    # 개장 전: 개장 5초 뒤까지 대기, 1시간 넘게 남았으면 재계산용 최대 대기
+    delay, reason = scheduler.next_delay(at(9, 0))
+    assert delay == 30 * 60 + 5 and reason.startswith("closed")
+    assert scheduler.next_delay(at(6, 0))[0] == IDLE_RECHECK
+    # 조기 폐장일(추수감사절 다음 날) 12:45는 폐장 직전 구간
+    assert scheduler.next_delay(datetime(2026, 11, 27, 12, 45))[1] == "open/close window"
+    # 한산하면 주기를 늘리되 max_interval까지만
+    scheduler.interval = 10_000
+    assert scheduler.next_delay(at(12, 0))[0] == 10_000
+    # 주기가 길어도 폐장 시각 + 60초는 넘기지 않음 (종가 반영)
+    assert scheduler.next_delay(at(14, 0)) == (2 * 3600 + 60, "market open")
+    scheduler.refresh_finished(activity=0.0)
+    assert scheduler.interval == scheduler.max_interval
+
+
+def test_idle_recheck_does_not_refresh_while_closed(scheduler, monkeypatch):
+    refreshes = []
+    scheduler.refresh.connect(lambda: refreshes.append(True))
+    now = [datetime(2026, 3, 7, 12, 0)]  # 토요일
+    monkeypatch.setattr(refresh_scheduler, "eastern_now", lambda: now[0])
+
+    scheduler.refresh_finished(None)
+    assert scheduler._idle and scheduler.timer.isActive()
+    scheduler._on_timeout()  # 장 마감 중 재계산: 갱신 없이 다시 대기
+    assert refreshes == [] and scheduler._idle and scheduler.timer.isActive()
+
+    now[0] = at(9, 30, 5)  # 월요일 개장
+    scheduler._on_timeout()
+    assert refreshes == [True] and not scheduler._idle
+
+
+def test_scheduled_refresh_inside_session_fires(scheduler, monkeypatch):
+    """장중에 예약한 갱신(폐장 직후 종가 반영 포함)은 만료 시 갱신"""
+    refreshes = []
+    scheduler.refresh.connect(lambda: refreshes.append(True))
+    monkeypatch.setattr(refresh_scheduler, "eastern_now", lambda: at(15, 59))
+    scheduler.refresh_finished(None)
+    assert not scheduler._idle
+    scheduler._on_timeout()
+    assert refreshes == [True]
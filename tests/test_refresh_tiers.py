@@ -0,0 +1,41 @@
+import numpy as np
+
+from refresh_tiers import RefreshTiers
+
+
+def test_default_tiers_by_weight_rank():
+    rng = np.random.default_rng(0)
+    n = 400
+    weights = rng.uniform(0.01, 10, n)
+    tiers = RefreshTiers(weights)
+    rank = np.empty(n, dtype=np.intp)
+    rank[np.argsort(-weights, kind="stable")] = np.arange(n)
+    top, mid, rest = rank < 30, (rank >= 30) & (rank < 150), rank >= 150
+    assert tiers.counts().tolist() == [30, 120, 250]
+
+    due = np.array([tiers.due(cycle) for cycle in range(12)])  # (cycle, ticker)
+    assert due[:, top].all()  # 1~30위: 매 회차
+    np.testing.assert_array_equal(due[:, mid].sum(axis=0), 4)   # 31~150위: 3회에 한 번
+    np.testing.assert_array_equal(due[:, rest].sum(axis=0), 2)  # 나머지: 6회에 한 번
+    for mask, every in ((mid, 3), (rest, 6)):
+        for column in due[:, mask].T:
+            assert np.diff(np.nonzero(column)[0]).tolist() == [every] * (len(due) // every - 1)
+    # 같은 계층 안에서 회차별 요청 수를 고르게 분산
+    assert set(due[:, mid].sum(axis=1).tolist()) == {40}
+    assert set(due[:, rest].sum(axis=1).tolist()) <= {41, 42}
+
+
+def test_custom_tiers_and_small_universe():
+    tiers = RefreshTiers([5.0, 4.0, 3.0], [{"top": 1, "every": 1}, {"every": 2}])
+    assert tiers.tier.tolist() == [0, 1, 1]
+    assert tiers.due(0).tolist() == [True, True, False]
+    assert tiers.due(1).tolist() == [True, False, True]
+
+
+def test_freshness_reports_oldest_update_per_tier():
+    tiers = RefreshTiers([5.0, 4.0, 3.0, 2.0, 1.0], [{"top": 2, "every": 1}, {"top": 4, "every": 2}, {"every": 4}])
+    last_success = np.array([100.0, 90.0, 50.0, 70.0, 0.0])  # 마지막 종목은 한 번도 성공하지 못함
+    assert tiers.freshness(last_success).tolist() == [90.0, 50.0, 0.0]
+    # 종목이 없는 계층은 0
+    empty = RefreshTiers([2.0, 1.0], [{"top": 5, "every": 1}, {"every": 3}])
+    assert empty.freshness([10.0, 20.0]).tolist() == [10.0, 0.0]
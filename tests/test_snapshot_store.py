@@ -0,0 +1,21 @@
+import numpy as np
+
+from snapshot_store import HistoryRing
+
+
+def test_at_returns_a_copy_that_survives_wraparound():
+    ring = HistoryRing(4, capacity=3)
+    for t in range(3):
+        ring.append(100.0 + t, np.full(4, t, dtype=np.float64))
+    timestamp, replayed = ring.at(0)
+    assert timestamp == 100.0
+
+    # 가득 찬 링에 추가하면 가장 오래된 슬롯(재생 중인 행)을 덮어씀
+    ring.append(103.0, np.full(4, 9.0))
+    assert ring.dropped == 1
+    np.testing.assert_array_equal(replayed, np.zeros(4))
+    np.testing.assert_array_equal(ring.at(0)[1], np.ones(4))
+    np.testing.assert_array_equal(ring.at(2)[1], np.full(4, 9.0))
+
+    replayed[:] = -1  # 반환값을 고쳐도 링은 그대로
+    np.testing.assert_array_equal(ring.at(0)[1], np.ones(4))
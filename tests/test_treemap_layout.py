@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from treemap_layout import (calculate_nested_treemap, calculate_treemap, calculate_treemap_arrays,
+                            nested_to_relative, relative_to_nested)
+
+
+def worst_ratio(row, side):
+    """원래 엔진: row 사각형들의 가로세로비 중 가장 나쁜 값 (리스트 전체 재계산)"""
+    if not row: return float('inf')
+    row_area = sum(row)
+    if row_area == 0 or side == 0: return float('inf')
+    return max((side ** 2 * max(row)) / (row_area ** 2), (row_area ** 2) / (side ** 2 * min(row)))
+
+
+def squarify(areas, x, y, w, h):
+    """원래 리스트 기반 Squarified Treemap (정규화된 면적 리스트, 정렬된 순서)"""
+    is_horizontal = w > h
+    side = h if is_horizontal else w
+    if not areas or side == 0: return []
+    rects, row, i = [], [], 0
+    while i < len(areas):
+        if worst_ratio(row, side) >= worst_ratio(row + [areas[i]], side):
+            row.append(areas[i])
+            i += 1
+            continue
+        thickness = sum(row) / side
+        offset = y if is_horizontal else x
+        for area in row:
+            length = area / thickness
+            rects.append([x, offset, thickness, length] if is_horizontal else [offset, y, length, thickness])
+            offset += length
+        if is_horizontal: x, w = x + thickness, w - thickness
+        else: y, h = y + thickness, h - thickness
+        row = []
+        is_horizontal = w > h
+        side = h if is_horizontal else w
+        if side <= 0: break
+    if row:
+        thickness = sum(row) / side if side > 0 else 0
+        offset = y if is_horizontal else x
+        for area in row:
+            length = area / thickness if thickness > 0 else 0
+            rects.append([x, offset, thickness, length] if is_horizontal else [offset, y, length, thickness])
+            offset += length
+    return rects
+
+
+def baseline_rects(weights, x, y, w, h):
+    """원래 calculate_treemap 경로 (가중치 내림차순, 0 이하는 0.0001, 면적 합 = w * h)"""
+    values = sorted((v if v > 0 else 0.0001 for v in weights), reverse=True)
+    total = sum(values)
+    return np.array(squarify([v * w * h / total for v in values], x, y, w, h))
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 60, 500])
+@pytest.mark.parametrize("size", [(1200, 800), (140, 90), (300, 900), (500, 500)])
+def test_arrays_match_squarify(n, size):
+    rng = np.random.default_rng(n)
+    weights = rng.pareto(1.5, n) + 0.01
+    weights[rng.random(n) < 0.05] = 0.0  # 0 가중치
+    weights[: n // 10] = weights[0]      # 같은 가중치 (stable 정렬)
+    w, h = size
+    rects = calculate_treemap_arrays(weights, 10, 5, w, h)
+    order = np.argsort(-np.where(weights > 0, weights, 0.0001), kind="stable")
+    np.testing.assert_allclose(rects[order], baseline_rects(weights.tolist(), 10, 5, w, h), rtol=1e-9, atol=1e-6)
+    assert rects[:, 2:].prod(axis=1).sum() == pytest.approx(w * h)
+
+
+def test_degenerate_inputs():
+    assert calculate_treemap_arrays([], 0, 0, 100, 100).shape == (0, 4)
+    assert not calculate_treemap_arrays([1.0, 2.0], 0, 0, 0, 100).any()
+    np.testing.assert_allclose(calculate_treemap_arrays([5.0], 3, 4, 20, 10), [[3, 4, 20, 10]])
+
+
+def test_calculate_treemap_empty_area():
+    """원래 래퍼와 같이 크기가 0 이하이면 빈 리스트"""
+    data = [{'ticker': "A", 'weight': 1.0}, {'ticker': "B", 'weight': 2.0}]
+    assert calculate_treemap(data, 0, 0, 0, 100) == []
+    assert calculate_treemap(data, 0, 0, 100, -5) == []
+    assert baseline_rects([1.0, 2.0], 0, 0, 0, 100).size == 0
+
+
+def test_calculate_treemap_order_and_ties():
+    data = [{'ticker': t, 'weight': wt} for t, wt in [("B", 2.0), ("A", 2.0), ("C", 5.0), ("D", 0.0)]]
+    rects = calculate_treemap(data, 0, 0, 400, 300)
+    # 가중치 내림차순, 같으면 티커 역순 (원래 래퍼와 같은 결정적 순서)
+    assert [r['data']['ticker'] for r in rects] == ["C", "B", "A", "D"]
+    np.testing.assert_allclose([[r['x'], r['y'], r['w'], r['h']] for r in rects],
+                               baseline_rects([2.0, 2.0, 5.0, 0.0], 0, 0, 400, 300))
+
+
+def test_nested_matches_per_sector_layout():
+    rng = np.random.default_rng(9)
+    hierarchy = []
+    for s in range(6):
+        stocks = [{'ticker': f"S{s}T{i}", 'weight': float(wt)} for i, wt in enumerate(rng.uniform(0.1, 9, 3 + s * 4))]
+        hierarchy.append({'sector': f"S{s}", 'weight': sum(x['weight'] for x in stocks), 'stocks': stocks})
+    table = calculate_nested_treemap(hierarchy, 1200, 800, header_h=16, margin=1)
+    k = len(hierarchy)
+    row = k
+    for si, sector in enumerate(hierarchy):
+        sx, sy, sw, sh = table['rects'][si]
+        top = 16 if sh > 45 else 0
+        expected = calculate_treemap(sector['stocks'], sx + 1, sy + top, sw - 2, sh - 1 - top)
+        by_ticker = {r['data']['ticker']: [r['x'], r['y'], r['w'], r['h']] for r in expected}
+        got = table['rects'][row:row + len(sector['stocks'])]
+        np.testing.assert_allclose(got, [by_ticker[x['ticker']] for x in sector['stocks']], rtol=1e-9, atol=1e-9)
+        row += len(sector['stocks'])
+
+    # 비율 좌표로 바꿨다가 같은 크기로 복원하면 원래 테이블
+    sector_rel, child_rel = nested_to_relative(table, 1200, 800, margin=1)
+    restored = relative_to_nested(sector_rel, child_rel, table['parent'][k:], 1200, 800, margin=1, header_h=16)
+    np.testing.assert_allclose(restored['rects'], table['rects'], atol=1e-6)
@@ -1,196 +1,233 @@
-def normalize_sizes(sizes, width, height):
-    """
-    면적 합이 width * height가 되도록 정규화
-    sizes: 값 리스트
-    """
-    total_size = sum(sizes)
-    if total_size == 0: return []
-    total_area = width * height
-    return [size * total_area / total_size for size in sizes]
+import numpy as np
 
-def worst_ratio(row, width):
+def _row_worst(row_sum, row_min, row_max, side):
     """
-    현재 row의 사각형들의 가로세로비 중 가장 나쁜(1에서 먼) 값을 반환
+    row 사각형들의 가로세로비 중 가장 나쁜(1에서 먼) 값
+    누적 합/최소/최대값만으로 계산 (O(1), 리스트 생성 없음)
     """
-    if not row: return float('inf')
-    min_area = min(row)
-    max_area = max(row)
-    row_area = sum(row)
-    if row_area == 0 or width == 0: return float('inf')
-    
-    # width는 측면 길이 (현재 채우고 있는 방향의 수직 길이)
-    # row_area / width = row_width (채우는 방향의 두께)
-    
-    return max((width ** 2 * max_area) / (row_area ** 2), (row_area ** 2) / (width ** 2 * min_area))
+    if row_sum == 0 or side == 0: return float('inf')
+    side_sq = side * side
+    row_sq = row_sum * row_sum
+    return max((side_sq * row_max) / row_sq, row_sq / (side_sq * row_min))
 
-def layout_row(row, x, y, width, height, is_horizontal):
+def _place_row(out, start, end, areas, row_sum, x, y, w, h, is_horizontal):
     """
-    Row를 실제로 배치하여 좌표 리스트 반환
-    is_horizontal: 가로로 자를지(True, 높이가 고정), 세로로 자를지(False, 너비가 고정)
+    out[start:end]에 row를 배치하고 남은 영역 (x, y, w, h)를 반환
     """
-    row_area = sum(row)
-    if row_area == 0: return []
-    
-    rects = []
-    
+    seg = areas[start:end]
     if is_horizontal:
-        # 높이는 고정(side), 너비(row_area / height)를 채움 -> 실제로는 '세로'로 쌓이는 형태가 됨 (row_width = row_area / side)
-        # Squarified 알고리즘 용어 정리:
-        # layout 함수에서 width는 '컨테이너의 짧은 변'을 의미하여 전달됨.
-        # 여기서는 실제 좌표계로 변환해야 함.
-        
-        # side가 height라고 가정
-        row_width = row_area / height 
-        current_y = y
-        for area in row:
-            h = area / row_width
-            rects.append({'x': x, 'y': current_y, 'w': row_width, 'h': h})
-            current_y += h
+        # 캔버스가 가로로 긴 상태 -> 왼쪽에 세로 바(row)를 둠
+        row_width = row_sum / h if h > 0 else 0
+        lengths = seg / row_width if row_width > 0 else np.zeros_like(seg)
+        out[start:end, 0] = x
+        out[start:end, 1] = y + np.cumsum(lengths) - lengths
+        out[start:end, 2] = row_width
+        out[start:end, 3] = lengths
+        return x + row_width, y, w - row_width, h
     else:
-        # 너비는 고정(side), 높이(row_area / width)를 채움
-        row_height = row_area / width
-        current_x = x
-        for area in row:
-            w = area / row_height
-            rects.append({'x': current_x, 'y': y, 'w': w, 'h': row_height})
-            current_x += w
-            
-    return rects
+        # 캔버스가 세로로 긴 상태 -> 위쪽에 가로 바(row)를 둠
+        row_height = row_sum / w if w > 0 else 0
+        lengths = seg / row_height if row_height > 0 else np.zeros_like(seg)
+        out[start:end, 0] = x + np.cumsum(lengths) - lengths
+        out[start:end, 1] = y
+        out[start:end, 2] = lengths
+        out[start:end, 3] = row_height
+        return x, y + row_height, w, h - row_height
 
-def squarify(children, x, y, w, h):
+def calculate_treemap_arrays(weights, x, y, w, h, order=None):
     """
-    Squarified Treemap 알고리즘 메인
-    children: 정규화된 면적 리스트
-    반환: [{'x':, 'y':, 'w':, 'h':}, ...]
+    배열 기반 Squarified Treemap
+    weights: 가중치 벡터 (n,)
+    order: 배치 순서 (인덱스 배열). 없으면 가중치 내림차순 (stable)
+    반환: 입력 순서와 같은 (n, 4) float 배열 [x, y, w, h]
     """
-    if not children: return []
-    
-    # 캔버스의 짧은 변을 기준으로 함
-    is_horizontal = w > h # 가로가 더 길면 -> 세로로 자름 (왼쪽에 Row 배치) -> layout 시 side는 h
+    weights = np.asarray(weights, dtype=np.float64)
+    n = weights.shape[0]
+    rects = np.zeros((n, 4), dtype=np.float64)
+    if n == 0 or w <= 0 or h <= 0: return rects
+
+    # 0 이하 값은 아주 작은 값으로 대체 (0 방지)
+    values = np.where(weights > 0, weights, 0.0001)
+    if order is None:
+        order = np.argsort(-values, kind='stable')
+    else:
+        order = np.asarray(order, dtype=np.intp)
+
+    # 면적 합이 w * h가 되도록 정규화 (정렬된 순서)
+    areas = values[order] * (w * h / values.sum())
+    out = np.zeros((n, 4), dtype=np.float64)
+
+    is_horizontal = w > h
     side = h if is_horizontal else w
-    
-    if side == 0: return []
-
-    final_rects = []
-    row = []
-    children_copy = list(children) # Queue처럼 사용
-    
-    # 원래 인덱스와 값을 매핑하기 위해 (값, 원래인덱스) 튜플 사용 등을 고려해야 하지만
-    # 여기서는 그냥 순서대로 반환하고 호출자가 매핑한다고 가정 (children이 정렬되어 들어옴)
-    
-    current_idx = 0
-    row_area_sum = 0
-    
-    while current_idx < len(children_copy):
-        c = children_copy[current_idx]
-        
-        # 현재 row에 c를 추가했을 때의 worst ratio
-        row_with_c = row + [c]
-        if worst_ratio(row, side) >= worst_ratio(row_with_c, side):
+
+    # [RUNNING-SUM] row 합/최소/최대를 누적 유지하여 후보마다 O(1)로 비율 비교
+    area_list = areas.tolist()
+    start = 0
+    i = 0
+    row_sum, row_min, row_max = 0.0, float('inf'), 0.0
+    current_worst = float('inf')
+
+    while i < n:
+        c = area_list[i]
+        new_sum = row_sum + c
+        new_min = row_min if row_min < c else c
+        new_max = row_max if row_max > c else c
+        new_worst = _row_worst(new_sum, new_min, new_max, side)
+        if current_worst >= new_worst:
             # 비율이 좋아지거나 같으면 추가
-            row.append(c)
-            current_idx += 1
+            row_sum, row_min, row_max = new_sum, new_min, new_max
+            current_worst = new_worst
+            i += 1
         else:
             # 비율이 나빠지면 현재 row 확정 및 배치
-            row_area = sum(row)
-            layout_rects = []
-            
-            if is_horizontal:
-                # 캔버스가 가로로 긴 상태 -> 왼쪽에 세로 바(row)를 둠
-                # side는 h
-                row_width = row_area / h
-                current_y = y
-                for area in row:
-                    rect_h = area / row_width
-                    final_rects.append({'x': x, 'y': current_y, 'w': row_width, 'h': rect_h})
-                    current_y += rect_h
-                
-                # 남은 영역 갱신
-                x += row_width
-                w -= row_width
-            else:
-                # 캔버스가 세로로 긴 상태 -> 위쪽에 가로 바(row)를 둠
-                # side는 w
-                row_height = row_area / w
-                current_x = x
-                for area in row:
-                    rect_w = area / row_height
-                    final_rects.append({'x': current_x, 'y': y, 'w': rect_w, 'h': row_height})
-                    current_x += rect_w
-                
-                # 남은 영역 갱신
-                y += row_height
-                h -= row_height
-            
-            # 다음 row 준비
-            row = []
-            # 캔버스 형태가 바뀌었을 수 있으므로 is_horizontal 재계산
+            x, y, w, h = _place_row(out, start, i, areas, row_sum, x, y, w, h, is_horizontal)
+            start = i
+            row_sum, row_min, row_max = 0.0, float('inf'), 0.0
+            current_worst = float('inf')
             is_horizontal = w > h
             side = h if is_horizontal else w
-            if side <= 0: break # 더 이상 공간 없음
+            if side <= 0: break # 더 이상 공간 없음 (남은 항목은 크기 0)
 
     # 남은 row 처리
-    if row:
-        row_area = sum(row)
-        if is_horizontal:
-            row_width = row_area / h if h > 0 else 0
-            current_y = y
-            for area in row:
-                rect_h = area / row_width if row_width > 0 else 0
-                final_rects.append({'x': x, 'y': current_y, 'w': row_width, 'h': rect_h})
-                current_y += rect_h
-        else:
-            row_height = row_area / w if w > 0 else 0
-            current_x = x
-            for area in row:
-                rect_w = area / row_height if row_height > 0 else 0
-                final_rects.append({'x': current_x, 'y': y, 'w': rect_w, 'h': row_height})
-                current_x += rect_w
-                
-    return final_rects
+    if i > start:
+        _place_row(out, start, i, areas, row_sum, x, y, w, h, is_horizontal)
+
+    rects[order] = out
+    return rects
+
+def _deterministic_order(data_list, value_key='weight'):
+    """
+    [DETERMINISTIC] 가중치 내림차순, 같으면 티커/섹터 이름으로 정렬한 인덱스 리스트
+    """
+    return sorted(range(len(data_list)), key=lambda i: (
+        data_list[i].get(value_key, 0),
+        data_list[i].get('ticker', data_list[i].get('sector', ''))
+    ), reverse=True)
+
+def _weights_of(data_list, value_key='weight'):
+    return np.fromiter((item.get(value_key, 0) for item in data_list), dtype=np.float64, count=len(data_list))
 
 def calculate_treemap(data_list, x, y, width, height, value_key='weight'):
     """
-    사용자 친화적 래퍼 함수
+    사용자 친화적 래퍼 함수 (calculate_treemap_arrays 기반)
     data_list: [{'weight': 100, ...}, ...]
-    반환: [{'x':, 'y':, 'w':, 'h':, 'data': original_item}, ...]
-    """
-    # 1. 값 추출 및 내림차순 정렬 (Squarified 필수 조건)
-    # 인덱스를 기억하기 위해 enumerate 사용
-    # [DETERMINISTIC] 무게가 같을 경우 티커/섹터 이름으로 정렬하여 배치 순서 고정
-    indexed_data = list(enumerate(data_list))
-    # ticker 또는 sector 키를 2차 정렬 기준으로 사용
-    indexed_data.sort(key=lambda item: (
-        item[1].get(value_key, 0), 
-        item[1].get('ticker', item[1].get('sector', ''))
-    ), reverse=True)
-    
-    values = [item[1].get(value_key, 0) for item in indexed_data]
-    
-    # 2. 아주 작은 값 필터링 (0 등)
-    values = [v if v > 0 else 0.0001 for v in values] # 0 방지
-    
-    # 3. 정규화
-    normalized_values = normalize_sizes(values, width, height)
-    
-    # 4. 좌표 계산
-    rects = squarify(normalized_values, x, y, width, height)
-    
-    # 5. 데이터 매핑 복원
-    result = []
-    # rects 순서는 정렬된 values 순서와 같음
-    for i, rect in enumerate(rects):
-        original_index = indexed_data[i][0]
-        original_item = indexed_data[i][1]
-        
-        # 정수 좌표로 변환 (UI 렌더링용)
-        # [PRECISION] 정밀한 스마트 라운딩을 위해 소수점 좌표를 그대로 반환
-        result.append({
-            'x': rect['x'], 
-            'y': rect['y'], 
-            'w': rect['w'], 
-            'h': rect['h'], 
-            'data': original_item
-        })
-        
-    return result
+    반환: [{'x':, 'y':, 'w':, 'h':, 'data': original_item}, ...] (가중치 내림차순), 크기가 0 이하이면 []
+    """
+    if width <= 0 or height <= 0: return []
+    order = _deterministic_order(data_list, value_key)
+    rects = calculate_treemap_arrays(_weights_of(data_list, value_key), x, y, width, height, order=order)
+
+    # [PRECISION] 정밀한 스마트 라운딩을 위해 소수점 좌표를 그대로 반환
+    return [
+        {'x': rx, 'y': ry, 'w': rw, 'h': rh, 'data': data_list[i]}
+        for i, (rx, ry, rw, rh) in zip(order, rects[order].tolist())
+    ]
+
+def calculate_nested_treemap(hierarchy, width, height, header_h=16, margin=1,
+                             header_min_h=45, value_key='weight', children_key='stocks'):
+    """
+    섹터 → 종목 2단계 Treemap을 한 번의 호출로 계산
+    hierarchy: [{'sector':, 'weight':, 'stocks': [...]}, ...]
+    header_h: 섹터 높이가 header_min_h보다 클 때 위쪽에 비워둘 헤더 높이
+    margin: 섹터 좌/우/아래 테두리 여백
+    반환: {'rects': (m, 4), 'parent': (m,), 'top': (m,), 'n_sectors': k}
+      - 앞의 k = len(hierarchy) 행은 섹터 (parent = -1)
+      - 이후 행은 섹터 순서대로 이어 붙인 종목 (parent = 섹터 행 인덱스)
+      - 종목 좌표는 헤더/마진 인셋이 적용된 전역 좌표
+      - top: 섹터 행에 실제로 적용된 헤더 높이 (종목 행은 0)
+    """
+    n_sectors = len(hierarchy)
+    counts = [len(s.get(children_key, ())) for s in hierarchy]
+    m = n_sectors + sum(counts)
+
+    rects = np.zeros((m, 4), dtype=np.float64)
+    parent = np.full(m, -1, dtype=np.int32)
+    top = np.zeros(m, dtype=np.float64)
+    if n_sectors == 0:
+        return {'rects': rects, 'parent': parent, 'top': top, 'n_sectors': 0}
+
+    rects[:n_sectors] = calculate_treemap_arrays(
+        _weights_of(hierarchy, value_key), 0, 0, width, height,
+        order=_deterministic_order(hierarchy, value_key))
+
+    # 섹터별 종목 블록 시작 위치
+    offsets = n_sectors + np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+    parent[n_sectors:] = np.repeat(np.arange(n_sectors, dtype=np.int32), counts)
+
+    for si, sector in enumerate(hierarchy):
+        children = sector.get(children_key, ())
+        if not children: continue
+        sx, sy, sw, sh = rects[si].tolist()
+
+        # [HEADER-INSET] 섹터가 충분히 높을 때만 헤더 공간 확보
+        top_margin = header_h if sh > header_min_h else 0
+        top[si] = top_margin
+        inner_w = sw - 2 * margin
+        inner_h = sh - margin - top_margin
+        if inner_w <= 0 or inner_h <= 0: continue
+
+        start = offsets[si]
+        rects[start:start + len(children)] = calculate_treemap_arrays(
+            _weights_of(children, value_key), sx + margin, sy + top_margin, inner_w, inner_h,
+            order=_deterministic_order(children, value_key))
+
+    return {'rects': rects, 'parent': parent, 'top': top, 'n_sectors': n_sectors}
+
+def nested_to_relative(table, width, height, margin=1):
+    """
+    nested 테이블을 비율 좌표로 변환 (다른 크기/여백으로 재사용하기 위함)
+    반환: (sector_rel (k, 4): 전체 영역 대비 0-1,
+           child_rel (n, 4): 부모 섹터의 내부 트리맵 영역(헤더/마진 제외) 대비 0-1)
+    """
+    k = table['n_sectors']
+    rects, top = table['rects'], table['top']
+    sector_rel = rects[:k] / np.array([width, height, width, height], dtype=np.float64)
+
+    parent = table['parent'][k:]
+    inner_x = rects[parent, 0] + margin
+    inner_y = rects[parent, 1] + top[parent]
+    inner_w = rects[parent, 2] - 2 * margin
+    inner_h = rects[parent, 3] - margin - top[parent]
+    valid = (inner_w > 0) & (inner_h > 0)
+    safe_w = np.where(valid, inner_w, 1.0)
+    safe_h = np.where(valid, inner_h, 1.0)
+
+    child = rects[k:]
+    child_rel = np.stack([
+        (child[:, 0] - inner_x) / safe_w,
+        (child[:, 1] - inner_y) / safe_h,
+        child[:, 2] / safe_w,
+        child[:, 3] / safe_h,
+    ], axis=1)
+    child_rel[~valid] = 0
+    return sector_rel, child_rel
+
+def relative_to_nested(sector_rel, child_rel, parent, width, height, margin=0, header_h=0, header_min_h=45):
+    """
+    nested_to_relative 결과를 (width, height) 크기의 nested 테이블로 복원
+    parent: 자식 행의 부모 섹터 인덱스 (n,)
+    """
+    k = sector_rel.shape[0]
+    sectors = sector_rel * np.array([width, height, width, height], dtype=np.float64)
+    top = np.where(sectors[:, 3] > header_min_h, header_h, 0).astype(np.float64) if header_h else np.zeros(k)
+
+    p = np.asarray(parent, dtype=np.intp)
+    inner_x = sectors[p, 0] + margin
+    inner_y = sectors[p, 1] + top[p]
+    inner_w = np.maximum(sectors[p, 2] - 2 * margin, 0)
+    inner_h = np.maximum(sectors[p, 3] - margin - top[p], 0)
+    children = np.stack([
+        inner_x + child_rel[:, 0] * inner_w,
+        inner_y + child_rel[:, 1] * inner_h,
+        child_rel[:, 2] * inner_w,
+        child_rel[:, 3] * inner_h,
+    ], axis=1)
+
+    full_top = np.zeros(k + p.shape[0], dtype=np.float64)
+    full_top[:k] = top
+    return {
+        'rects': np.concatenate([sectors, children]),
+        'parent': np.concatenate([np.full(k, -1, dtype=np.int32), p.astype(np.int32)]),
+        'top': full_top,
+        'n_sectors': k,
+    }
@@ -0,0 +1,118 @@
+"""
+[UNIVERSE] 열 지향 종목 유니버스 (페처/레이아웃/렌더러 공용)
+- 티커/이름/섹터 코드는 배열, 비중/등락률은 float 배열
+- 섹터는 비중 내림차순으로 정렬된 연속 구간 (order[offsets[s]:offsets[s+1]] = 섹터 s의 종목)
+- 외부에는 읽기 전용 뷰만 제공, 등락률은 불변 스냅샷 참조 교체로만 갱신 (버전 번호 증가)
+"""
+import numpy as np
+
+from layout_cache import universe_hash
+from quote_snapshot import QuoteSnapshot
+
+
+def _readonly(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class Universe:
+    def __init__(self, tickers, names, sectors, weights):
+        n = len(tickers)
+        self._tickers = np.array(tickers, dtype=object)
+        self._names = np.array(names, dtype=object)
+        self._weights = np.asarray(weights, dtype=np.float64).copy()
+        # [QUOTE-SNAPSHOT] 현재 게시된 불변 스냅샷 (참조 교체는 원자적, 이전 스냅샷을 가진 쪽은 그대로 유효)
+        self.snapshot = QuoteSnapshot.empty(n)
+        self.index = {t: i for i, t in enumerate(tickers)}
+
+        # 섹터 코드: 처음 등장한 순서, 배치 순서는 (섹터 비중, 이름) 내림차순 (build_sector_data와 동일)
+        first_seen = list(dict.fromkeys(sectors))
+        code_of = {s: c for c, s in enumerate(first_seen)}
+        codes = np.array([code_of[s] for s in sectors], dtype=np.intp)
+        totals = np.bincount(codes, weights=self._weights, minlength=len(first_seen))
+        ranked = sorted(range(len(first_seen)), key=lambda c: (totals[c], first_seen[c]), reverse=True)
+        remap = np.empty(len(first_seen), dtype=np.intp)
+        remap[ranked] = np.arange(len(ranked))
+        self.sector_names = [first_seen[c] for c in ranked]
+        self._sector_codes = remap[codes]
+        self._sector_weights = totals[ranked]
+
+        # 타일 순서 = 섹터 순서대로 이어 붙인 종목 (섹터 안에서는 원래 순서 유지)
+        self._order = np.argsort(self._sector_codes, kind="stable").astype(np.intp)
+        counts = np.bincount(self._sector_codes, minlength=len(ranked))
+        self._sector_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.intp)
+        self.hash = universe_hash(self.hierarchy())
+
+    @classmethod
+    def from_records(cls, records):
+        """[{'ticker':, 'name':, 'sector':, 'weight':}, ...] (stocks_data.STOCKS / config.json "tickers")"""
+        return cls([r['ticker'] for r in records], [r.get('name', r['ticker']) for r in records],
+                   [r.get('sector', 'Unknown') for r in records], [r.get('weight', 0) for r in records])
+
+    def __len__(self):
+        return self._tickers.shape[0]
+
+    # ---------- 읽기 전용 뷰 ----------
+
+    @property
+    def tickers(self): return _readonly(self._tickers)
+    @property
+    def names(self): return _readonly(self._names)
+    @property
+    def weights(self): return _readonly(self._weights)
+    @property
+    def change(self): return self.snapshot.change
+    @property
+    def version(self): return self.snapshot.version
+    @property
+    def sector_codes(self): return _readonly(self._sector_codes)
+    @property
+    def sector_weights(self): return _readonly(self._sector_weights)
+    @property
+    def order(self):
+        """타일 순서 → 유니버스 인덱스"""
+        return _readonly(self._order)
+    @property
+    def sector_offsets(self):
+        """타일 순서 기준 섹터 구간 경계 (k + 1,)"""
+        return _readonly(self._sector_offsets)
+
+    def sector_slice(self, s):
+        return slice(int(self._sector_offsets[s]), int(self._sector_offsets[s + 1]))
+
+    # ---------- 갱신 ----------
+
+    def publish(self, snapshot):
+        """새 스냅샷 게시 (GUI 스레드), 이전 스냅샷 반환 → snapshot.diff(이전)으로 바뀐 종목 조회"""
+        previous, self.snapshot = self.snapshot, snapshot
+        return previous
+
+    def set_changes(self, indices, values):
+        """
+        표시 등락률만 갱신한 새 버전 게시 (NaN = 받지 못함, 기존 값 유지), 실제로 값이 바뀐 종목 수 반환
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        values = np.asarray(values, dtype=np.float64)
+        ok = np.isfinite(values)
+        indices, values = indices[ok], values[ok]
+        moved = self.snapshot.change[indices] != values
+        if not moved.any(): return 0
+        self.publish(self.snapshot.evolve(indices[moved], change=values[moved]))
+        return int(moved.sum())
+
+    # ---------- 호환 (레이아웃 해시 / 레거시 위젯) ----------
+
+    def hierarchy(self):
+        """calculate_nested_treemap / universe_hash 입력: [{'sector':, 'weight':, 'stocks': [{'ticker':, 'weight':}]}]"""
+        tickers, weights = self._tickers.tolist(), self._weights.tolist()
+        return [{'sector': name, 'weight': float(self._sector_weights[s]),
+                 'stocks': [{'ticker': tickers[i], 'weight': weights[i]} for i in self._order[self.sector_slice(s)].tolist()]}
+                for s, name in enumerate(self.sector_names)]
+
+    def records(self):
+        """종목 dict 리스트 사본 (레거시 위젯용, 유니버스 순서)"""
+        sectors = [self.sector_names[c] for c in self._sector_codes.tolist()]
+        return [{'ticker': t, 'name': nm, 'sector': s, 'weight': w, 'change': c}
+                for t, nm, s, w, c in zip(self._tickers.tolist(), self._names.tolist(), sectors,
+                                          self._weights.tolist(), self.change.tolist())]